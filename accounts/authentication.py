@@ -0,0 +1,95 @@
+"""
+JWT authentication that remembers the users it has looked up.
+
+simplejwt's JWTAuthentication loads the token's user with a SELECT on
+every request. CachedJWTAuthentication keeps the loaded users in a small
+per-process LRU for AUTH_USER_CACHE_TIMEOUT seconds, so a dashboard load
+(six or more API calls) costs one user query instead of one per call.
+
+Saving or deleting a user evicts it, which covers password changes and
+deactivation made through the ORM in this process. Other processes see
+the change once their entry expires, hence the short timeout. Writes
+that skip signals (QuerySet.update()) are only bounded by the timeout.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """A thread-safe LRU of user instances whose entries expire."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + timeout)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.AUTH_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_user(sender, instance, **kwargs):
+    user_cache.evict(str(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = str(user_id)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        # Each request gets its own instance to modify.
+        return copy.copy(user)
@@ -1,3 +1,65 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import user_cache
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password123")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def user_queries(self, requests=1):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                self.assertEqual(self.client.get(reverse("csv-upload-logs")).status_code, status.HTTP_200_OK)
+        return sum('FROM "auth_user"' in query["sql"] for query in queries)
+
+    def test_user_is_looked_up_once(self):
+        self.assertEqual(self.user_queries(requests=6), 1)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        self.assertEqual(self.user_queries(requests=3), 3)
+
+    def test_entries_expire(self):
+        self.user_queries()
+        with mock.patch("accounts.authentication.time.monotonic", return_value=10 ** 9):
+            self.assertEqual(self.user_queries(), 1)
+
+    @override_settings(AUTH_USER_CACHE_SIZE=2)
+    def test_size_is_bounded(self):
+        for i in range(4):
+            user = User.objects.create_user(username=f"user{i}", password="password123")
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+            self.user_queries()
+        self.assertEqual(len(user_cache), 2)
+
+    def test_deactivation_is_seen_immediately(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("csv-upload-logs"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_revokes_cached_user(self):
+        # simplejwt binds its settings at import, so patch them in place.
+        with mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+            self.user_queries()
+            self.user.set_password("another-password")
+            self.user.save()
+            response = self.client.get(reverse("csv-upload-logs"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["code"], "password_changed")
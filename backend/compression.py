@@ -0,0 +1,129 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+CompressionMiddleware sends Brotli when the client prefers or allows it
+and the brotli package is installed, and gzip (through Django's
+GZipMiddleware) otherwise. Only textual responses (JSON, CSV, HTML ...)
+of at least COMPRESSION_MIN_SIZE bytes are compressed: small bodies gain
+nothing and Parquet or images are compressed already. Streamed responses
+(the sales export) are compressed chunk by chunk as they are sent.
+"""
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available.
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/openapi",
+    "application/yaml",
+)
+# Quality 4 compresses about as fast as gzip -6 and smaller; the higher
+# levels are meant for static assets compressed once.
+BROTLI_QUALITY = 4
+
+
+def accepted_encodings(header):
+    """{coding: q} of an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header):
+    """The coding to send for an Accept-Encoding header, or None."""
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    # Ties go to the first, i.e. the smaller output.
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses (see the module docstring). Disable with
+    COMPRESSION_ENABLED=False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding") or not response.get("Content-Type", "").startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding == "gzip":
+            return super().process_response(request, response)
+        if coding != "br":
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _abrotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # As GZipMiddleware does: a strong ETag no longer matches the bytes.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
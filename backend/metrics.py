@@ -0,0 +1,235 @@
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware times every request and records, per route:
+wall time, database queries and time, serialization time and response
+size. It adds them to the response as a Server-Timing header and folds
+them into in-process histograms, which `metrics_view` serves in the
+Prometheus text format at /metrics.
+
+Database time is collected by an execute_wrapper installed on every
+connection as it is opened; the wrapper charges the query to the request
+running in the current context (threads started with sync_to_async or a
+copied context count too). The cost per request is a handful of
+perf_counter() calls and one lock acquisition.
+
+Histograms live in the process that served the request: with several
+gunicorn/uvicorn workers, each scrape sees one worker's numbers, so add
+a per-instance label (or run one worker per container) when scraping.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+BYTES_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Wall time of the request", DURATION_BUCKETS),
+    "http_request_db_seconds": ("Time spent in database queries", DURATION_BUCKETS),
+    "http_request_db_queries": ("Database queries run by the request", QUERY_BUCKETS),
+    "http_request_serialize_seconds": ("Time spent rendering the response body", DURATION_BUCKETS),
+    "http_response_bytes": ("Size of the response body", BYTES_BUCKETS),
+}
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "serialize_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    """Stats of the request being served in this context, if any."""
+    return _current.get()
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - started
+        stats.queries += 1
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@contextmanager
+def serializing():
+    """Charge the enclosed block to the current request's serialization time."""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.serialize_time += time.perf_counter() - started
+
+
+class Registry:
+    """Cumulative per-(route, method) histograms and per-status counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.requests = {}
+
+    def observe(self, route, method, status, values):
+        with self._lock:
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                counts = self.histograms.get((name, route, method))
+                if counts is None:
+                    # One count per bucket plus +Inf, then the running sum.
+                    counts = self.histograms[name, route, method] = [0] * (len(buckets) + 1) + [0.0]
+                counts[bisect_left(buckets, value)] += 1
+                counts[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self.histograms.clear()
+            self.requests.clear()
+
+    def render(self):
+        with self._lock:
+            requests = dict(self.requests)
+            histograms = {key: list(counts) for key, counts in self.histograms.items()}
+
+        lines = ["# HELP http_requests_total Requests served", "# TYPE http_requests_total counter"]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (metric, route, method), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                labels = f'route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip([*buckets, "+Inf"], counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {round(counts[-1], 6)}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return "/" + match.route if match.route else match.view_name
+
+
+class RequestMetricsMiddleware:
+    """
+    Record request metrics (see the module docstring). Disable with
+    METRICS_ENABLED=False; METRICS_SERVER_TIMING=False keeps the metrics
+    but drops the Server-Timing header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = settings.METRICS_SERVER_TIMING
+        connection_created.connect(_instrument_connection, dispatch_uid="request-metrics")
+        for connection in connections.all(initialized_only=True):
+            _instrument_connection(None, connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats, started)
+
+    def _start(self):
+        stats = RequestStats()
+        return stats, _current.set(stats), time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time the render.
+        stats = _current.get()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.serialize_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, stats, started):
+        elapsed = time.perf_counter() - started
+        values = {
+            "http_request_duration_seconds": elapsed,
+            "http_request_db_seconds": stats.db_time,
+            "http_request_db_queries": stats.queries,
+            "http_request_serialize_seconds": stats.serialize_time,
+        }
+        # Streamed bodies are not measured: their size is only known once
+        # the server has sent them.
+        if not response.streaming:
+            values["http_response_bytes"] = len(response.content)
+        registry.observe(_route(request), request.method, response.status_code, values)
+
+        if self.server_timing:
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f"serialize;dur={stats.serialize_time * 1000:.1f}, "
+                f"total;dur={elapsed * 1000:.1f}"
+            )
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; needs `Authorization: Bearer <METRICS_TOKEN>` when that is set."""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
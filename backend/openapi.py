@@ -0,0 +1,133 @@
+"""
+The OpenAPI schema, built once per deploy instead of on every docs hit.
+
+drf_yasg's schema view introspects every endpoint on each request, and
+its UI views do so even to render the HTML page. Here the schema is
+produced once: `manage.py generate_openapi` writes it to
+OPENAPI_SCHEMA_FILE (run it on deploy), and a process serves that file,
+or, when no file is configured, builds the schema on the first docs
+request. The bytes are kept in memory and served with an ETag, so
+browsers revalidate with a 304.
+
+The swagger_auto_schema overrides in <app>/docs.py are attached through
+`documented` only when a schema is built, so neither they nor drf_yasg
+are imported while a worker boots.
+"""
+import functools
+import hashlib
+import threading
+from importlib import import_module
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.cache import parse_etags
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_safe
+
+TITLE = "Amazon Sales Dashboard API"
+VERSION = "v1"
+DESCRIPTION = """
+        This documentation provides details about the API endpoints
+        for the Amazon Sales Dashboard project.
+
+        **Key Features:**
+        - Upload CSV files
+        - Track upload logs
+        - Manage sales and reports
+        """
+
+_pending = []
+_lock = threading.Lock()
+
+
+def documented(name, method=None):
+    """
+    Document a view with the swagger_auto_schema decorator `name` from
+    its app's docs module, applied when the schema is built. `method`
+    names the handler of a class-based view, as for method_decorator.
+    """
+
+    def decorator(view):
+        _pending.append((view, name, method))
+        return view
+
+    return decorator
+
+
+def apply_docs():
+    with _lock:
+        while _pending:
+            view, name, method = _pending.pop()
+            docs = getattr(import_module(view.__module__.rpartition(".")[0] + ".docs"), name)
+            if method:
+                method_decorator(docs, name=method)(view)
+            else:
+                docs(view)
+
+
+def api_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title=TITLE,
+        default_version=VERSION,
+        description=DESCRIPTION,
+        terms_of_service="https://yourdomain.com/terms/",
+        contact=openapi.Contact(email="pankaj.bhaltilak.1@gmail.com"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def generate_schema():
+    """Introspect the URLconf and return the schema as JSON bytes."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    apply_docs()
+    schema = OpenAPISchemaGenerator(api_info()).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+@functools.cache
+def get_schema():
+    """The schema bytes and their ETag, read or built once per process."""
+    if settings.OPENAPI_SCHEMA_FILE:
+        with open(settings.OPENAPI_SCHEMA_FILE, "rb") as f:
+            content = f.read()
+    else:
+        content = generate_schema()
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+@require_safe
+def schema_view(request):
+    content, etag = get_schema()
+    headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+    # Weak comparison: compression turns the ETag into W/"...".
+    if_none_match = [tag.removeprefix("W/") for tag in parse_etags(request.headers.get("If-None-Match", ""))]
+    if etag in if_none_match or "*" in if_none_match:
+        return HttpResponseNotModified(headers=headers)
+    return HttpResponse(content, content_type="application/json", headers=headers)
+
+
+def _ui_view(renderer_name):
+    @require_safe
+    def view(request):
+        # Where drf_yasg's UI views served the schema.
+        if request.GET.get("format") == "openapi":
+            return schema_view(request)
+
+        from drf_yasg import renderers
+
+        renderer = getattr(renderers, renderer_name)()
+        context = {"request": request}
+        renderer.set_context(context)
+        context.update(title=TITLE, version=VERSION)
+        return HttpResponse(render_to_string(renderer.template, context, request))
+
+    return view
+
+
+swagger_ui = _ui_view("SwaggerUIRenderer")
+redoc_ui = _ui_view("ReDocRenderer")
@@ -0,0 +1,57 @@
+"""
+Read-replica routing.
+
+When a "replica" database is configured (DB_REPLICA_HOST or
+DB_REPLICA_NAME), the reads of the aggregate analytics endpoints go to it:
+cached_analytics and acached_analytics run their view inside
+replica_reads(). Everything else - writes, ingestion, authentication,
+the sales list and uploads - stays on the primary, and without a replica
+every query uses "default".
+
+The flag is a context variable, so it follows the request into
+sync_to_async threads and the batch pool (which copy the context) and
+into nothing else. Analytics answered from the replica can trail the
+primary by the replication delay, and the response cache is keyed by the
+dataset version bumped on the primary, so such responses are only cached
+for ANALYTICS_REPLICA_CACHE_TIMEOUT (datasets/cache.py).
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+
+REPLICA = "replica"
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Send the ORM reads made inside the block to the replica, if any."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def has_replica():
+    return REPLICA in settings.DATABASES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and has_replica():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary.
+        return db != REPLICA
@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.metrics.RequestMetricsMiddleware",
+    "backend.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -83,6 +85,11 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# backend/asgi.py sets DJANGO_ASGI. There each request runs in its own
+# context and opens its own connections, which persistent connections
+# would pile up rather than reuse, so they are off by default.
+ASGI = config("DJANGO_ASGI", default=False, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': config("DB_ENGINE", default="django.db.backends.sqlite3"),
@@ -91,9 +98,36 @@ DATABASES = {
         'PASSWORD': config("DB_PASSWORD", default=""),
         'HOST': config("DB_HOST", default=""),
         'PORT': config("DB_PORT", default=""),
+        # Keep connections open for this many seconds instead of reconnecting
+        # on every request (0 closes them after each request, None never
+        # does), checking them before reuse so a dropped one is replaced.
+        # 60 by default, 0 under ASGI.
+        'CONN_MAX_AGE': config(
+            "DB_CONN_MAX_AGE",
+            default="0" if ASGI else "60",
+            cast=lambda value: None if value.lower() == "none" else int(value),
+        ),
+        'CONN_HEALTH_CHECKS': config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
     }
 }
 
+# A read replica for the aggregate analytics endpoints (backend/routers.py).
+# Set DB_REPLICA_HOST and/or DB_REPLICA_NAME; other connection settings
+# default to the primary's. Writes, ingestion and everything else use the
+# primary.
+if config("DB_REPLICA_HOST", default="") or config("DB_REPLICA_NAME", default=""):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": config("DB_REPLICA_NAME", default=DATABASES["default"]["NAME"]),
+        "USER": config("DB_REPLICA_USER", default=DATABASES["default"]["USER"]),
+        "PASSWORD": config("DB_REPLICA_PASSWORD", default=DATABASES["default"]["PASSWORD"]),
+        "HOST": config("DB_REPLICA_HOST", default=DATABASES["default"]["HOST"]),
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["backend.routers.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,9 +167,83 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = config("MEDIA_URL", default="/media/")
 MEDIA_ROOT = config("MEDIA_ROOT", default=os.path.join(BASE_DIR, "media"))
 
+# CSV uploads are streamed into the Sales table this many rows at a time.
+CSV_INGEST_CHUNK_SIZE = config("CSV_INGEST_CHUNK_SIZE", default=10000, cast=int)
+CSV_INGEST_BATCH_SIZE = config("CSV_INGEST_BATCH_SIZE", default=1000, cast=int)
+# Processes parsing and validating each CSV file; 1 reads it in-process.
+CSV_INGEST_WORKERS = config("CSV_INGEST_WORKERS", default=1, cast=int)
+# Rows fetched per query by the streaming sales export.
+SALES_EXPORT_BATCH_SIZE = config("SALES_EXPORT_BATCH_SIZE", default=5000, cast=int)
+# Largest part accepted by a resumable upload session (/api/uploads/).
+UPLOAD_PART_MAX_SIZE = config("UPLOAD_PART_MAX_SIZE", default=64 * 1024 * 1024, cast=int)
+# "queue" hands uploads to `manage.py ingest_worker`; "inline" loads them
+# inside the upload request.
+CSV_INGEST_MODE = config("CSV_INGEST_MODE", default="queue")
+# A running job that has not reported progress for this many seconds is taken
+# to have lost its worker (crashed or killed) and is queued again, up to
+# CSV_INGEST_MAX_ATTEMPTS claims in all; then it is marked failed. Keep it
+# well above the time one chunk takes to load.
+CSV_INGEST_JOB_TIMEOUT = config("CSV_INGEST_JOB_TIMEOUT", default=600, cast=int)
+CSV_INGEST_MAX_ATTEMPTS = config("CSV_INGEST_MAX_ATTEMPTS", default=3, cast=int)
+
 STATIC_URL = config("STATIC_URL", default="/static/")
 STATIC_ROOT = config("STATIC_ROOT", default=os.path.join(BASE_DIR, "staticfiles"))
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Analytics responses are cached until the next sales write. The cache must
+# be shared between the web and ingestion worker processes, so use "file"
+# (one host) or "redis" (set ANALYTICS_CACHE_LOCATION to a redis:// URL and
+# install the redis package); "locmem" only suits a single process.
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+ANALYTICS_CACHE_ALIAS = "analytics"
+# "sql" answers analytics from the rollup table; "columnar" from an in-memory
+# numpy snapshot of it kept by each process (see datasets/columnar.py).
+ANALYTICS_ENGINE = config("ANALYTICS_ENGINE", default="sql")
+# Threads (each with its own database connection, kept for CONN_MAX_AGE) running
+# the queries of /api/analytics/batch/ requests, shared by all requests of the
+# process; 1 runs them one after another in the request. SQLite does not
+# answer reads in parallel, so it gets no threads by default.
+ANALYTICS_BATCH_WORKERS = config(
+    "ANALYTICS_BATCH_WORKERS",
+    default=1 if DATABASES["default"]["ENGINE"].endswith("sqlite3") else 4,
+    cast=int,
+)
+ANALYTICS_CACHE_TIMEOUT = config("ANALYTICS_CACHE_TIMEOUT", default=3600, cast=int)
+# Responses computed on the read replica may miss rows it has not
+# replicated yet, while the dataset version already counts them; this
+# shorter timeout bounds how long such a response is served (0 stops
+# caching them).
+ANALYTICS_REPLICA_CACHE_TIMEOUT = config("ANALYTICS_REPLICA_CACHE_TIMEOUT", default=30, cast=int)
+
+# Request metrics (backend/metrics.py): per-route histograms served at /metrics
+# and a Server-Timing header on every response. Set METRICS_TOKEN to require
+# "Authorization: Bearer <token>" on /metrics.
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_SERVER_TIMING = config("METRICS_SERVER_TIMING", default=True, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are sent with Brotli (when
+# the brotli package is installed) or gzip, as the client's Accept-Encoding
+# allows (backend/compression.py).
+COMPRESSION_ENABLED = config("COMPRESSION_ENABLED", default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", default=1024, cast=int)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    ANALYTICS_CACHE_ALIAS: {
+        "BACKEND": CACHE_BACKENDS[config("ANALYTICS_CACHE_BACKEND", default="file")],
+        "LOCATION": config("ANALYTICS_CACHE_LOCATION", default=os.path.join(BASE_DIR, "cache", "analytics")),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -143,8 +251,13 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 REST_FRAMEWORK = {
+    # orjson-based JSON (backend/renderers.py); the browsable API stays available.
+    "DEFAULT_RENDERER_CLASSES": (
+        "backend.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -159,6 +272,19 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Users resolved from JWTs are kept in memory per process for this many
+# seconds (0 disables), up to AUTH_USER_CACHE_SIZE users.
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=30, cast=int)
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1024, cast=int)
+
+# The OpenAPI schema served at /swagger.json and by the docs pages
+# (backend/openapi.py). Point this at the file written by
+# `manage.py generate_openapi` on deploy; left empty, each process builds
+# the schema on its first docs request.
+OPENAPI_SCHEMA_FILE = config("OPENAPI_SCHEMA_FILE", default="")
+SWAGGER_SETTINGS = {"SPEC_URL": "openapi-schema"}
+REDOC_SETTINGS = {"SPEC_URL": "openapi-schema"}
+
 CORS_ALLOW_ALL_ORIGINS = True 
 MIDDLEWARE.insert(0, 'corsheaders.middleware.CorsMiddleware')
 CORS_ALLOWED_ORIGINS = [
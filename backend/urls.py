@@ -2,32 +2,9 @@ from django.contrib import admin
 from django.urls import path, include,re_path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from accounts.views import RegisterView
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 from django.conf import settings
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Amazon Sales Dashboard API",
-        default_version="v1",
-        description="""
-        This documentation provides details about the API endpoints 
-        for the Amazon Sales Dashboard project.
-
-        **Key Features:**
-        - Upload CSV files
-        - Track upload logs
-        - Manage sales and reports
-        """,
-        terms_of_service="https://yourdomain.com/terms/",
-        contact=openapi.Contact(email="pankaj.bhaltilak.1@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
-
+from backend.metrics import metrics_view
+from backend.openapi import redoc_ui, schema_view, swagger_ui
 
 
 urlpatterns = [
@@ -36,8 +13,10 @@ urlpatterns = [
     path("api/auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/", include("datasets.urls")),
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    re_path(r'^redoc/$', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path("metrics", metrics_view, name="metrics"),
+    path("swagger.json", schema_view, name="openapi-schema"),
+    re_path(r'^swagger/$', swagger_ui, name='schema-swagger-ui'),
+    re_path(r'^redoc/$', redoc_ui, name='schema-redoc'),
 ]
 
 
@@ -0,0 +1,56 @@
+"""
+Latency of the dashboard aggregations under each analytics engine: SQL
+over the rollup table against the in-memory columnar snapshot. The
+snapshot build (paid once per dataset version and process) is reported
+separately.
+
+    python -m benchmarks.analytics --rows 1000000
+"""
+import argparse
+import json
+import time
+
+from .common import ensure_sales, measure, setup_django
+
+QUERIES = {
+    "kpi_summary": lambda engine: engine.kpi_summary(),
+    "sales_trend": lambda engine: engine.sales_trend_data(),
+    "sales_by_category": lambda engine: engine.sales_by_category_data(),
+    "orders_by_status": lambda engine: engine.orders_by_status_data(),
+    "sales_by_region": lambda engine: engine.sales_by_region_data("city"),
+    "top_cities": lambda engine: engine.top_cities_data(limit=10),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from datasets import analytics, columnar
+    from datasets.cache import dataset_version
+
+    ensure_sales(args.rows)
+    started = time.perf_counter()
+    columnar.Snapshot(dataset_version())
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"columnar snapshot build: {build_ms:,.1f} ms")
+
+    results = {"snapshot_build_ms": round(build_ms, 3), "queries": []}
+    print(f"{'query':<20}{'sql ms':>12}{'columnar ms':>14}{'speedup':>10}")
+    for name, query in QUERIES.items():
+        sql = measure(lambda: query(analytics), repeat=args.repeat)
+        col = measure(lambda: query(columnar), repeat=args.repeat)
+        print(f"{name:<20}{sql['median_ms']:>12.2f}{col['median_ms']:>14.2f}{sql['median_ms'] / col['median_ms']:>9.1f}x")
+        results["queries"].append({"query": name, "sql": sql, "columnar": col})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Database round-trips of a dashboard load (the six requests of
+benchmarks.dashboard) with the JWT user cache on and off, and the time
+a load takes with the analytics cache warm, where authentication is a
+visible share of each request.
+
+    python -m benchmarks.auth --loads 20
+"""
+import argparse
+import json
+
+from .common import ensure_sales, measure, setup_django
+from .dashboard import ENDPOINTS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--loads", type=int, default=20, help="Dashboard loads per setting.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from accounts.authentication import user_cache
+
+    ensure_sales(args.rows)
+    user, _ = User.objects.get_or_create(username="benchmark")
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    def load():
+        for url in ENDPOINTS:
+            assert client.get(url).status_code == 200
+
+    results = {}
+    print(f"{'user cache':<12}{'queries/load':>14}{'user queries/load':>19}{'median ms/load':>16}")
+    for label, timeout in (("off", 0), ("on", settings.AUTH_USER_CACHE_TIMEOUT or 30)):
+        with override_settings(ALLOWED_HOSTS=["*"], AUTH_USER_CACHE_TIMEOUT=timeout):
+            user_cache.clear()
+            load()  # Primes the analytics cache (and the user cache).
+            user_cache.clear()
+            # request_started resets connection.queries, so collect them here.
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                for _ in range(args.loads):
+                    load()
+            timing = measure(load, repeat=args.repeat)
+        total = len(queries) / args.loads
+        users = sum('FROM "auth_user"' in sql for sql in queries) / args.loads
+        results[label] = {"queries_per_load": total, "user_queries_per_load": users, **timing}
+        print(f"{label:<12}{total:>14.2f}{users:>19.2f}{timing['median_ms']:>16.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
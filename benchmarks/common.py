@@ -0,0 +1,67 @@
+"""
+Shared setup for the scripts in this package. Run them from the project
+root, e.g. `python -m benchmarks.indexes --rows 2000000`.
+
+Benchmarks use the database configured through the usual DB_* settings.
+When DB_NAME is not set they default to a throwaway SQLite file so a
+development database is never filled with synthetic rows; point DB_ENGINE
+and friends at a MySQL server to benchmark that backend instead.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), "sales_benchmark.sqlite3")
+
+
+def setup_django(migrate=True):
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DB_NAME", DEFAULT_DB)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+    import django
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+
+def ensure_sales(rows, seed=0):
+    """Top the sales table up to `rows` synthetic rows."""
+    from datasets.models import Sales
+    from datasets.synthetic import generate_sales, next_synthetic_id
+
+    existing = Sales.objects.count()
+    if existing >= rows:
+        return existing
+
+    started = time.perf_counter()
+
+    def report(inserted):
+        rate = inserted / (time.perf_counter() - started)
+        print(f"\r  generated {existing + inserted:,} / {rows:,} rows ({rate:,.0f} rows/s)", end="", flush=True)
+
+    generate_sales(rows - existing, seed=seed, first_id=next_synthetic_id(), progress=report)
+    print()
+    return rows
+
+
+def measure(fn, repeat=5, warmup=1):
+    """Run `fn` and return timing stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
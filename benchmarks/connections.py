@@ -0,0 +1,99 @@
+"""
+Per-request latency with a new database connection per request
+(DB_CONN_MAX_AGE=0, the old behaviour) and with persistent connections,
+and with the analytics reads routed to a replica alias.
+
+Each setting starts gunicorn with one sync worker and sends requests one
+at a time, so the numbers are the latency of a single request, connection
+setup included where there is one:
+
+    python -m benchmarks.connections --duration 20 --clients 1
+    DB_ENGINE=django.db.backends.mysql DB_NAME=bench DB_USER=... python -m benchmarks.connections
+
+With SQLite the "replica" is the same file opened under a second alias
+(a stand-in for a MySQL replica: it shows the routing cost, not the offload).
+Set DB_REPLICA_HOST/DB_REPLICA_NAME to point at a real one. The analytics
+response cache is disabled so every request reaches the database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+
+from .common import DEFAULT_DB, ROOT, ensure_sales, setup_django
+from .loadtest import ENDPOINTS, run_level, wait_for_port
+
+SETTINGS = {
+    "per-request": {"DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_CONN_MAX_AGE": "60"},
+    "replica": {"DB_CONN_MAX_AGE": "60"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=["kpi", "category"])
+    parser.add_argument("--settings", nargs="+", choices=SETTINGS, default=list(SETTINGS))
+    parser.add_argument("--clients", type=int, default=1, help="Concurrent clients (1 measures plain latency).")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per endpoint and setting.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    ensure_sales(args.rows)
+    user, _ = User.objects.get_or_create(username="benchmark")
+    token = AccessToken.for_user(user)
+
+    base = {
+        **os.environ,
+        "DB_NAME": os.environ.get("DB_NAME", DEFAULT_DB),
+        "DJANGO_SETTINGS_MODULE": "backend.settings",
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "ANALYTICS_CACHE_TIMEOUT": "0",
+    }
+
+    results = []
+    print(f"{'setting':<13}{'endpoint':<10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'mean ms':>9}{'errors':>8}")
+    for setting in args.settings:
+        env = {**base, **SETTINGS[setting]}
+        if setting == "replica":
+            env.setdefault("DB_REPLICA_NAME", env["DB_NAME"])
+        else:
+            env.pop("DB_REPLICA_HOST", None)
+            env.pop("DB_REPLICA_NAME", None)
+        command = ["gunicorn", "backend.wsgi", "--worker-class", "sync", "-w", "1", "-b", f"127.0.0.1:{args.port}"]
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(args.port, process)
+            for endpoint in args.endpoints:
+                raw = (
+                    f"GET /api/{ENDPOINTS[endpoint]} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                    f"Authorization: Bearer {token}\r\nAccept: application/json\r\n\r\n"
+                ).encode()
+                asyncio.run(run_level(args.port, raw, 1, 1))  # warm up
+                result = {
+                    "setting": setting, "endpoint": endpoint,
+                    **asyncio.run(run_level(args.port, raw, args.clients, args.duration)),
+                }
+                results.append(result)
+                print(
+                    f"{setting:<13}{endpoint:<10}{result['req_per_sec']:>9,.1f}{result['p50_ms'] or 0:>9.2f}"
+                    f"{result['p99_ms'] or 0:>9.2f}{result['mean_ms'] or 0:>9.2f}{result['errors']:>8}"
+                )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
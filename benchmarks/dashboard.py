@@ -0,0 +1,76 @@
+"""
+Cold dashboard load: the six analytics requests the frontend makes on
+every page load against one /api/analytics/batch/ request, serial and
+threaded. Requests go through the full Django stack with a real JWT;
+the analytics cache is invalidated before every load so each one hits
+the engine.
+
+    python -m benchmarks.dashboard --rows 1000000 --workers 1 4
+"""
+import argparse
+import json
+
+from .common import ensure_sales, measure, setup_django
+
+ENDPOINTS = [
+    "/api/analytics/kpi/",
+    "/api/sales-trend/",
+    "/api/sales-by-category/",
+    "/api/orders-by-status/",
+    "/api/sales/region/?level=state",
+    "/api/sales/top-cities/?limit=10",
+]
+WIDGETS = {
+    "kpi": {"type": "kpi"},
+    "trend": {"type": "sales_trend"},
+    "categories": {"type": "sales_by_category"},
+    "statuses": {"type": "orders_by_status"},
+    "regions": {"type": "sales_by_region", "level": "state"},
+    "cities": {"type": "top_cities", "limit": 10},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from datasets.cache import bump_dataset_version
+
+    ensure_sales(args.rows)
+    user, _ = User.objects.get_or_create(username="benchmark")
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    def separate():
+        bump_dataset_version()
+        for url in ENDPOINTS:
+            assert client.get(url).status_code == 200
+
+    def batched():
+        bump_dataset_version()
+        response = client.post("/api/analytics/batch/", {"widgets": WIDGETS}, content_type="application/json")
+        assert response.status_code == 200
+
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        results = {"separate": measure(separate, repeat=args.repeat)}
+        print(f"{'six requests':<24}{results['separate']['median_ms']:>10.1f} ms")
+        for workers in args.workers:
+            with override_settings(ANALYTICS_BATCH_WORKERS=workers):
+                results[f"batch_{workers}"] = measure(batched, repeat=args.repeat)
+            print(f"{f'batch, {workers} worker(s)':<24}{results[f'batch_{workers}']['median_ms']:>10.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
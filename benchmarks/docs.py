@@ -0,0 +1,84 @@
+"""
+Worker boot time and the cost of API docs requests.
+
+Boot: a fresh interpreter running what a worker does before its first
+request (django.setup() and importing the URLconf), and the time the
+swagger overrides (datasets.docs and drf_yasg) add when they are
+imported at boot, as `from .docs import *` in datasets/views.py used to.
+
+Docs requests: building the schema, which drf_yasg's views did on every
+/swagger/ and /redoc/ hit, against serving the built schema and
+answering a revalidation with 304.
+
+    python -m benchmarks.docs --boots 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from .common import ROOT, measure, setup_django
+
+BOOT = "import django; django.setup(); import backend.urls"
+DOCS = "from backend.openapi import apply_docs; apply_docs()"
+
+
+def boot_ms(code, boots):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings"}
+    script = f"import time; started = time.perf_counter(); {code}; print((time.perf_counter() - started) * 1000)"
+    samples = [
+        float(subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True,
+                             capture_output=True, text=True).stdout)
+        for _ in range(boots)
+    ]
+    # The fastest start: the least disturbed by the rest of the machine.
+    return round(min(samples), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boots", type=int, default=10, help="Interpreters started per measurement.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    boot = boot_ms(BOOT, args.boots)
+    with_docs = boot_ms(f"{BOOT}; {DOCS}", args.boots)
+    print(f"{'boot (setup + URLconf)':<36}{boot:>9.1f} ms")
+    print(f"{'boot with the docs imported':<36}{with_docs:>9.1f} ms  ({with_docs - boot:+.1f} ms)")
+
+    setup_django(migrate=False)
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    import backend.urls  # noqa: F401 (registers the documented views)
+    from backend import openapi
+
+    started = time.perf_counter()
+    openapi.apply_docs()
+    first_build = (time.perf_counter() - started) * 1000
+    url = reverse("openapi-schema")
+    client = Client()
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        build = measure(openapi.generate_schema, repeat=args.repeat)
+        openapi.get_schema.cache_clear()
+        etag = client.get(url)["ETag"]
+        served = measure(lambda: client.get(url), repeat=args.repeat)
+        revalidated = measure(lambda: client.get(url, headers={"If-None-Match": etag}), repeat=args.repeat)
+    print(f"{'import and apply the docs':<36}{first_build:>9.1f} ms")
+    print(f"{'build the schema (each hit before)':<36}{build['median_ms']:>9.1f} ms")
+    print(f"{'serve the built schema':<36}{served['median_ms']:>9.2f} ms")
+    print(f"{'revalidate (304)':<36}{revalidated['median_ms']:>9.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "boot_ms": boot, "boot_with_docs_ms": with_docs, "import_docs_ms": round(first_build, 1),
+                "build_schema": build, "serve_schema": served, "revalidate": revalidated,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
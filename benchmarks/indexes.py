@@ -0,0 +1,156 @@
+"""
+Query plans and timings of the queries the API runs, with and without
+the indexes declared on Sales.Meta and SalesDailyRollup.Meta: the
+dashboard's filtered aggregations over the rollup, and the sales list
+and export pages over the sales table.
+
+    python -m benchmarks.indexes --rows 2000000 --output indexes.json
+
+Runs against SQLite by default (see benchmarks/common.py); set DB_ENGINE,
+DB_NAME, DB_USER, ... to run the same comparison on MySQL.
+"""
+import argparse
+import json
+import time
+from datetime import timedelta
+
+from .common import ensure_sales, measure, setup_django
+
+MODELS = ("Sales", "SalesDailyRollup")
+
+
+def query_shapes():
+    from django.conf import settings
+    from django.db.models import Count, Max
+
+    from datasets import analytics
+    from datasets.models import Sales, SalesDailyRollup
+
+    def typical(field):
+        # The median value by row count: a drill-down, neither the largest
+        # group (where a scan wins anyway) nor a rare one.
+        values = list(
+            SalesDailyRollup.objects.values(field).annotate(n=Count("id")).order_by("-n")
+            .values_list(field, flat=True)
+        )
+        return values[len(values) // 2]
+
+    last_day = SalesDailyRollup.objects.aggregate(last=Max("order_date"))["last"]
+    last_30_days = {"order_date__gte": last_day - timedelta(days=30), "order_date__lte": last_day}
+    category, status, state, city = (typical(field) for field in ("category", "status", "ship_state", "ship_city"))
+
+    def totals(keys, filters):
+        return analytics._totals_query(keys, filters)[0]
+
+    return {
+        # Dashboard widgets (SalesDailyRollup), as analytics.group_totals builds them.
+        "categories": lambda: totals(["category"], {}),
+        "categories_last_30_days": lambda: totals(["category"], last_30_days),
+        "trend_in_state": lambda: totals(["day"], {"ship_state": state}),
+        "status_in_city": lambda: totals(["status"], {"ship_city": city}),
+        "states_in_category": lambda: totals(["ship_state"], {"category": category}),
+        "cities_by_status": lambda: totals(["ship_city", "ship_state"], {"status": status}),
+        # Sales list pages and export batches (Sales), in id order.
+        "list_city_page": lambda: Sales.objects.filter(ship_city=city).order_by("id")[:20],
+        "list_last_30_days_keyset": lambda: Sales.objects.filter(**last_30_days).order_by("order_date", "id")[:20],
+        "export_city_batch": lambda: Sales.objects.filter(ship_city=city)
+        .order_by("id")[:settings.SALES_EXPORT_BATCH_SIZE],
+        "export_state_batch": lambda: Sales.objects.filter(ship_state=state)
+        .order_by("id")[:settings.SALES_EXPORT_BATCH_SIZE],
+    }
+
+
+def write_rate(rows, seed):
+    """Rows per second of loading `rows` new sales with their rollup."""
+    from datasets.synthetic import generate_sales, next_synthetic_id
+
+    started = time.perf_counter()
+    generate_sales(rows, seed=seed, first_id=next_synthetic_id())
+    return round(rows / (time.perf_counter() - started))
+
+
+def analyze():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute("ANALYZE TABLE sales, sales_daily_rollup")
+        else:
+            cursor.execute("ANALYZE")
+
+
+def set_indexes(enabled):
+    from django.apps import apps
+    from django.db import connection
+
+    for model in (apps.get_model("datasets", name) for name in MODELS):
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        with connection.schema_editor() as editor:
+            for index in model._meta.indexes:
+                if enabled and index.name not in existing:
+                    editor.add_index(model, index)
+                elif not enabled and index.name in existing:
+                    editor.remove_index(model, index)
+    analyze()
+
+
+def run_shapes(shapes, repeat):
+    results = {}
+    for name, build in shapes.items():
+        results[name] = {
+            "plan": build().explain(),
+            **measure(lambda: list(build()), repeat=repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--write-rows", type=int, default=20000, help="Sales loaded to time the write cost.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    print(f"Preparing {args.rows:,} sales rows on {connection.vendor} ({connection.settings_dict['NAME']})")
+    rows = ensure_sales(args.rows)
+    shapes = query_shapes()
+
+    print("Dropping the indexes")
+    set_indexes(False)
+    before = run_shapes(shapes, args.repeat)
+    print("Creating the indexes")
+    set_indexes(True)
+    after = run_shapes(shapes, args.repeat)
+    # Writes last, so both query runs see the same rows.
+    print(f"Loading {args.write_rows:,} rows with and without the indexes")
+    writes_after = write_rate(args.write_rows, seed=1)
+    set_indexes(False)
+    writes_before = write_rate(args.write_rows, seed=2)
+    set_indexes(True)
+
+    print(f"\n{'query':<30}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in shapes:
+        old, new = before[name]["median_ms"], after[name]["median_ms"]
+        print(f"{name:<30}{old:>12.1f}{new:>12.1f}{old / new if new else 0:>9.1f}x")
+    print(f"{'load (rows/s)':<30}{writes_before:>12,}{writes_after:>12,}{writes_after / writes_before:>9.2f}x")
+    for name in shapes:
+        print(f"\n== {name}\n-- before\n{before[name]['plan']}\n-- after\n{after[name]['plan']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "vendor": connection.vendor,
+                "rows": rows,
+                "before": before,
+                "after": after,
+                "write_rows_per_s": {"before": writes_before, "after": writes_after},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
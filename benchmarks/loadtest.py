@@ -0,0 +1,195 @@
+"""
+Load test of an analytics endpoint under WSGI and ASGI.
+
+Starts the project under each server in turn, then holds N concurrent
+clients (plain asyncio HTTP/1.1, keep-alive where the server allows it)
+against it for a fixed time and reports requests per second and latency
+percentiles for every concurrency level:
+
+- wsgi:      gunicorn sync workers, the sync DRF view
+- asgi:      uvicorn workers, the async view under /api/async/
+- asgi-sync: uvicorn workers, the sync DRF view (run in a thread)
+
+    python -m benchmarks.loadtest --rows 200000 --clients 100 250 500 1000 --workers 4
+
+The analytics response cache is disabled (ANALYTICS_CACHE_TIMEOUT=0)
+unless --cache is given, so every request reaches the database. Running
+the asgi servers needs uvicorn (in requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from .common import DEFAULT_DB, ROOT, ensure_sales, setup_django
+
+ENDPOINTS = {
+    "summary": "sales/summary/",
+    "kpi": "analytics/kpi/",
+    "trend": "sales-trend/?granularity=week",
+    "category": "sales-by-category/",
+    "region": "sales/region/?level=city",
+    "top-cities": "sales/top-cities/",
+}
+SERVERS = {
+    "wsgi": (["gunicorn", "backend.wsgi", "--worker-class", "sync", "-w", "{workers}", "-b", "127.0.0.1:{port}"], "/api/"),
+    "asgi": (["uvicorn", "backend.asgi:application", "--workers", "{workers}", "--port", "{port}", "--no-access-log"], "/api/async/"),
+    "asgi-sync": (["uvicorn", "backend.asgi:application", "--workers", "{workers}", "--port", "{port}", "--no-access-log"], "/api/"),
+}
+
+
+class Connection:
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, raw):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(raw)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+        if headers.get("transfer-encoding") == "chunked":
+            while size := int((await self.reader.readline()).strip(), 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        else:
+            await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection") == "close":
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def client(port, raw, deadline, latencies, errors):
+    connection = Connection(port)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = await connection.request(raw)
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+            connection.close()
+            errors.append("connection")
+            await asyncio.sleep(0.01)
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(status)
+    connection.close()
+
+
+async def run_level(port, raw, clients, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(port, raw, deadline, latencies, errors) for _ in range(clients)))
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "req_per_sec": round(len(latencies) / duration, 1),
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--servers", nargs="+", choices=SERVERS, default=["wsgi", "asgi"])
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="category")
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per concurrency level.")
+    parser.add_argument("--workers", type=int, default=4, help="Server worker processes.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="Keep the analytics response cache on.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    # Every client holds a socket open.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, max(args.clients) * 2 + 256)), hard))
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    ensure_sales(args.rows)
+    user, _ = User.objects.get_or_create(username="benchmark")
+    token = AccessToken.for_user(user)
+
+    env = {
+        **os.environ,
+        "DB_NAME": os.environ.get("DB_NAME", DEFAULT_DB),
+        "DJANGO_SETTINGS_MODULE": "backend.settings",
+        "ALLOWED_HOSTS": "127.0.0.1",
+    }
+    if not args.cache:
+        env["ANALYTICS_CACHE_TIMEOUT"] = "0"
+
+    results = []
+    print(f"{'server':<11}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for server in args.servers:
+        command, prefix = SERVERS[server]
+        command = [part.format(workers=args.workers, port=args.port) for part in command]
+        path = prefix + ENDPOINTS[args.endpoint]
+        raw = (
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Authorization: Bearer {token}\r\nAccept: application/json\r\n\r\n"
+        ).encode()
+
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(args.port, process)
+            asyncio.run(run_level(args.port, raw, 1, 1))  # warm up
+            for clients in args.clients:
+                result = {"server": server, "path": path, **asyncio.run(run_level(args.port, raw, clients, args.duration))}
+                results.append(result)
+                print(
+                    f"{server:<11}{clients:>8}{result['req_per_sec']:>10,.1f}"
+                    f"{result['p50_ms'] or 0:>10.1f}{result['p99_ms'] or 0:>10.1f}{result['errors']:>8}"
+                )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Scaling of CSV parsing and validation with CSV_INGEST_WORKERS: rows per
+second at each worker count, and a check that every count reads,
+accepts and rejects exactly the rows a single process does.
+
+    python -m benchmarks.parallel_ingest --rows 1000000 --workers 1 2 4 8
+    python -m benchmarks.parallel_ingest --rows 200000 --load
+
+With --load the whole ingestion (database writes included) is timed too,
+inside a transaction that is rolled back, so the database is left as it
+was.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from .common import setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def parse(path, workers, chunk_size):
+    from datasets.ingest import read_chunks
+
+    counts = {"rows_read": 0, "valid": 0, "errors": 0}
+    for frame, errors, rows_read in read_chunks(path, chunk_size, workers):
+        counts["rows_read"] += rows_read
+        counts["valid"] += len(frame)
+        counts["errors"] += len(errors)
+    return counts
+
+
+def load(path, workers, chunk_size):
+    from django.db import transaction
+    from datasets.ingest import ingest_csv
+
+    try:
+        with transaction.atomic():
+            result = ingest_csv(path, chunk_size=chunk_size, workers=workers)
+            raise Rollback
+    except Rollback:
+        pass
+    return {"rows_read": result.rows_read, "loaded": result.loaded, "skipped": result.skipped}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--load", action="store_true", help="Also time ingestion with database writes.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django(migrate=args.load)
+    from datasets.synthetic import write_csv
+
+    print(f"{os.cpu_count()} CPUs")
+    stages = {"parse": parse, **({"load": load} if args.load else {})}
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "sales.csv")
+        write_csv(path, args.rows, seed=1)
+        print(f"{'stage':<8}{'workers':>8}{'seconds':>10}{'rows/s':>14}{'speedup':>9}")
+        for stage, run in stages.items():
+            baseline = None
+            for workers in args.workers:
+                started = time.perf_counter()
+                counts = run(path, workers, args.chunk_size)
+                seconds = time.perf_counter() - started
+                if baseline is None:
+                    baseline = {"seconds": seconds, "counts": counts}
+                elif counts != baseline["counts"]:
+                    raise SystemExit(f"{workers} workers gave {counts}, one process {baseline['counts']}")
+                rate = args.rows / seconds
+                speedup = baseline["seconds"] / seconds
+                print(f"{stage:<8}{workers:>8}{seconds:>10.2f}{rate:>14,.0f}{speedup:>8.1f}x")
+                results.append({
+                    "stage": stage, "workers": workers, "rows": args.rows, "seconds": round(seconds, 3),
+                    "rows_per_sec": round(rate), **counts,
+                })
+        print("Row counts match the first worker count.")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
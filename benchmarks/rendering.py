@@ -0,0 +1,84 @@
+"""
+Rendering and compression of large API payloads: DRF's JSONRenderer
+against backend.renderers.ORJSONRenderer, then the time and size of the
+rendered body with gzip (what GZipMiddleware sends) and Brotli at the
+quality CompressionMiddleware uses.
+
+    python -m benchmarks.rendering --rows 100000 --sizes 10000 50000
+
+Payloads: a sales list page of each size (the sales endpoint's rows),
+daily totals per city (the aggregate endpoint) and the daily sales trend.
+"""
+import argparse
+import json
+
+from .common import ensure_sales, measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.utils.text import compress_string
+    from rest_framework.renderers import JSONRenderer
+
+    from backend.compression import BROTLI_QUALITY, brotli
+    from backend.renderers import ORJSONRenderer
+    from datasets import analytics
+    from datasets.models import Sales
+    from datasets.serializers import SALES_FIELD_NAMES, sales_row_encoder
+
+    ensure_sales(max(args.rows, *args.sizes))
+    encode = sales_row_encoder(SALES_FIELD_NAMES)
+    payloads = {}
+    for size in args.sizes:
+        payloads[f"sales page {size}"] = {
+            "next": None,
+            "previous": None,
+            "results": [encode(row) for row in Sales.objects.order_by("id").values_list(*SALES_FIELD_NAMES)[:size]],
+        }
+    payloads["day x city"] = analytics.aggregate(["day", "city"], ["sum_amount", "count", "avg_amount"])
+    payloads["daily trend"] = analytics.sales_trend_data()
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    compressors = {"gzip": lambda body: compress_string(body, max_random_bytes=100)}
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+
+    results = []
+    header = f"{'payload':<20}{'rows':>7}{'KB':>8}{'json ms':>9}{'orjson ms':>10}{'speedup':>9}"
+    print(header + "".join(f"{name + ' ms':>9}{name + ' KB':>9}" for name in compressors))
+    for label, data in payloads.items():
+        rows = len(data["results"]) if isinstance(data, dict) else len(data)
+        body = fast.render(data)
+        assert json.loads(body) == json.loads(stdlib.render(data))
+        before = measure(lambda: stdlib.render(data), repeat=args.repeat)
+        after = measure(lambda: fast.render(data), repeat=args.repeat)
+        result = {
+            "payload": label, "rows": rows, "bytes": len(body),
+            "json": before, "orjson": after, "speedup": round(before["median_ms"] / after["median_ms"], 2),
+        }
+        line = (
+            f"{label:<20}{rows:>7}{len(body) / 1024:>8,.0f}{before['median_ms']:>9.1f}"
+            f"{after['median_ms']:>10.1f}{result['speedup']:>8.1f}x"
+        )
+        for name, compress in compressors.items():
+            timing = measure(lambda: compress(body), repeat=args.repeat)
+            size = len(compress(body))
+            result[name] = {**timing, "bytes": size, "ratio": round(len(body) / size, 2)}
+            line += f"{timing['median_ms']:>9.1f}{size / 1024:>9,.0f}"
+        results.append(result)
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
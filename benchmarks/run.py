@@ -0,0 +1,230 @@
+"""
+Benchmark suite: CSV ingestion and every endpoint in datasets/urls.py at
+several table sizes, written as JSON so runs can be compared between
+commits.
+
+    python -m benchmarks.run --scales 10000 100000 1000000 --output before.json
+    python -m benchmarks.run --scales 10000 100000 1000000 --compare before.json
+
+Scales are reached in ascending order by uploading synthetic CSVs of the
+missing rows through ingest_csv, so each step also times ingestion into
+a table of the previous size (start from an empty database, or --fresh
+for the default throwaway SQLite file). Endpoints go through the full
+Django stack with a real JWT, once with the analytics cache off ("cold")
+and once with it primed ("warm"). Every timed upload posts a file with
+new content; upload-csv-file-duplicate times re-posting one already
+uploaded.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from .common import DEFAULT_DB, ROOT, measure, setup_django
+from .dashboard import WIDGETS
+
+EXPORT_MONTH = {"file_format": "csv", "start_date": "2022-01-01", "end_date": "2022-01-31"}
+# How to call each route of datasets/urls.py (async-* routes reuse the
+# request of their sync counterpart): method and query/body.
+REQUESTS = {
+    "sales-list": ("get", {}),
+    "sales-summary": ("get", {}),
+    "sales-export": ("get", EXPORT_MONTH),
+    "sales-kpi": ("get", {}),
+    "analytics-aggregate": ("get", {"group_by": "month,category", "metrics": "sum_amount,count"}),
+    "analytics-batch": ("post", {"widgets": WIDGETS}),
+    "sales-trend": ("get", {}),
+    "sales-by-category": ("get", {}),
+    "orders-by-status": ("get", {}),
+    "sales-by-region": ("get", {"level": "city"}),
+    "top-cities": ("get", {"limit": 10}),
+    "upload-csv-file": ("upload", {}),
+    "csv-upload-job": ("get", {}),
+    "csv-upload-logs": ("get", {}),
+}
+UPLOAD_ROWS = 1000
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def routes():
+    """(url name, URLPattern) of every named route in datasets/urls.py."""
+    from datasets.urls import urlpatterns
+    return [(pattern.name, pattern) for pattern in urlpatterns if pattern.name]
+
+
+def ingest(scale, workdir):
+    """Top the sales table up to `scale` rows through ingest_csv; None when already there."""
+    from datasets.ingest import ingest_csv
+    from datasets.models import Sales
+    from datasets.synthetic import next_synthetic_id, write_csv
+
+    missing = scale - Sales.objects.count()
+    if missing <= 0:
+        return None
+    path = os.path.join(workdir, f"sales_{scale}.csv")
+    write_csv(path, missing, seed=scale, first_id=next_synthetic_id())
+    started = time.perf_counter()
+    result = ingest_csv(path)
+    seconds = time.perf_counter() - started
+    os.remove(path)
+    return {"rows": result.loaded, "seconds": round(seconds, 3), "rows_per_sec": round(result.loaded / seconds)}
+
+
+def upload_files(workdir, count, seeds):
+    """
+    Paths of `count` new synthetic CSVs. Each has content never uploaded
+    before, so posting it times ingestion rather than the duplicate check.
+    """
+    from datasets.synthetic import write_csv
+
+    paths = []
+    for seed in itertools.islice(seeds, count):
+        path = os.path.join(workdir, f"upload_{seed}.csv")
+        write_csv(path, UPLOAD_ROWS, seed=seed)
+        paths.append(path)
+    return paths
+
+
+def endpoint_calls(client, uploads):
+    """
+    {name: callable issuing that route's request}, and the routes without
+    a request. Each upload posts the next file of `uploads`; the
+    duplicate-upload case posts the first one again.
+    """
+    from django.urls import reverse
+
+    calls, skipped = {}, []
+    job_id = None
+    uploads = iter(uploads)
+    first_upload = None
+    for name, pattern in routes():
+        method, params = REQUESTS.get(name.removeprefix("async-"), (None, None))
+        if method is None:
+            skipped.append(name)
+            continue
+
+        def call(name=name, method=method, params=params, needs_job="job_id" in pattern.pattern.converters):
+            url = reverse(name, kwargs={"job_id": job_id} if needs_job else {})
+            if method == "upload":
+                with open(next(uploads), "rb") as f:
+                    response = client.post(url, {"file": f})
+            elif method == "duplicate":
+                with open(first_upload, "rb") as f:
+                    response = client.post(url, {"file": f})
+            elif method == "post":
+                response = client.post(url, params, content_type="application/json")
+            else:
+                response = client.get(url, params)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name} answered {response.status_code}")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+        calls[name] = call
+
+    # The job detail route needs an upload to look at.
+    if "upload-csv-file" in calls:
+        first_upload = next(uploads)
+        with open(first_upload, "rb") as f:
+            job_id = client.post(reverse("upload-csv-file"), {"file": f}).json()["job_id"]
+        calls["upload-csv-file-duplicate"] = lambda: calls["upload-csv-file"](method="duplicate")
+    return calls, skipped
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["name"], r["case"]): r for r in json.load(f)["results"]}
+    print(f"\n{'scale':>10}  {'benchmark':<36}{'before':>12}{'after':>12}{'change':>9}")
+    for result in results:
+        before = baseline.get((result["scale"], result["name"], result["case"]))
+        if before is None:
+            continue
+        metric = "seconds" if result["case"] == "ingest" else "median_ms"
+        change = result[metric] / before[metric] - 1 if before[metric] else 0
+        print(
+            f"{result['scale']:>10,}  {result['name'] + ' (' + result['case'] + ')':<36}"
+            f"{before[metric]:>12,.2f}{result[metric]:>12,.2f}{change:>+9.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Only run these route names.")
+    parser.add_argument("--fresh", action="store_true", help="Delete the default benchmark database first.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Print the change against a previous --output file.")
+    args = parser.parse_args()
+
+    if args.fresh and "DB_NAME" not in os.environ and os.path.exists(DEFAULT_DB):
+        os.remove(DEFAULT_DB)
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import Client, override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username="benchmark")
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    meta = {
+        "revision": git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": connection.vendor,
+        "analytics_engine": settings.ANALYTICS_ENGINE,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+    }
+
+    results = []
+    print(f"{'scale':>10}  {'benchmark':<36}{'median':>12}")
+    with tempfile.TemporaryDirectory() as workdir, override_settings(
+        ALLOWED_HOSTS=["*"], MEDIA_ROOT=workdir, CSV_INGEST_MODE="queue",
+    ):
+        seeds = itertools.count(1)
+
+        for scale in sorted(args.scales):
+            ingested = ingest(scale, workdir)
+            if ingested:
+                results.append({"scale": scale, "name": "csv-ingest", "case": "ingest", **ingested})
+                print(f"{scale:>10,}  {'csv-ingest':<36}{ingested['rows_per_sec']:>12,} rows/s")
+
+            # The priming upload, then warmup and repeats of both cases.
+            uploads = upload_files(workdir, 1 + 2 * (args.repeat + 1), seeds)
+            calls, skipped = endpoint_calls(client, uploads)
+            for name, call in calls.items():
+                if args.only and name not in args.only:
+                    continue
+                for case, timeout in (("cold", 0), ("warm", settings.ANALYTICS_CACHE_TIMEOUT)):
+                    with override_settings(ANALYTICS_CACHE_TIMEOUT=timeout):
+                        timing = measure(call, repeat=args.repeat)
+                    results.append({"scale": scale, "name": name, "case": case, **timing})
+                    print(f"{scale:>10,}  {f'{name} ({case})':<36}{timing['median_ms']:>9,.1f} ms")
+            if skipped:
+                print(f"  no request defined for: {', '.join(skipped)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Rows per second of the sales list encoding: SalesSerializer over model
+instances against the values_list fast path used by SalesListView. The
+serializer always renders every field, as the endpoint did before
+sparse fieldsets existed.
+
+    python -m benchmarks.serialization --sizes 20 100 1000 10000
+"""
+import argparse
+import json
+
+from .common import ensure_sales, measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000, 10000])
+    parser.add_argument("--fields", default="", help="Sparse fieldset to benchmark as well, e.g. order_id,amount")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django()
+    from datasets.models import Sales
+    from datasets.serializers import SALES_FIELD_NAMES, SalesSerializer, sales_row_encoder
+
+    ensure_sales(max(args.sizes))
+    queryset = Sales.objects.order_by("id")
+    variants = {"all fields": SALES_FIELD_NAMES}
+    if args.fields:
+        variants[args.fields] = args.fields.split(",")
+
+    results = []
+    print(f"{'fields':<24}{'page size':>10}{'serializer rows/s':>20}{'fast path rows/s':>20}{'speedup':>10}")
+    for label, fields in variants.items():
+        encode = sales_row_encoder(fields)
+        for size in args.sizes:
+            def serializer():
+                return SalesSerializer(queryset[:size], many=True).data
+
+            def fast_path():
+                return [encode(row) for row in queryset.values_list(*fields)[:size]]
+
+            slow = measure(serializer, repeat=args.repeat)
+            fast = measure(fast_path, repeat=args.repeat)
+            slow_rate = size / (slow["median_ms"] / 1000)
+            fast_rate = size / (fast["median_ms"] / 1000)
+            print(f"{label[:23]:<24}{size:>10}{slow_rate:>20,.0f}{fast_rate:>20,.0f}{fast_rate / slow_rate:>9.1f}x")
+            results.append({
+                "fields": label,
+                "page_size": size,
+                "serializer": {**slow, "rows_per_sec": round(slow_rate)},
+                "fast_path": {**fast, "rows_per_sec": round(fast_rate)},
+            })
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Rows per second of the CSV validation stage (prepare_frame) on synthetic
+chunks, optionally with a share of broken values. No database needed.
+
+    python -m benchmarks.validation --rows 200000 --invalid 0 0.01 0.1
+"""
+import argparse
+import json
+import tempfile
+
+import numpy as np
+
+from .common import measure, setup_django
+
+# Broken values injected per column, as a CSV would carry them.
+BROKEN = {
+    "Date": "31-31-22",
+    "Qty": "1.5",
+    "Amount": "n/a",
+    "B2B": "maybe",
+    "ship-city": "X" * 101,
+}
+
+
+def chunk(rows, invalid, seed=0):
+    """A chunk as ingest_csv reads it from a synthetic CSV, with broken values."""
+    import pandas as pd
+    from datasets.synthetic import write_csv
+
+    with tempfile.NamedTemporaryFile(suffix=".csv") as f:
+        write_csv(f.name, rows, chunk_size=rows, seed=seed)
+        text = pd.read_csv(f.name, dtype=str)
+    rng = np.random.default_rng(seed)
+    for column, value in BROKEN.items():
+        text.loc[rng.random(rows) < invalid / len(BROKEN), column] = value
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--invalid", type=float, nargs="+", default=[0, 0.01, 0.1], help="Share of broken rows.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    setup_django(migrate=False)
+    from datasets.ingest import prepare_frame
+
+    results = []
+    print(f"{'invalid':>8}{'rows/s':>14}{'rejected':>10}{'errors':>10}")
+    for invalid in args.invalid:
+        text = chunk(args.rows, invalid)
+        valid, errors = prepare_frame(text)
+        timing = measure(lambda: prepare_frame(text), repeat=args.repeat)
+        rate = args.rows / (timing["median_ms"] / 1000)
+        rejected = args.rows - len(valid)
+        print(f"{invalid:>8.1%}{rate:>14,.0f}{rejected:>10,}{len(errors):>10,}")
+        results.append({"invalid": invalid, "rows": args.rows, "rejected": rejected, **timing, "rows_per_sec": round(rate)})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
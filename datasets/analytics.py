@@ -0,0 +1,357 @@
+"""
+Dashboard aggregations, answered from SalesDailyRollup rather than by
+grouping the raw sales table.
+
+Every breakdown goes through aggregate(), which asks the analytics
+engine for grouped totals (one query) and does the ordering, top-N and
+formatting itself. This module is also the "sql" engine; columnar.py
+implements the same engine functions (group_totals, kpi_summary and
+their async a* variants) over an in-memory snapshot.
+settings.ANALYTICS_ENGINE picks one.
+"""
+from datetime import date, timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db.models import F, Max, Min, Sum
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncWeek
+
+from .downsample import lttb
+from .models import SalesDailyRollup
+
+ENGINES = {
+    "sql": "datasets.analytics",
+    "columnar": "datasets.columnar",
+}
+
+# API name -> rollup field
+DIMENSIONS = {
+    "category": "category",
+    "status": "status",
+    "country": "ship_country",
+    "state": "ship_state",
+    "city": "ship_city",
+    "channel": "sales_channel",
+    "b2b": "b2b",
+}
+TIME_BUCKETS = {
+    "day": lambda: F("order_date"),
+    "week": lambda: TruncWeek("order_date"),
+    "month": lambda: TruncMonth("order_date"),
+    "quarter": lambda: TruncQuarter("order_date"),
+}
+METRICS = ["sum_amount", "sum_qty", "count", "avg_amount"]
+REGION_LEVELS = {name: DIMENSIONS[name] for name in ("country", "state", "city")}
+OTHER_LABEL = "Other"
+MAX_FILL_DAYS = 366 * 100
+
+
+def engine():
+    """The analytics module selected by settings.ANALYTICS_ENGINE."""
+    return import_module(ENGINES[settings.ANALYTICS_ENGINE])
+
+
+def _label(value):
+    # The rollup stores missing text dimensions as "".
+    return value or None
+
+
+def _kpi_aggregates():
+    return {
+        "total_sales": Sum("total_amount"),
+        "total_orders": Sum("order_count"),
+        "total_qty": Sum("total_qty"),
+        "min_date": Min("order_date"),
+        "max_date": Max("order_date"),
+    }
+
+
+def _kpi(stats):
+    total_sales = float(stats["total_sales"] or 0)
+    total_orders = stats["total_orders"] or 0
+    return {
+        "total_sales": total_sales,
+        "total_orders": total_orders,
+        "total_qty": stats["total_qty"] or 0,
+        "avg_order_value": round(total_sales / total_orders, 2) if total_orders else 0,
+        "min_date": stats["min_date"],
+        "max_date": stats["max_date"],
+    }
+
+
+def kpi_summary(filters=None):
+    """
+    Every headline metric in one aggregate query. `filters` are lookups
+    from filters.parse_sales_filters.
+    """
+    return _kpi(SalesDailyRollup.objects.filter(**(filters or {})).aggregate(**_kpi_aggregates()))
+
+
+async def akpi_summary(filters=None):
+    return _kpi(await SalesDailyRollup.objects.filter(**(filters or {})).aaggregate(**_kpi_aggregates()))
+
+
+def _totals_query(keys, filters):
+    """
+    The group_totals queryset (already grouped when there are keys) and
+    the value columns holding the keys.
+    """
+    qs = SalesDailyRollup.objects.filter(**(filters or {}))
+    columns = [f"bucket_{key}" if key in TIME_BUCKETS else key for key in keys]
+    if keys:
+        buckets = {f"bucket_{key}": TIME_BUCKETS[key]() for key in keys if key in TIME_BUCKETS}
+        qs = qs.annotate(**buckets).values(*columns).annotate(**_totals_aggregates()).order_by()
+    return qs, columns
+
+
+def _totals_aggregates():
+    return {"amount": Sum("total_amount"), "qty": Sum("total_qty"), "orders": Sum("order_count")}
+
+
+def _totals_rows(rows, columns):
+    return [
+        (tuple(row[column] for column in columns), int(row["amount"].scaleb(2)), row["qty"], row["orders"])
+        for row in rows
+        if row["orders"]
+    ]
+
+
+def group_totals(keys, filters=None):
+    """
+    One row per distinct combination of `keys` (rollup fields or
+    TIME_BUCKETS names): (key values, amount in cents, qty, orders), in
+    no particular order.
+    """
+    qs, columns = _totals_query(keys, filters)
+    rows = qs if keys else [qs.aggregate(**_totals_aggregates())]
+    return _totals_rows(rows, columns)
+
+
+async def agroup_totals(keys, filters=None):
+    """group_totals through the async ORM."""
+    qs, columns = _totals_query(keys, filters)
+    rows = [row async for row in qs] if keys else [await qs.aaggregate(**_totals_aggregates())]
+    return _totals_rows(rows, columns)
+
+
+def group_keys(group_by):
+    """group_totals keys for API dimension and time bucket names."""
+    return [name if name in TIME_BUCKETS else DIMENSIONS[name] for name in group_by]
+
+
+def _add(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def regroup(rows, names, subset):
+    """
+    Sum group_totals rows keyed by `names` into rows keyed by `subset`
+    (any selection of those names, in any order).
+    """
+    positions = [names.index(name) for name in subset]
+    groups = {}
+    for key, *totals in rows:
+        key = tuple(key[i] for i in positions)
+        groups[key] = _add(groups.get(key, (0, 0, 0)), totals)
+    return [(key, *totals) for key, totals in groups.items()]
+
+
+def kpi_from_totals(rows, names):
+    """kpi_summary computed from group_totals rows that include a "day" key."""
+    day = names.index("day")
+    total_sales = sum(row[1] for row in rows) / 100
+    total_orders = sum(row[3] for row in rows)
+    return {
+        "total_sales": total_sales,
+        "total_orders": total_orders,
+        "total_qty": sum(row[2] for row in rows),
+        "avg_order_value": round(total_sales / total_orders, 2) if total_orders else 0,
+        "min_date": min((row[0][day] for row in rows), default=None),
+        "max_date": max((row[0][day] for row in rows), default=None),
+    }
+
+
+def _metric_value(name, totals):
+    cents, qty, orders = totals
+    if name == "avg_amount":
+        return cents / orders if orders else 0
+    return {"sum_amount": cents, "sum_qty": qty, "count": orders}[name]
+
+
+def _sort(groups, names, order_by):
+    """
+    Sort (key, totals) pairs by `order_by` ("-" for descending), then by
+    the group key. Python's sort is stable, so sorting by the least
+    significant item first gives the combined ordering. Amounts are
+    compared in exact cents.
+    """
+    groups = sorted(groups, key=lambda group: group[0])
+    for item in reversed(order_by):
+        name = item.lstrip("-")
+        if name in names:
+            position = names.index(name)
+            groups.sort(key=lambda group: group[0][position], reverse=item.startswith("-"))
+        else:
+            groups.sort(key=lambda group: _metric_value(name, group[1]), reverse=item.startswith("-"))
+    return groups
+
+
+def aggregate(group_by, metrics=("sum_amount",), filters=None, order_by=None, top=None, other=True, totals=None):
+    """
+    Group sales by `group_by` (DIMENSIONS and at most one TIME_BUCKETS
+    name) and compute `metrics`, ordered by `order_by` (default: the
+    first metric, descending; ties by group). With `top`, only the `top`
+    highest-ranked combinations of the non-time dimensions are kept and
+    the rest are summed into an "Other" row per time bucket, unless
+    `other` is false.
+
+    `totals` takes group_totals rows for `group_by` fetched beforehand,
+    in which case no query runs.
+    """
+    group_by = list(group_by)
+    if totals is None:
+        totals = engine().group_totals(group_keys(group_by), filters)
+    order_by = list(order_by or [f"-{metrics[0]}"])
+    groups = _sort([(key, (cents, qty, orders)) for key, cents, qty, orders in totals], group_by, order_by)
+
+    dims = [i for i, name in enumerate(group_by) if name not in TIME_BUCKETS]
+    others = {}
+    if top is not None and dims:
+        combo = lambda key: tuple(key[i] for i in dims)
+        combos = {}
+        for key, totals in groups:
+            combos[combo(key)] = _add(combos.get(combo(key), (0, 0, 0)), totals)
+        ranking = [item for item in order_by if item.lstrip("-") not in TIME_BUCKETS] or [f"-{metrics[0]}"]
+        kept = {c for c, _ in _sort(list(combos.items()), [group_by[i] for i in dims], ranking)[:top]}
+        if other:
+            for key, totals in groups:
+                if combo(key) in kept:
+                    continue
+                bucket = tuple(None if i in dims else value for i, value in enumerate(key))
+                others[bucket] = _add(others.get(bucket, (0, 0, 0)), totals)
+        groups = [(key, totals) for key, totals in groups if combo(key) in kept]
+
+    def row(key, totals, is_other=False):
+        result = {}
+        for name, value in zip(group_by, key):
+            if name in TIME_BUCKETS:
+                result[name] = value.isoformat()
+            elif is_other:
+                result[name] = OTHER_LABEL
+            else:
+                result[name] = value if name == "b2b" else _label(value)
+        cents, qty, orders = totals
+        values = {
+            "sum_amount": cents / 100,
+            "sum_qty": qty,
+            "count": orders,
+            "avg_amount": round(cents / 100 / orders, 2) if orders else 0,
+        }
+        result.update((metric, values[metric]) for metric in metrics)
+        if is_other:
+            result["other"] = True
+        return result
+
+    results = [row(key, totals) for key, totals in groups]
+    results += [row(key, totals, True) for key, totals in sorted(others.items())]
+    return results
+
+
+def bucket_start(day, granularity):
+    """The first day of the TIME_BUCKETS period containing `day`."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    months = start.month - 1 + (3 if granularity == "quarter" else 1)
+    return start.replace(year=start.year + months // 12, month=months % 12 + 1)
+
+
+# The dashboard breakdowns. Each takes `totals` like aggregate(), grouped
+# by the names in its *_GROUP_BY (the trend by its granularity, the
+# region breakdown by its level).
+SALES_BY_CATEGORY_GROUP_BY = ["category"]
+ORDERS_BY_STATUS_GROUP_BY = ["status"]
+TOP_CITIES_GROUP_BY = ["city", "state"]
+
+
+def region_level(level):
+    return level if level in REGION_LEVELS else "state"
+
+
+def sales_trend_data(filters=None, granularity="day", fill=True, max_points=None, totals=None):
+    """
+    Total sales per `granularity` bucket in date order. With `fill`,
+    buckets without sales between the start (the start_date filter or
+    first sale) and the end are returned as zero. `max_points` thins the
+    series with LTTB.
+    """
+    rows = aggregate([granularity], ["sum_amount"], filters, order_by=[granularity], totals=totals)
+    points = [(item[granularity], item["sum_amount"]) for item in rows]
+
+    filters = filters or {}
+    if fill and (points or "order_date__gte" in filters and "order_date__lte" in filters):
+        values = dict(points)
+        first = filters.get("order_date__gte")
+        last = filters.get("order_date__lte")
+        bucket = bucket_start(first, granularity) if first else date.fromisoformat(points[0][0])
+        last = bucket_start(last, granularity) if last else date.fromisoformat(points[-1][0])
+        if (last - bucket).days > MAX_FILL_DAYS:
+            # Don't materialise centuries of empty buckets for a huge range.
+            if not points:
+                return []
+            bucket = max(bucket, date.fromisoformat(points[0][0]))
+            last = min(last, date.fromisoformat(points[-1][0]))
+        points = []
+        while bucket <= last:
+            label = bucket.isoformat()
+            points.append((label, values.get(label, 0.0)))
+            bucket = next_bucket(bucket, granularity)
+
+    if max_points and len(points) > max_points:
+        x = [date.fromisoformat(label).toordinal() for label, _ in points]
+        points = [points[i] for i in lttb(x, [value for _, value in points], max_points)]
+    return [{"date": label, "total_sales": value} for label, value in points]
+
+
+def sales_by_category_data(filters=None, totals=None):
+    return [
+        {"category": item["category"] or "Unknown", "total_sales": item["sum_amount"]}
+        for item in aggregate(SALES_BY_CATEGORY_GROUP_BY, ["sum_amount"], filters, totals=totals)
+    ]
+
+
+def orders_by_status_data(filters=None, totals=None):
+    return [
+        {"status": item["status"] or "Unknown", "order_count": item["count"]}
+        for item in aggregate(ORDERS_BY_STATUS_GROUP_BY, ["count"], filters, totals=totals)
+    ]
+
+
+def sales_by_region_data(level="state", filters=None, totals=None):
+    level = region_level(level)
+    return [
+        {"region": item[level], "total_orders": item["count"], "total_sales": item["sum_amount"]}
+        for item in aggregate([level], ["count", "sum_amount"], filters, totals=totals)
+    ]
+
+
+def top_cities_data(limit=10, filters=None, totals=None):
+    # Cities with the same order count are ranked by revenue, then by name.
+    return [
+        {"city": item["city"], "state": item["state"], "orders": item["count"]}
+        for item in aggregate(
+            TOP_CITIES_GROUP_BY, ["count", "sum_amount"], filters,
+            order_by=["-count", "-sum_amount"], top=limit, other=False, totals=totals,
+        )
+    ]
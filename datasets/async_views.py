@@ -0,0 +1,168 @@
+"""
+Async variants of the analytics endpoints, mounted under /api/async/.
+
+These are plain Django async views: DRF views are synchronous and would
+be run in a worker thread even under ASGI. They authenticate with the
+same JWT as the rest of the API, share the analytics response cache and
+return the same payloads as their counterparts in views.py. Single-query
+endpoints use the async ORM (through the engine's a* functions); the
+batch endpoint runs its queries concurrently.
+
+They only pay off under an ASGI server (see the README).
+"""
+import json
+import logging
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from accounts.authentication import CachedJWTAuthentication
+from backend.metrics import serializing
+from backend.renderers import render_json
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import analytics, batch
+from .cache import acached_analytics
+from .filters import FilterError, parse_aggregate_params, parse_limit, parse_sales_filters, parse_trend_params
+
+logger = logging.getLogger(__name__)
+
+_jwt = CachedJWTAuthentication()
+
+
+async def authenticate(request):
+    """The user of the request's JWT, or None when it has none."""
+    result = await sync_to_async(_jwt.authenticate)(request)
+    return result[0] if result else None
+
+
+def async_analytics_view(view):
+    """
+    Authenticate, cache and render an async analytics view that returns
+    plain data. FilterError becomes a 400, anything else a logged 500.
+    """
+
+    @wraps(view)
+    async def render(request, *args, **kwargs):
+        try:
+            data = await view(request, *args, **kwargs)
+            with serializing():
+                return HttpResponse(render_json(data), content_type="application/json")
+
+        except FilterError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        except Exception as e:
+            logger.error(f"Error in async {view.__name__}: {str(e)}", exc_info=True)
+            return JsonResponse({"error": "Something went wrong while fetching analytics."}, status=500)
+
+    cached = acached_analytics(render)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await authenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": str(e.detail)}, status=401)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        request.user = user
+        return await cached(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def _totals(group_by, filters):
+    return await analytics.engine().agroup_totals(analytics.group_keys(group_by), filters)
+
+
+@require_GET
+@async_analytics_view
+async def kpi_summary(request):
+    stats = await analytics.engine().akpi_summary(parse_sales_filters(request.GET))
+    return {
+        "total_sales_amount": stats["total_sales"],
+        "total_orders": stats["total_orders"],
+        "total_qty": stats["total_qty"],
+        "avg_order_value": stats["avg_order_value"],
+    }
+
+
+@require_GET
+@async_analytics_view
+async def sales_summary(request):
+    stats = await analytics.engine().akpi_summary(parse_sales_filters(request.GET))
+    return {
+        "total_orders": stats["total_orders"],
+        "total_sales": stats["total_sales"],
+        "min_date": stats["min_date"].strftime("%Y-%m-%d") if stats["min_date"] else None,
+        "max_date": stats["max_date"].strftime("%Y-%m-%d") if stats["max_date"] else None,
+    }
+
+
+@require_GET
+@async_analytics_view
+async def sales_trend(request):
+    filters = parse_sales_filters(request.GET)
+    options = parse_trend_params(request.GET)
+    totals = await _totals([options["granularity"]], filters)
+    return analytics.sales_trend_data(filters, totals=totals, **options)
+
+
+@require_GET
+@async_analytics_view
+async def sales_by_category(request):
+    filters = parse_sales_filters(request.GET)
+    totals = await _totals(analytics.SALES_BY_CATEGORY_GROUP_BY, filters)
+    return analytics.sales_by_category_data(filters, totals)
+
+
+@require_GET
+@async_analytics_view
+async def orders_by_status(request):
+    filters = parse_sales_filters(request.GET)
+    totals = await _totals(analytics.ORDERS_BY_STATUS_GROUP_BY, filters)
+    return analytics.orders_by_status_data(filters, totals)
+
+
+@require_GET
+@async_analytics_view
+async def sales_by_region(request):
+    filters = parse_sales_filters(request.GET)
+    level = analytics.region_level(request.GET.get("level", "state"))
+    totals = await _totals([level], filters)
+    return analytics.sales_by_region_data(level, filters, totals)
+
+
+@require_GET
+@async_analytics_view
+async def top_cities(request):
+    filters = parse_sales_filters(request.GET)
+    limit = parse_limit(request.GET.get("limit"))
+    totals = await _totals(analytics.TOP_CITIES_GROUP_BY, filters)
+    return analytics.top_cities_data(limit, filters, totals)
+
+
+@require_GET
+@async_analytics_view
+async def aggregate_sales(request):
+    params = parse_aggregate_params(request.GET)
+    totals = await _totals(params["group_by"], params["filters"])
+    return {
+        "group_by": params["group_by"],
+        "metrics": params["metrics"],
+        "results": analytics.aggregate(**params, totals=totals),
+    }
+
+
+@csrf_exempt
+@require_POST
+@async_analytics_view
+async def analytics_batch(request):
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        raise FilterError("Request body must be JSON")
+    return await batch.aevaluate(payload)
@@ -0,0 +1,227 @@
+"""
+Evaluation of several dashboard widgets in one request.
+
+Widgets are planned before anything runs. Every widget but the KPI needs
+the grouped totals of some dimensions under some filters (a "scan").
+Widgets asking for the same scan share it, a scan whose dimensions are a
+subset of another scan's under the same filters is summed from that one,
+and the KPI reuses a by-day scan when there is one. The scans left run
+concurrently on a process-wide pool of ANALYTICS_BATCH_WORKERS threads,
+each with its own database connection. The threads outlive the request,
+so with CONN_MAX_AGE set their connections are reused by later batches
+instead of being opened per scan.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import analytics
+from .filters import FilterError, parse_aggregate_params, parse_limit, parse_sales_filters, parse_trend_params
+
+MAX_WIDGETS = 20
+
+
+def _trend(params):
+    options = parse_trend_params(params)
+    return [options["granularity"]], lambda filters, totals: analytics.sales_trend_data(filters, totals=totals, **options)
+
+
+def _category(params):
+    return analytics.SALES_BY_CATEGORY_GROUP_BY, lambda filters, totals: analytics.sales_by_category_data(filters, totals)
+
+
+def _status(params):
+    return analytics.ORDERS_BY_STATUS_GROUP_BY, lambda filters, totals: analytics.orders_by_status_data(filters, totals)
+
+
+def _region(params):
+    level = analytics.region_level(params.get("level"))
+    return [level], lambda filters, totals: analytics.sales_by_region_data(level, filters, totals)
+
+
+def _top_cities(params):
+    limit = parse_limit(params.get("limit"))
+    return analytics.TOP_CITIES_GROUP_BY, lambda filters, totals: analytics.top_cities_data(limit, filters, totals)
+
+
+def _aggregate(params):
+    options = parse_aggregate_params(params)
+    options.pop("filters")
+    return options["group_by"], lambda filters, totals: {
+        "group_by": options["group_by"],
+        "metrics": options["metrics"],
+        "results": analytics.aggregate(filters=filters, totals=totals, **options),
+    }
+
+
+# widget type -> params -> (group_by, render(filters, totals))
+WIDGETS = {
+    "kpi": None,
+    "sales_trend": _trend,
+    "sales_by_category": _category,
+    "orders_by_status": _status,
+    "sales_by_region": _region,
+    "top_cities": _top_cities,
+    "aggregate": _aggregate,
+}
+
+
+def _query_params(values):
+    # Widget specs are JSON; the parsers expect query-string values.
+    params = {}
+    for name, value in values.items():
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif isinstance(value, (list, tuple)):
+            value = ",".join(str(item) for item in value)
+        params[name] = "" if value is None else str(value)
+    return params
+
+
+def _freeze(filters):
+    return tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in filters.items()))
+
+
+class Widget:
+    def __init__(self, name, spec, shared):
+        if not isinstance(spec, dict) or spec.get("type") not in WIDGETS:
+            raise FilterError(f"Widget '{name}': type must be one of {', '.join(WIDGETS)}")
+        params = _query_params({**shared, **{key: value for key, value in spec.items() if key != "type"}})
+        try:
+            self.filters = parse_sales_filters(params)
+            planner = WIDGETS[spec["type"]]
+            self.group_by, self.render = planner(params) if planner else (None, None)
+        except FilterError as e:
+            raise FilterError(f"Widget '{name}': {e}")
+        self.name = name
+        self.scope = _freeze(self.filters)
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(workers):
+    with _executors_lock:
+        if workers not in _executors:
+            _executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analytics-batch")
+        return _executors[workers]
+
+
+def _in_worker(task, *args):
+    # What request_started/request_finished do for a request thread: drop
+    # the connection if it is broken or older than CONN_MAX_AGE (so with
+    # the default of 0 it is closed after every task), else keep it.
+    close_old_connections()
+    try:
+        return task(*args)
+    finally:
+        close_old_connections()
+
+
+class Plan:
+    """
+    The widgets of one batch payload and the engine calls (`tasks`) that
+    answer them: {key: (engine function name, *args)}.
+    """
+
+    def __init__(self, payload):
+        if not isinstance(payload, dict) or not isinstance(payload.get("widgets"), dict):
+            raise FilterError("Expected a JSON object with a 'widgets' object")
+        shared = payload.get("filters") or {}
+        if not isinstance(shared, dict):
+            raise FilterError("'filters' must be an object")
+        if len(payload["widgets"]) > MAX_WIDGETS:
+            raise FilterError(f"At most {MAX_WIDGETS} widgets per request")
+        self.widgets = [Widget(name, spec, shared) for name, spec in payload["widgets"].items()]
+
+        # Distinct scans per filter scope. Only those not contained in
+        # another scan of the same scope are run; the rest are summed from
+        # them.
+        self.scopes = {}
+        for widget in self.widgets:
+            self.scopes.setdefault(widget.scope, (widget.filters, {}))
+            if widget.group_by is not None:
+                self.scopes[widget.scope][1].setdefault(frozenset(widget.group_by), widget.group_by)
+        self.tasks = {}
+        for scope, (filters, scans) in self.scopes.items():
+            for names, group_by in scans.items():
+                if not any(names < other for other in scans):
+                    self.tasks["scan", scope, names] = ("group_totals", analytics.group_keys(group_by), filters)
+
+        for widget in self.widgets:
+            if widget.group_by is not None:
+                widget.source = self.source(widget.scope, frozenset(widget.group_by))
+            else:
+                widget.source = self.source(widget.scope, frozenset(["day"]))
+                if widget.source is None:
+                    widget.source = ("kpi", widget.scope)
+                    self.tasks[widget.source] = ("kpi_summary", widget.filters)
+
+    def source(self, scope, names):
+        """The smallest scan that runs and covers `names`, if any."""
+        covering = [key for key in self.tasks if key[0] == "scan" and key[1] == scope and names <= key[2]]
+        return min(covering, key=lambda key: len(key[2]), default=None)
+
+    def render(self, results):
+        """Widget data by name from {task key: engine result}."""
+        data = {}
+        for widget in self.widgets:
+            rows = results[widget.source]
+            if widget.source[0] == "scan":
+                scanned = self.scopes[widget.scope][1][widget.source[2]]
+                rows = analytics.regroup(rows, scanned, widget.group_by or ["day"])
+            if widget.group_by is not None:
+                data[widget.name] = widget.render(widget.filters, rows)
+                continue
+            stats = rows if widget.source[0] == "kpi" else analytics.kpi_from_totals(rows, ["day"])
+            data[widget.name] = {
+                **stats,
+                "min_date": stats["min_date"].isoformat() if stats["min_date"] else None,
+                "max_date": stats["max_date"].isoformat() if stats["max_date"] else None,
+            }
+        return data
+
+
+def evaluate(payload):
+    """
+    Evaluate `{"filters": {...}, "widgets": {name: {"type": ..., ...}}}`.
+    Shared filters use the query parameter names of the sales filters; a
+    widget's own keys (its options and any filters) take precedence.
+    Returns {name: widget data}.
+    """
+    plan = Plan(payload)
+    engine = analytics.engine()
+    tasks = {key: (getattr(engine, name), *args) for key, (name, *args) in plan.tasks.items()}
+    if settings.ANALYTICS_BATCH_WORKERS <= 1 or len(tasks) <= 1:
+        return plan.render({key: task(*args) for key, (task, *args) in tasks.items()})
+    pool = _executor(settings.ANALYTICS_BATCH_WORKERS)
+    # A copy of the request's context per query keeps it in the request
+    # metrics (and on the replica, see backend/routers.py).
+    futures = {
+        key: pool.submit(contextvars.copy_context().run, _in_worker, task, *args)
+        for key, (task, *args) in tasks.items()
+    }
+    return plan.render({key: future.result() for key, future in futures.items()})
+
+
+async def aevaluate(payload):
+    """
+    evaluate() for async views. With more than one worker the engine
+    calls run concurrently on the same thread pool as evaluate().
+    """
+    plan = Plan(payload)
+    engine = analytics.engine()
+    if settings.ANALYTICS_BATCH_WORKERS <= 1:
+        return plan.render({
+            key: await getattr(engine, f"a{name}")(*args) for key, (name, *args) in plan.tasks.items()
+        })
+
+    run = sync_to_async(_in_worker, thread_sensitive=False, executor=_executor(settings.ANALYTICS_BATCH_WORKERS))
+    results = await asyncio.gather(*(run(getattr(engine, name), *args) for name, *args in plan.tasks.values()))
+    return plan.render(dict(zip(plan.tasks, results)))
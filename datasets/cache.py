@@ -0,0 +1,159 @@
+"""
+Response cache for the analytics endpoints.
+
+Entries are keyed by endpoint, normalised query parameters and a dataset
+version token that changes whenever Sales changes, so nothing has to be
+deleted on ingest: old entries simply stop being looked up and expire.
+The token lives in the analytics cache itself, which therefore has to be
+shared by every process that writes sales (the file and Redis backends
+are; local memory is only suitable for a single process).
+"""
+import hashlib
+import json
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import parse_etags
+from rest_framework.response import Response
+
+from backend.routers import has_replica, replica_reads
+
+VERSION_KEY = "analytics:dataset-version"
+
+
+def get_cache():
+    return caches[settings.ANALYTICS_CACHE_ALIAS]
+
+
+def dataset_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex[:16], timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_dataset_version():
+    # A fresh random token rather than an increment: concurrent bumps from
+    # different processes can never end up on the same value.
+    get_cache().set(VERSION_KEY, uuid.uuid4().hex[:16], timeout=None)
+
+
+def invalidate_analytics():
+    """
+    Call whenever Sales is written. Bumps now, and again once the
+    surrounding transaction commits so that responses computed from the
+    uncommitted state are not reused afterwards.
+    """
+    bump_dataset_version()
+    if connection.in_atomic_block:
+        transaction.on_commit(bump_dataset_version)
+
+
+def _timeout():
+    # Replica reads may lag the version they are cached under (see routers).
+    return settings.ANALYTICS_REPLICA_CACHE_TIMEOUT if has_replica() else settings.ANALYTICS_CACHE_TIMEOUT
+
+
+def _params_digest(endpoint, request, kwargs):
+    params = sorted((key, sorted(request.GET.getlist(key))) for key in request.GET)
+    body = ""
+    if request.method == "POST":
+        # DRF requests expose the parsed body; plain Django ones the bytes.
+        try:
+            data = request.data if hasattr(request, "data") else json.loads(request.body)
+            body = json.dumps(data, sort_keys=True, default=str)
+        except ValueError:
+            body = request.body.decode(errors="replace")
+    raw = repr((endpoint, params, body, sorted(kwargs.items())))
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _entry(endpoint, request, kwargs, version):
+    """The ETag and cache key of a request, and whether it is already fresh."""
+    digest = _params_digest(endpoint, request, kwargs)
+    etag = f'W/"{version}-{digest}"'
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    fresh = request.method in ("GET", "HEAD") and (etag in if_none_match or "*" in if_none_match)
+    return etag, f"analytics:{endpoint}:{version}:{digest}", fresh
+
+
+def cached_analytics(view):
+    """
+    Cache the successful responses of an analytics view and answer
+    matching If-None-Match requests with 304 before touching the
+    database. POST views are keyed by their JSON body as well. The view's
+    reads go to the read replica when there is one. Works on function
+    views and, via method_decorator, on APIView methods.
+    """
+    endpoint = f"{view.__module__}.{view.__qualname__}"
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        etag, key, fresh = _entry(endpoint, request, kwargs, dataset_version())
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if fresh:
+            return Response(status=304, headers=headers)
+
+        cache = get_cache()
+        data = cache.get(key)
+        if data is None:
+            with replica_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(key, response.data, timeout=_timeout())
+        else:
+            response = Response(data, status=200)
+
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    return wrapper
+
+
+async def adataset_version():
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, uuid.uuid4().hex[:16], timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def acached_analytics(view):
+    """
+    cached_analytics for async views returning JSON HttpResponses; the
+    rendered body is what gets cached.
+    """
+    endpoint = f"{view.__module__}.{view.__qualname__}"
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        etag, key, fresh = _entry(endpoint, request, kwargs, await adataset_version())
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if fresh:
+            return HttpResponseNotModified(headers=headers)
+
+        cache = get_cache()
+        content = await cache.aget(key)
+        if content is None:
+            with replica_reads():
+                response = await view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            await cache.aset(key, response.content, timeout=_timeout())
+        else:
+            response = HttpResponse(content, content_type="application/json")
+
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    return wrapper
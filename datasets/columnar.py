@@ -0,0 +1,157 @@
+"""
+In-memory columnar analytics engine (ANALYTICS_ENGINE = "columnar").
+
+Each process keeps a numpy snapshot of SalesDailyRollup: one int32 code
+column per text dimension, day ordinals for dates and int64 cents, qty
+and order counts. Dimension values are factorized in sorted order, so
+comparing codes orders rows the same way as comparing the strings. The
+snapshot is rebuilt the first time it is used after the dataset version
+(see cache.py) changes.
+
+group_totals and kpi_summary return exactly what their counterparts in
+analytics.py return, computed with bincount-style groupbys instead of
+SQL. Filter values match as the database compares text: exactly, or on
+MySQL ignoring case and trailing spaces.
+"""
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+
+from .analytics import TIME_BUCKETS
+from .cache import dataset_version
+from .models import SalesDailyRollup
+from .rollups import match_value
+
+DIMENSIONS = ["category", "status", "ship_state", "ship_city", "ship_country", "sales_channel", "b2b"]
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class Snapshot:
+    def __init__(self, version):
+        self.version = version
+        rows = list(SalesDailyRollup.objects.values_list(
+            "order_date", *DIMENSIONS, "total_amount", "total_qty", "order_count",
+        ))
+        columns = list(zip(*rows)) or [()] * (len(DIMENSIONS) + 4)
+
+        self.days = np.fromiter((d.toordinal() for d in columns[0]), dtype=np.int32, count=len(rows))
+        self.codes = {}
+        self.values = {}
+        for name, column in zip(DIMENSIONS, columns[1:]):
+            codes, uniques = pd.factorize(pd.Series(column, dtype=object), sort=True)
+            self.codes[name] = codes.astype(np.int32)
+            self.values[name] = np.asarray(uniques, dtype=object)
+        self.cents = np.fromiter((int(a.scaleb(2)) for a in columns[-3]), dtype=np.int64, count=len(rows))
+        self.qty = np.fromiter(columns[-2], dtype=np.int64, count=len(rows))
+        self.orders = np.fromiter(columns[-1], dtype=np.int64, count=len(rows))
+
+    def __len__(self):
+        return len(self.days)
+
+    def buckets(self, name):
+        """Day ordinals truncated to the start of each TIME_BUCKETS period."""
+        if name == "week":
+            # Ordinal 1 (0001-01-01) is a Monday.
+            return self.days - (self.days - 1) % 7
+        if name in ("month", "quarter"):
+            months = (self.days - _EPOCH).astype("datetime64[D]").astype("datetime64[M]")
+            if name == "quarter":
+                months = months - months.astype(np.int64) % 3
+            return months.astype("datetime64[D]").astype(np.int64).astype(np.int32) + _EPOCH
+        return self.days
+
+    def mask(self, filters):
+        """Boolean row mask for lookups from filters.parse_sales_filters."""
+        mask = np.ones(len(self), dtype=bool)
+        for lookup, value in (filters or {}).items():
+            name, _, op = lookup.partition("__")
+            if name == "order_date":
+                day = date.fromisoformat(value).toordinal() if isinstance(value, str) else value.toordinal()
+                mask &= self.days >= day if op == "gte" else self.days <= day
+                continue
+            # Values compare as the database compares them (see match_value).
+            wanted = {match_value(v) for v in (value if op == "in" else [value])}
+            positions = [p for p, v in enumerate(self.values[name]) if match_value(v) in wanted]
+            mask &= np.isin(self.codes[name], positions)
+        return mask
+
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def snapshot():
+    global _snapshot
+    version = dataset_version()
+    current = _snapshot
+    if current is not None and current.version == version:
+        return current
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = Snapshot(version)
+        return _snapshot
+
+
+def _sum(groups, weights, size):
+    # bincount accumulates in float64, exact while a group's total stays
+    # below 2**53 (cents, quantities or orders).
+    return np.rint(np.bincount(groups, weights=weights, minlength=size)).astype(np.int64)
+
+
+def _group(keys):
+    """
+    Group rows by one or more code arrays. Returns each key's code per
+    group and the row -> group index; groups come out in key order.
+    """
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        combined = combined * (int(key.max()) + 1 if len(key) else 1) + key
+    _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+    return [key[first] for key in keys], inverse
+
+
+def kpi_summary(filters=None):
+    snap = snapshot()
+    mask = snap.mask(filters)
+    total_sales = int(snap.cents[mask].sum()) / 100
+    total_orders = int(snap.orders[mask].sum())
+    days = snap.days[mask]
+    return {
+        "total_sales": total_sales,
+        "total_orders": total_orders,
+        "total_qty": int(snap.qty[mask].sum()),
+        "avg_order_value": round(total_sales / total_orders, 2) if total_orders else 0,
+        "min_date": date.fromordinal(int(days.min())) if len(days) else None,
+        "max_date": date.fromordinal(int(days.max())) if len(days) else None,
+    }
+
+
+def group_totals(keys, filters=None):
+    """Same contract as analytics.group_totals."""
+    snap = snapshot()
+    mask = snap.mask(filters)
+    if not keys:
+        return [((), int(snap.cents[mask].sum()), int(snap.qty[mask].sum()), int(snap.orders[mask].sum()))] if mask.any() else []
+
+    columns = [snap.buckets(key)[mask] if key in TIME_BUCKETS else snap.codes[key][mask] for key in keys]
+    codes, inverse = _group(columns)
+    size = len(codes[0])
+    values = [
+        [date.fromordinal(day) for day in column.tolist()] if key in TIME_BUCKETS else snap.values[key][column].tolist()
+        for key, column in zip(keys, codes)
+    ]
+    return list(zip(
+        zip(*values),
+        _sum(inverse, snap.cents[mask], size).tolist(),
+        _sum(inverse, snap.qty[mask], size).tolist(),
+        _sum(inverse, snap.orders[mask], size).tolist(),
+    ))
+
+
+# Snapshot reads are pure numpy once built, so the async variants simply
+# run the sync ones off the event loop.
+akpi_summary = sync_to_async(kpi_summary)
+agroup_totals = sync_to_async(group_totals)
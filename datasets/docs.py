@@ -1,9 +1,161 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+sales_filter_parameters = [
+    openapi.Parameter(
+        'start_date',
+        openapi.IN_QUERY,
+        description="Only include orders from this date (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format='date'
+    ),
+    openapi.Parameter(
+        'end_date',
+        openapi.IN_QUERY,
+        description="Only include orders up to this date (YYYY-MM-DD)",
+        type=openapi.TYPE_STRING,
+        format='date'
+    ),
+    openapi.Parameter(
+        'category',
+        openapi.IN_QUERY,
+        description="Product category; comma-separate several values",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'status',
+        openapi.IN_QUERY,
+        description="Order status; comma-separate several values",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'country',
+        openapi.IN_QUERY,
+        description="Shipping country; comma-separate several values",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'state',
+        openapi.IN_QUERY,
+        description="Shipping state; comma-separate several values",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'city',
+        openapi.IN_QUERY,
+        description="Shipping city; comma-separate several values",
+        type=openapi.TYPE_STRING
+    ),
+]
+
+sales_list_docs = swagger_auto_schema(
+    operation_description=(
+        "List sales records, 20 per page by default (`page_size` up to 100).\n\n"
+        "**Page-number pagination** (default): `page` selects the page. Pass `count=false` "
+        "to skip the total row count; the response then only has `next`, `previous` and `results`.\n\n"
+        "**Keyset pagination**: pass `pagination=keyset` and follow the `next` / `previous` links, "
+        "which carry an opaque `cursor`. No count is made and every page costs the same as the first. "
+        "`ordering` is `id` (default) or `order_date`.\n\n"
+        "`fields` limits each record to a comma-separated list of columns, e.g. "
+        "`fields=order_id,order_date,amount`.\n\n"
+        "Accepts the common sales filters."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated columns to return (default: all)",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'pagination',
+            openapi.IN_QUERY,
+            description="Set to `keyset` for cursor pagination",
+            type=openapi.TYPE_STRING,
+            enum=["keyset"]
+        ),
+        openapi.Parameter(
+            'cursor',
+            openapi.IN_QUERY,
+            description="Cursor from a `next` / `previous` link (keyset pagination)",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'ordering',
+            openapi.IN_QUERY,
+            description="Keyset ordering: `id` (default) or `order_date`",
+            type=openapi.TYPE_STRING,
+            enum=["id", "order_date"]
+        ),
+        openapi.Parameter(
+            'count',
+            openapi.IN_QUERY,
+            description="Set to `false` to skip the total count (page-number pagination)",
+            type=openapi.TYPE_BOOLEAN
+        ),
+        *sales_filter_parameters,
+    ],
+    tags=["Sales"]
+)
+
+sales_export_docs = swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Download sales records as a file streamed straight from the database.\n\n"
+        "Server memory and time to first byte stay constant however many rows match. "
+        "Accepts `fields` and the common sales filters.\n\n"
+        "**file_format**:\n"
+        "- `csv` (default)\n"
+        "- `ndjson`: one JSON object per line\n"
+        "- `parquet` / `arrow` (Arrow IPC stream): only when the server has pyarrow installed"
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'file_format',
+            openapi.IN_QUERY,
+            description="Output format (default `csv`)",
+            type=openapi.TYPE_STRING,
+            enum=["csv", "ndjson", "parquet", "arrow"],
+            default="csv"
+        ),
+        openapi.Parameter(
+            'fields',
+            openapi.IN_QUERY,
+            description="Comma-separated columns to export (default: all)",
+            type=openapi.TYPE_STRING
+        ),
+        *sales_filter_parameters,
+    ],
+    responses={
+        200: openapi.Response(description="Streamed file download"),
+        400: openapi.Response(
+            description="Invalid format, field or filter",
+            examples={
+                "application/json": {"error": "parquet export requires the pyarrow package"}
+            }
+        ),
+        401: "Unauthorized"
+    },
+    tags=["Sales"]
+)
+
 csv_upload_docs = swagger_auto_schema(
     method='post',
-    operation_description="Upload a CSV file and log the upload details.",
+    operation_description=(
+        "Upload a CSV file and queue it for loading into the sales table.\n\n"
+        "The file is accepted straight away and an ingestion job id is returned; poll "
+        "`/api/upload-csv/{job_id}/` for progress. When the server runs with "
+        "`CSV_INGEST_MODE=inline` the rows are loaded before responding instead.\n\n"
+        "A file whose content (SHA-256) you already queued or ingested is not processed again; "
+        "the response points at the existing job with `duplicate: true`. Use `/api/uploads/` "
+        "to send large files in resumable parts.\n\n"
+        "Rows that fail validation are skipped: a required value (order id, date, qty, currency "
+        "or amount) is missing, a value does not parse as the column's type, or text is longer "
+        "than the column allows. The job's `error_report` lists them. "
+        "Rows are keyed on (order id, SKU, ASIN): a row already stored under its key is "
+        "updated, or left alone when nothing in it changed, so re-uploading a file never "
+        "duplicates sales."
+    ),
     manual_parameters=[
         openapi.Parameter(
             name='file',
@@ -14,13 +166,29 @@ csv_upload_docs = swagger_auto_schema(
         ),
     ],
     responses={
-        200: openapi.Response(
-            description="File uploaded successfully",
+        202: openapi.Response(
+            description="File accepted for processing",
+            examples={
+                "application/json": {
+                    "message": "File accepted for processing",
+                    "job_id": 42,
+                    "file_name": "sales_data.csv",
+                    "status": "pending"
+                }
+            }
+        ),
+        201: openapi.Response(
+            description="File uploaded and loaded (inline mode)",
             examples={
                 "application/json": {
                     "message": "File uploaded successfully",
+                    "job_id": 42,
                     "file_name": "sales_data.csv",
-                    "row_count": 120
+                    "row_count": 120,
+                    "skipped_rows": 2,
+                    "rows_inserted": 100,
+                    "rows_updated": 5,
+                    "rows_unchanged": 15
                 }
             }
         ),
@@ -35,37 +203,266 @@ csv_upload_docs = swagger_auto_schema(
     tags=["CSV Upload"]
 )
 
+csv_upload_job_docs = swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Retrieve the progress of a CSV ingestion job.\n\n"
+        "- **status**: `pending`, `running`, `completed` or `failed`.\n"
+        "- **rows_processed**: Rows read from the file so far.\n"
+        "- **row_count**: Rows loaded into the sales table so far (inserted, updated or unchanged).\n"
+        "- **skipped_rows**: Rows skipped because they failed validation.\n"
+        "- **error_report**: URL of a CSV listing each problem (line, column, value, error), "
+        "or null when every row was valid.\n"
+        "- **rows_inserted** / **rows_updated** / **rows_unchanged**: Loaded rows that were new, "
+        "replaced a stored row with the same order id, SKU and ASIN, or matched it exactly.\n"
+        "- **throughput**: Rows processed per second.\n"
+        "- **error**: Failure reason for failed jobs."
+    ),
+    responses={
+        200: openapi.Response(
+            description="Ingestion job status",
+            examples={
+                "application/json": {
+                    "job_id": 42,
+                    "file_name": "sales_data.csv",
+                    "status": "running",
+                    "rows_processed": 250000,
+                    "row_count": 249812,
+                    "skipped_rows": 188,
+                    "rows_inserted": 240000,
+                    "rows_updated": 812,
+                    "rows_unchanged": 9000,
+                    "throughput": 48120.5,
+                    "error": None,
+                    "error_report": "/api/upload-csv/42/errors/",
+                    "upload_time": "2025-09-06 12:34:56",
+                    "started_at": "2025-09-06 12:34:57",
+                    "finished_at": None
+                }
+            }
+        ),
+        404: openapi.Response(
+            description="Unknown job id, or a job uploaded by another user",
+            examples={
+                "application/json": {"error": "Upload job not found"}
+            }
+        ),
+        401: "Unauthorized"
+    },
+    tags=["CSV Upload"]
+)
+
+csv_upload_errors_docs = swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Download the validation errors of an ingestion job as CSV, one line per problem: "
+        "`line` (in the uploaded file, counting the header as line 1), `column`, `value` "
+        "and `error`."
+    ),
+    responses={
+        200: "CSV error report",
+        404: openapi.Response(
+            description="Unknown job id, a job uploaded by another user, or no rows failed validation",
+            examples={
+                "application/json": {"error": "No error report for this job"}
+            }
+        ),
+        401: "Unauthorized"
+    },
+    tags=["CSV Upload"]
+)
+
+upload_session_status_example = {
+    "upload_id": "3f2b8c1e-8d4a-4b8e-9a61-0c1d2e3f4a5b",
+    "file_name": "sales_2025.csv",
+    "size": 734003200,
+    "received": 268435456,
+    "status": "receiving",
+    "job_id": None,
+}
+
+upload_session_create_docs = swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Start a resumable upload of a large CSV file.\n\n"
+        "Send the file in parts with `PUT /api/uploads/{upload_id}/parts/?offset=N`, then "
+        "`POST /api/uploads/{upload_id}/complete/`. After a dropped connection, "
+        "`GET /api/uploads/{upload_id}/` returns the offset to resume from."
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["file_name"],
+        properties={
+            "file_name": openapi.Schema(type=openapi.TYPE_STRING, description="Name of the CSV file"),
+            "size": openapi.Schema(type=openapi.TYPE_INTEGER, description="Total size in bytes, if known"),
+        },
+    ),
+    responses={
+        201: openapi.Response(
+            description="Upload started",
+            examples={"application/json": {**upload_session_status_example, "received": 0}},
+        ),
+        400: openapi.Response(
+            description="Invalid request",
+            examples={"application/json": {"error": "file_name must name a CSV file"}},
+        ),
+        401: "Unauthorized",
+    },
+    tags=["CSV Upload"]
+)
+
+upload_session_docs = swagger_auto_schema(
+    method='get',
+    operation_description="Progress of a resumable upload; `received` is the offset the next part must start at.",
+    responses={
+        200: openapi.Response(
+            description="Upload status",
+            examples={"application/json": upload_session_status_example},
+        ),
+        404: "Unknown upload id",
+        401: "Unauthorized",
+    },
+    tags=["CSV Upload"]
+)
+
+upload_session_part_docs = swagger_auto_schema(
+    method='put',
+    operation_description=(
+        "Append a part to a resumable upload. The request body is the raw bytes of the part "
+        "(with a Content-Length header) and must start at the upload's `received` offset. "
+        "Parts are limited to UPLOAD_PART_MAX_SIZE bytes (64 MB by default)."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            "offset", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+            description="Byte offset of the part in the file",
+        ),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Part stored",
+            examples={"application/json": upload_session_status_example},
+        ),
+        409: openapi.Response(
+            description="The part does not start at the received offset",
+            examples={"application/json": {"error": "Part must start at offset 268435456", "received": 268435456}},
+        ),
+        400: "Invalid part",
+        404: "Unknown upload id",
+        401: "Unauthorized",
+    },
+    tags=["CSV Upload"]
+)
+
+upload_session_complete_docs = swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Finish a resumable upload and queue the file like `/api/upload-csv/` does. "
+        "Pass the file's `sha256` to have the server check the content it assembled. "
+        "A file whose content you already uploaded is not processed again: the response "
+        "points at the existing job with `duplicate: true`. A file that cannot be read "
+        "leaves the upload `failed`; start a new one to send it again."
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "sha256": openapi.Schema(type=openapi.TYPE_STRING, description="Hex SHA-256 of the whole file"),
+        },
+    ),
+    responses={
+        202: openapi.Response(
+            description="File accepted for processing",
+            examples={
+                "application/json": {
+                    "message": "File accepted for processing",
+                    "job_id": 42,
+                    "file_name": "sales_2025.csv",
+                    "status": "pending"
+                }
+            }
+        ),
+        200: openapi.Response(
+            description="Same content already uploaded",
+            examples={
+                "application/json": {
+                    "message": "File already uploaded; it will not be processed again",
+                    "job_id": 41,
+                    "file_name": "sales_2025.csv",
+                    "status": "completed",
+                    "duplicate": True
+                }
+            }
+        ),
+        400: openapi.Response(
+            description="Incomplete upload, checksum mismatch or invalid CSV",
+            examples={"application/json": {"error": "Received 268435456 of 734003200 bytes"}},
+        ),
+        404: "Unknown upload id",
+        401: "Unauthorized",
+    },
+    tags=["CSV Upload"]
+)
+
 # CSV Upload Logs Documentation
 csv_upload_logs_docs = swagger_auto_schema(
     method='get',
     operation_description=(
-        "Retrieve all CSV upload logs.\n\n"
+        "Retrieve the CSV upload history, newest first, one page at a time.\n\n"
+        "Pages are keyset-paginated on upload time: follow the `next` and `previous` links "
+        "(which carry a `cursor`) rather than building page numbers.\n\n"
         "Each log contains:\n"
+        "- **job_id**: Id of the ingestion job for the upload.\n"
         "- **file_name**: Name of the uploaded CSV file.\n"
-        "- **row_count**: Number of rows in the uploaded CSV file.\n"
+        "- **status**: State of the ingestion job.\n"
+        "- **row_count**: Number of rows loaded into the sales table.\n"
         "- **user**: Username of the person who uploaded the file.\n"
         "- **upload_time**: Timestamp when the file was uploaded."
     ),
+    manual_parameters=[
+        openapi.Parameter("user", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Only uploads by this username"),
+        openapi.Parameter(
+            "start_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date",
+            description="Uploaded on or after this day (YYYY-MM-DD, UTC)",
+        ),
+        openapi.Parameter(
+            "end_date", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date",
+            description="Uploaded on or before this day (YYYY-MM-DD, UTC)",
+        ),
+        openapi.Parameter("page_size", openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Logs per page (default 20, max 100)"),
+        openapi.Parameter("cursor", openapi.IN_QUERY, type=openapi.TYPE_STRING, description="Opaque position from a next/previous link"),
+    ],
     responses={
         200: openapi.Response(
-            description="List of CSV upload logs",
+            description="A page of CSV upload logs",
             examples={
-                "application/json": [
-                    {
-                        "file_name": "sales_data_2025.csv",
-                        "row_count": 150,
-                        "user": "john_doe",
-                        "upload_time": "2025-09-06 12:34:56"
-                    },
-                    {
-                        "file_name": "sales_data_2024.csv",
-                        "row_count": 200,
-                        "user": "jane_smith",
-                        "upload_time": "2025-08-30 10:20:15"
-                    }
-                ]
+                "application/json": {
+                    "next": "http://localhost:8000/api/csv-upload-logs/?cursor=eyJwIjpb...",
+                    "previous": None,
+                    "results": [
+                        {
+                            "job_id": 2,
+                            "file_name": "sales_data_2025.csv",
+                            "status": "completed",
+                            "row_count": 150,
+                            "user": "john_doe",
+                            "upload_time": "2025-09-06 12:34:56"
+                        },
+                        {
+                            "job_id": 1,
+                            "file_name": "sales_data_2024.csv",
+                            "status": "completed",
+                            "row_count": 200,
+                            "user": "jane_smith",
+                            "upload_time": "2025-08-30 10:20:15"
+                        }
+                    ]
+                }
             }
         ),
+        400: openapi.Response(
+            description="Invalid filter",
+            examples={"application/json": {"error": "Invalid start_date '2025-13-01', expected YYYY-MM-DD"}},
+        ),
         401: openapi.Response(
             description="Unauthorized",
             examples={
@@ -78,6 +475,140 @@ csv_upload_logs_docs = swagger_auto_schema(
     tags=["CSV Upload"]
 )
 
+analytics_batch_docs = swagger_auto_schema(
+    method='post',
+    operation_description=(
+        "Load several dashboard widgets in one request.\n\n"
+        "`filters` (the sales filter parameters) apply to every widget; a widget's own keys "
+        "override them. Widget types and their options:\n"
+        "- `kpi`: total sales, orders, quantity, average order value and date range\n"
+        "- `sales_trend`: `granularity`, `fill`, `max_points`\n"
+        "- `sales_by_category`, `orders_by_status`\n"
+        "- `sales_by_region`: `level`\n"
+        "- `top_cities`: `limit`\n"
+        "- `aggregate`: `group_by`, `metrics`, `order_by`, `top`, `other` as in `/analytics/aggregate/`\n\n"
+        "Each widget's data has the same shape as its own endpoint (`kpi` as `/sales/summary/` "
+        "plus the KPI metrics). Widgets sharing a breakdown share its query, and the queries "
+        "that remain run concurrently."
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["widgets"],
+        properties={
+            "filters": openapi.Schema(type=openapi.TYPE_OBJECT, description="Shared sales filters"),
+            "widgets": openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                description="Widget specs by name; each has a `type`",
+                additional_properties=openapi.Schema(type=openapi.TYPE_OBJECT),
+            ),
+        },
+        example={
+            "filters": {"start_date": "2022-04-01", "end_date": "2022-06-30"},
+            "widgets": {
+                "kpi": {"type": "kpi"},
+                "trend": {"type": "sales_trend"},
+                "categories": {"type": "sales_by_category"},
+                "statuses": {"type": "orders_by_status"},
+                "regions": {"type": "sales_by_region", "level": "state"},
+                "cities": {"type": "top_cities", "limit": 5},
+            },
+        },
+    ),
+    responses={
+        200: openapi.Response(
+            description="Widget data by name",
+            examples={
+                "application/json": {
+                    "kpi": {
+                        "total_sales": 120000.5, "total_orders": 150, "total_qty": 160,
+                        "avg_order_value": 800.0, "min_date": "2022-04-01", "max_date": "2022-06-29"
+                    },
+                    "cities": [{"city": "Mumbai", "state": "Maharashtra", "orders": 40}]
+                }
+            }
+        ),
+        400: openapi.Response(
+            description="Invalid widget spec or filter",
+            examples={"application/json": {"error": "Widget 'cities': limit must be an integer"}}
+        ),
+        401: "Unauthorized"
+    },
+    tags=["Sales Analytics"]
+)
+
+
+aggregate_docs = swagger_auto_schema(
+    method='get',
+    operation_description=(
+        "Group sales by any combination of dimensions and compute metrics in one query.\n\n"
+        "Rows are ordered by `order_by` (default: the first metric, descending), ties by group. "
+        "With `top=N` only the N highest-ranked groups are returned and the rest are summed "
+        "into one row per time bucket whose dimensions read `Other` and which carries "
+        "`\"other\": true`; pass `other=false` to drop it. When grouping by a time bucket, "
+        "groups are ranked on their totals over the whole period."
+    ),
+    manual_parameters=[
+        openapi.Parameter(
+            'group_by',
+            openapi.IN_QUERY,
+            description=(
+                "Comma-separated dimensions: `category`, `status`, `country`, `state`, `city`, "
+                "`channel`, `b2b`, plus at most one time bucket: `day`, `week` (starting Monday), "
+                "`month` or `quarter`. Empty for grand totals."
+            ),
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'metrics',
+            openapi.IN_QUERY,
+            description="Comma-separated: `sum_amount` (default), `sum_qty`, `count` (orders), `avg_amount`",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'order_by',
+            openapi.IN_QUERY,
+            description="Comma-separated metrics or group_by dimensions, `-` prefix for descending",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'top',
+            openapi.IN_QUERY,
+            description="Keep only this many groups",
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'other',
+            openapi.IN_QUERY,
+            description="Sum the groups beyond `top` into an `Other` row (default true)",
+            type=openapi.TYPE_BOOLEAN
+        ),
+        *sales_filter_parameters,
+    ],
+    responses={
+        200: openapi.Response(
+            description="Aggregated rows",
+            examples={
+                "application/json": {
+                    "group_by": ["month", "category"],
+                    "metrics": ["sum_amount", "count"],
+                    "results": [
+                        {"month": "2022-04-01", "category": "Set", "sum_amount": 25000.5, "count": 40},
+                        {"month": "2022-04-01", "category": "kurta", "sum_amount": 18000.0, "count": 51},
+                        {"month": "2022-04-01", "category": "Other", "sum_amount": 3200.0, "count": 9, "other": True}
+                    ]
+                }
+            }
+        ),
+        400: openapi.Response(
+            description="Invalid parameter",
+            examples={"application/json": {"error": "group_by accepts at most one time bucket"}}
+        ),
+        401: "Unauthorized"
+    },
+    tags=["Sales Analytics"]
+)
+
+
 top_cities_docs = swagger_auto_schema(
     method='get',
     operation_description=(
@@ -85,7 +616,8 @@ top_cities_docs = swagger_auto_schema(
         "**Query Parameters:**\n"
         "- `limit` *(integer, optional)*: Number of top cities to return. Default is `10`.\n"
         "- `start_date` *(string, optional)*: Filter orders from this date (format: YYYY-MM-DD).\n"
-        "- `end_date` *(string, optional)*: Filter orders up to this date (format: YYYY-MM-DD).\n\n"
+        "- `end_date` *(string, optional)*: Filter orders up to this date (format: YYYY-MM-DD).\n"
+        "- The other sales filters (`category`, `status`, `country`, `state`, `city`) apply too.\n\n"
         "**Response:** Returns a list of cities with total orders."
     ),
     manual_parameters=[
@@ -95,20 +627,7 @@ top_cities_docs = swagger_auto_schema(
             description="Number of top cities to return (default is 10)",
             type=openapi.TYPE_INTEGER
         ),
-        openapi.Parameter(
-            'start_date',
-            openapi.IN_QUERY,
-            description="Filter orders from this date (YYYY-MM-DD)",
-            type=openapi.TYPE_STRING,
-            format='date'
-        ),
-        openapi.Parameter(
-            'end_date',
-            openapi.IN_QUERY,
-            description="Filter orders up to this date (YYYY-MM-DD)",
-            type=openapi.TYPE_STRING,
-            format='date'
-        ),
+        *sales_filter_parameters,
     ],
     responses={
         200: openapi.Response(
@@ -159,6 +678,7 @@ sales_by_region_docs = swagger_auto_schema(
             enum=["country", "state", "city"],
             default="state"
         ),
+        *sales_filter_parameters,
     ],
     responses={
         200: openapi.Response(
@@ -189,6 +709,7 @@ orders_by_status_docs = swagger_auto_schema(
         "Retrieve the count of orders grouped by their status.\n\n"
         "Returns a list of order statuses and the number of orders for each status."
     ),
+    manual_parameters=sales_filter_parameters,
     responses={
         200: openapi.Response(
             description="List of order statuses with order counts",
@@ -218,6 +739,7 @@ sales_by_category_docs = swagger_auto_schema(
         "Retrieve total sales aggregated by product category.\n\n"
         "Returns a list of categories and the total sales amount for each category."
     ),
+    manual_parameters=sales_filter_parameters,
     responses={
         200: openapi.Response(
             description="List of categories with total sales",
@@ -244,8 +766,36 @@ sales_trend_docs = swagger_auto_schema(
     method='get',
     operation_description=(
         "Retrieve total sales aggregated by order date.\n\n"
-        "Returns a list of dates and the corresponding total sales for each date."
+        "Returns a list of dates and the corresponding total sales for each date, in date order. "
+        "With `granularity` other than `day`, each date is the first day of its week (Monday), "
+        "month or quarter. Periods without sales between the start (`start_date` or the first "
+        "sale) and the end (`end_date` or the last sale) are included with `0` unless "
+        "`fill=false`. `max_points` caps the series using LTTB downsampling, which keeps "
+        "peaks and troughs."
     ),
+    manual_parameters=[
+        openapi.Parameter(
+            'granularity',
+            openapi.IN_QUERY,
+            description="Bucket size",
+            type=openapi.TYPE_STRING,
+            enum=["day", "week", "month", "quarter"],
+            default="day"
+        ),
+        openapi.Parameter(
+            'fill',
+            openapi.IN_QUERY,
+            description="Include periods without sales as 0 (default true)",
+            type=openapi.TYPE_BOOLEAN
+        ),
+        openapi.Parameter(
+            'max_points',
+            openapi.IN_QUERY,
+            description="Downsample to at most this many points (3 or more)",
+            type=openapi.TYPE_INTEGER
+        ),
+        *sales_filter_parameters,
+    ],
     responses={
         200: openapi.Response(
             description="List of dates with total sales",
@@ -268,11 +818,12 @@ sales_trend_docs = swagger_auto_schema(
 )
 
 sales_kpi_summary_docs = swagger_auto_schema(
-    method='get',
     operation_description=(
         "Retrieve overall KPI summary for sales.\n\n"
-        "Returns total sales amount, total number of orders, and total quantity sold."
+        "Returns total sales amount, total number of orders, total quantity sold and "
+        "average order value, computed in a single query. Accepts the common sales filters."
     ),
+    manual_parameters=sales_filter_parameters,
     responses={
         200: openapi.Response(
             description="Sales KPI summary",
@@ -280,10 +831,17 @@ sales_kpi_summary_docs = swagger_auto_schema(
                 "application/json": {
                     "total_sales_amount": 125000.50,
                     "total_orders": 320,
-                    "total_qty": 850
+                    "total_qty": 850,
+                    "avg_order_value": 390.63
                 }
             }
         ),
+        400: openapi.Response(
+            description="Invalid filter",
+            examples={
+                "application/json": {"error": "Invalid start_date '2025-13-01', expected YYYY-MM-DD"}
+            }
+        ),
         401: openapi.Response(
             description="Unauthorized",
             examples={
@@ -292,4 +850,32 @@ sales_kpi_summary_docs = swagger_auto_schema(
         )
     },
     tags=["KPI Summary"]
-)
\ No newline at end of file
+)
+
+sales_summary_docs = swagger_auto_schema(
+    operation_description=(
+        "Retrieve the order count, total sales and covered date range.\n\n"
+        "Accepts the common sales filters."
+    ),
+    manual_parameters=sales_filter_parameters,
+    responses={
+        200: openapi.Response(
+            description="Sales summary",
+            examples={
+                "application/json": {
+                    "total_orders": 320,
+                    "total_sales": 125000.50,
+                    "min_date": "2022-03-31",
+                    "max_date": "2022-06-29"
+                }
+            }
+        ),
+        401: openapi.Response(
+            description="Unauthorized",
+            examples={
+                "application/json": {"detail": "Authentication credentials were not provided."}
+            }
+        )
+    },
+    tags=["KPI Summary"]
+)
@@ -0,0 +1,35 @@
+"""
+Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013).
+
+Thins a line series to a fixed number of points while keeping its
+visual shape: the first and last points are kept and every bucket in
+between contributes the point forming the largest triangle with the
+point chosen before it and the average of the next bucket.
+"""
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points of (x, y) to keep, in order."""
+    n = len(x)
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+    if n <= threshold:
+        return list(range(n))
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected.append(a)
+    selected.append(n - 1)
+    return selected
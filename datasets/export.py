@@ -0,0 +1,160 @@
+"""
+Streaming bulk export of Sales.
+
+Rows are read in keyset batches (`id > last id ... LIMIT n`) rather than
+with QuerySet.iterator(): MySQL drivers buffer a whole result set
+client-side, so batching on the primary key is what keeps memory
+constant on every backend. Each format yields output as soon as the
+first batch is encoded.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db import models
+
+from .models import Sales
+from .serializers import sales_row_encoder
+
+try:
+    import pyarrow
+except ImportError:  # Parquet / Arrow export is optional.
+    pyarrow = None
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+ARROW_FORMATS = {"parquet", "arrow"}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def with_id(fields):
+    return list(fields) if "id" in fields else [*fields, "id"]
+
+
+def iter_batches(queryset, fields, batch_size=None):
+    """
+    Yield lists of `values_list(*with_id(fields))` rows, keyset-paginated
+    on id.
+    """
+    batch_size = batch_size or settings.SALES_EXPORT_BATCH_SIZE
+    columns = with_id(fields)
+    id_index = columns.index("id")
+    queryset = queryset.order_by("id").values_list(*columns)
+    last_id = None
+    while True:
+        page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1][id_index]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, fields, batch_size=None):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    encode = sales_row_encoder(fields, with_id(fields))
+    for batch in iter_batches(queryset, fields, batch_size):
+        yield "".join(writer.writerow(encode(row).values()) for row in batch)
+
+
+def stream_ndjson(queryset, fields, batch_size=None):
+    encode = sales_row_encoder(fields, with_id(fields))
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    for batch in iter_batches(queryset, fields, batch_size):
+        yield "".join(dumps(encode(row)) + "\n" for row in batch)
+
+
+def arrow_schema(fields):
+    types = []
+    for name in fields:
+        field = Sales._meta.get_field(name)
+        if isinstance(field, models.DecimalField):
+            arrow_type = pyarrow.decimal128(field.max_digits, field.decimal_places)
+        elif isinstance(field, models.DateField):
+            arrow_type = pyarrow.date32()
+        elif isinstance(field, models.BooleanField):
+            arrow_type = pyarrow.bool_()
+        elif isinstance(field, (models.BigIntegerField, models.BigAutoField)):
+            arrow_type = pyarrow.int64()
+        elif isinstance(field, models.IntegerField):
+            arrow_type = pyarrow.int32()
+        else:
+            arrow_type = pyarrow.string()
+        types.append(pyarrow.field(name, arrow_type, nullable=field.null))
+    return pyarrow.schema(types)
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written so far."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_arrow(queryset, fields, file_format, batch_size=None):
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    schema = arrow_schema(fields)
+    sink = _ChunkSink()
+    if file_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    with writer:
+        for batch in iter_batches(queryset, fields, batch_size):
+            columns = list(zip(*batch))[:len(fields)]
+            table = pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_table(table)
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def stream_export(queryset, fields, file_format, batch_size=None):
+    if file_format not in CONTENT_TYPES:
+        raise ExportError(f"Unsupported file_format '{file_format}', expected one of: {', '.join(CONTENT_TYPES)}")
+    if file_format in ARROW_FORMATS:
+        if pyarrow is None:
+            raise ExportError(f"{file_format} export requires the pyarrow package")
+        return stream_arrow(queryset, fields, file_format, batch_size)
+    if file_format == "ndjson":
+        return stream_ndjson(queryset, fields, batch_size)
+    return stream_csv(queryset, fields, batch_size)
@@ -0,0 +1,172 @@
+"""
+Query-string filters shared by the sales endpoints.
+
+Sales and SalesDailyRollup use the same field names for every filterable
+dimension, so the lookups returned here apply to either.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from .analytics import DIMENSIONS, METRICS, TIME_BUCKETS
+
+FALSE_VALUES = ("0", "false", "no")
+
+FILTER_FIELDS = {
+    "category": "category",
+    "status": "status",
+    "country": "ship_country",
+    "state": "ship_state",
+    "city": "ship_city",
+}
+
+
+class FilterError(ValueError):
+    pass
+
+
+def parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise FilterError(f"Invalid {name} '{value}', expected YYYY-MM-DD")
+
+
+def parse_sales_filters(params):
+    """
+    Build ORM lookups from `start_date`, `end_date` and the dimension
+    parameters in FILTER_FIELDS. Dimensions accept a comma-separated list.
+    """
+    lookups = {}
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+    if start_date:
+        lookups["order_date__gte"] = parse_date(start_date, "start_date")
+    if end_date:
+        lookups["order_date__lte"] = parse_date(end_date, "end_date")
+    if start_date and end_date and lookups["order_date__gte"] > lookups["order_date__lte"]:
+        raise FilterError("start_date must not be after end_date")
+
+    for param, field in FILTER_FIELDS.items():
+        value = params.get(param)
+        if not value:
+            continue
+        values = [item.strip() for item in value.split(",") if item.strip()]
+        if len(values) == 1:
+            lookups[field] = values[0]
+        elif values:
+            lookups[f"{field}__in"] = values
+    return lookups
+
+
+def parse_upload_log_filters(params):
+    """
+    Lookups for the upload history: `user` (username) and the upload day
+    range `start_date`..`end_date`, as bounds on upload_time so an index
+    on it applies.
+    """
+    lookups = {}
+    if params.get("user"):
+        lookups["user__username"] = params["user"]
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+    if start_date:
+        start_date = parse_date(start_date, "start_date")
+        lookups["upload_time__gte"] = timezone.make_aware(datetime.combine(start_date, time.min))
+    if end_date:
+        end_date = parse_date(end_date, "end_date")
+        lookups["upload_time__lt"] = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    if start_date and end_date and start_date > end_date:
+        raise FilterError("start_date must not be after end_date")
+    return lookups
+
+
+def parse_fields(value, allowed):
+    """Parse a sparse fieldset (`fields=a,b`); all of `allowed` when empty."""
+    if not value:
+        return list(allowed)
+    fields = list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise FilterError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields or list(allowed)
+
+
+def _split(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def parse_aggregate_params(params):
+    """
+    Validate the query string of the aggregation endpoint and return the
+    keyword arguments for analytics.aggregate (filters included).
+    """
+    group_by = list(dict.fromkeys(_split(params.get("group_by"))))
+    unknown = [name for name in group_by if name not in DIMENSIONS and name not in TIME_BUCKETS]
+    if unknown:
+        raise FilterError(
+            f"Unknown group_by '{', '.join(unknown)}', expected any of: "
+            f"{', '.join([*DIMENSIONS, *TIME_BUCKETS])}"
+        )
+    if len([name for name in group_by if name in TIME_BUCKETS]) > 1:
+        raise FilterError("group_by accepts at most one time bucket")
+
+    metrics = list(dict.fromkeys(_split(params.get("metrics")))) or ["sum_amount"]
+    unknown = [name for name in metrics if name not in METRICS]
+    if unknown:
+        raise FilterError(f"Unknown metric '{', '.join(unknown)}', expected any of: {', '.join(METRICS)}")
+
+    order_by = _split(params.get("order_by"))
+    unknown = [item for item in order_by if item.lstrip("-") not in group_by + METRICS]
+    if unknown:
+        raise FilterError(f"Cannot order by '{', '.join(unknown)}': use a group_by dimension or metric")
+
+    top = params.get("top")
+    if top not in (None, ""):
+        try:
+            top = int(top)
+        except ValueError:
+            top = -1
+        if top < 0:
+            raise FilterError("top must be a non-negative integer")
+    else:
+        top = None
+
+    return {
+        "group_by": group_by,
+        "metrics": metrics,
+        "filters": parse_sales_filters(params),
+        "order_by": order_by or None,
+        "top": top,
+        "other": params.get("other", "true").lower() not in FALSE_VALUES,
+    }
+
+
+def parse_trend_params(params):
+    """`granularity`, `fill` and `max_points` of the sales trend."""
+    granularity = params.get("granularity") or "day"
+    if granularity not in TIME_BUCKETS:
+        raise FilterError(f"Invalid granularity '{granularity}', expected one of: {', '.join(TIME_BUCKETS)}")
+    max_points = params.get("max_points")
+    if max_points:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            max_points = 0
+        if max_points < 3:
+            raise FilterError("max_points must be an integer of at least 3")
+    return {
+        "granularity": granularity,
+        "fill": params.get("fill", "true").lower() not in FALSE_VALUES,
+        "max_points": max_points or None,
+    }
+
+
+def parse_limit(value, default=10):
+    """The `limit` of the top cities: an integer, negative values meaning 0."""
+    if value in (None, ""):
+        return default
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        raise FilterError("limit must be an integer")
@@ -0,0 +1,292 @@
+import logging
+import multiprocessing
+import os
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pandas as pd
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+
+from . import parallel, rollups
+from .models import Sales
+from .validation import validate_frame
+
+logger = logging.getLogger(__name__)
+
+# Headers in the Amazon sales report that don't normalise to a field name.
+COLUMN_ALIASES = {
+    "date": "order_date",
+}
+
+SALES_FIELDS = {
+    field.name: field
+    for field in Sales._meta.concrete_fields
+    if not field.primary_key and field.editable
+}
+
+# Natural key of a sale; ingestion upserts on it (see load_frame).
+KEY_FIELDS = ["order_id", "sku", "asin"]
+
+REQUIRED_FIELDS = [
+    name for name, field in SALES_FIELDS.items()
+    if not field.null and not field.has_default()
+]
+
+
+class CSVIngestError(ValueError):
+    pass
+
+
+@dataclass
+class IngestResult:
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+
+    @property
+    def loaded(self):
+        """Rows of the file now reflected in the Sales table."""
+        return self.inserted + self.updated + self.unchanged
+
+    def add(self, other):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+
+
+def normalize_header(name):
+    key = re.sub(r"[\s\-]+", "_", str(name).strip().lower())
+    return COLUMN_ALIASES.get(key, key)
+
+
+def prepare_frame(frame):
+    """
+    Map one CSV chunk onto Sales fields and validate it (see
+    validation.py). Returns (valid rows coerced to the field types,
+    errors).
+    """
+    frame = frame.set_axis([normalize_header(name) for name in frame.columns], axis=1, copy=False)
+    frame = frame.loc[:, ~frame.columns.duplicated()] if frame.columns.has_duplicates else frame
+    return validate_frame(frame, SALES_FIELDS, REQUIRED_FIELDS)
+
+
+def build_objects(frame):
+    fields = {name: Sales._meta.get_field(name) for name in frame.columns}
+    decimal_fields = [
+        name for name, field in fields.items()
+        if isinstance(field, models.DecimalField)
+    ]
+    integer_fields = [
+        name for name, field in fields.items()
+        if isinstance(field, models.IntegerField)
+    ]
+    frame = frame.astype(object).where(frame.notna(), None)
+
+    objects = []
+    for row in frame.to_dict("records"):
+        for name in decimal_fields:
+            row[name] = Decimal(f"{row[name]:.2f}")
+        for name in integer_fields:
+            row[name] = int(row[name])
+        objects.append(Sales(**row))
+    return objects
+
+
+def content_hashes(frame):
+    """
+    Signed 64-bit hash of every row's stored values (a column the chunk
+    lacks counts as the field's default), as numpy int64.
+    """
+    columns = {}
+    for name, field in SALES_FIELDS.items():
+        if name in frame:
+            column = frame[name]
+        else:
+            column = pd.Series(field.get_default(), index=frame.index, dtype=object)
+        if isinstance(field, models.DecimalField):
+            column = (column.astype(float) * 10 ** field.decimal_places).round().astype("int64")
+        elif isinstance(field, models.IntegerField):
+            column = column.astype("int64")
+        elif isinstance(field, models.BooleanField):
+            column = column.astype(bool)
+        else:
+            column = column.astype(object).where(column.notna(), None).astype(str)
+        columns[name] = column
+    hashed = pd.util.hash_pandas_object(pd.DataFrame(columns, index=frame.index), index=False)
+    return hashed.to_numpy().view("int64")
+
+
+def _natural_keys(frame):
+    return [
+        rollups.match_key(key)
+        for key in zip(*(frame[name] if name in frame else [""] * len(frame) for name in KEY_FIELDS))
+    ]
+
+
+def _stored_rows(keys, fields, batch_size, lock=False):
+    """{natural key: values of `fields`} of the stored rows among `keys`."""
+    order_ids = sorted({key[0] for key in keys})
+    wanted = set(keys)
+    stored = {}
+    queryset = Sales.objects.select_for_update() if lock else Sales.objects
+    for start in range(0, len(order_ids), batch_size):
+        rows = queryset.filter(order_id__in=order_ids[start:start + batch_size]).values_list(*KEY_FIELDS, *fields)
+        for row in rows:
+            key = rollups.match_key(row[:len(KEY_FIELDS)])
+            if key in wanted:
+                stored[key] = row[len(KEY_FIELDS):]
+    return stored
+
+
+def _upsert(frame, keys, batch_size):
+    result = IngestResult()
+    hashes = frame["row_hash"].tolist()
+    stored = _stored_rows(keys, ["row_hash"], batch_size)
+    new = [key not in stored for key in keys]
+    changed = [key in stored and stored[key][0] != row_hash for key, row_hash in zip(keys, hashes)]
+
+    # Rows to overwrite are locked and re-read, so the values they take
+    # out of the rollup are the ones being replaced.
+    old_fields = ["row_hash", *rollups.ROLLUP_DIMENSIONS, "amount", "qty"]
+    old = _stored_rows([key for key, c in zip(keys, changed) if c], old_fields, batch_size, lock=True)
+    for i, key in enumerate(keys):
+        if changed[i] and key not in old:
+            changed[i], new[i] = False, True
+        elif changed[i] and old[key][0] == hashes[i]:
+            changed[i] = False
+
+    delta = rollups.frame_delta(frame[new])
+    if any(changed):
+        replaced = [old[key] for key, c in zip(keys, changed) if c]
+        rollups.frame_delta(pd.DataFrame(replaced, columns=old_fields), sign=-1, delta=delta)
+        rollups.frame_delta(frame[changed], delta=delta)
+
+    inserts = build_objects(frame[new])
+    Sales.objects.bulk_create(inserts, batch_size=batch_size)
+    updates = build_objects(frame[changed])
+    if updates:
+        with_target = connection.features.supports_update_conflicts_with_target
+        Sales.objects.bulk_create(
+            updates,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=KEY_FIELDS if with_target else None,
+            update_fields=[name for name in frame.columns if name not in KEY_FIELDS],
+        )
+    rollups.apply_delta(delta)
+
+    result.inserted, result.updated = len(inserts), len(updates)
+    result.unchanged = len(keys) - result.inserted - result.updated
+    return result
+
+
+def load_frame(frame, batch_size=None):
+    """
+    Upsert an already prepared chunk on the natural key (KEY_FIELDS) and
+    fold the change into the daily rollup, in a single transaction.
+    Rows whose content hash matches the stored row are not written; rows
+    repeated within the chunk keep their last occurrence. Returns an
+    IngestResult with the inserted, updated and unchanged counts.
+    """
+    batch_size = batch_size or settings.CSV_INGEST_BATCH_SIZE
+    frame = frame.assign(row_hash=content_hashes(frame))
+    keys = _natural_keys(frame)
+
+    result = IngestResult()
+    repeated = pd.Series(keys, dtype=object).duplicated(keep="last").to_numpy()
+    if repeated.any():
+        hashes = frame["row_hash"].tolist()
+        last_hash = dict(zip(keys, hashes))
+        for key, row_hash, r in zip(keys, hashes, repeated):
+            if r and last_hash[key] == row_hash:
+                result.unchanged += 1
+            elif r:
+                result.updated += 1
+        frame = frame[~repeated]
+        keys = [key for key, r in zip(keys, repeated) if not r]
+
+    # A row inserted concurrently under the same key makes the insert
+    # fail; the retry finds it stored and updates it instead.
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                result.add(_upsert(frame, keys, batch_size))
+                return result
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+def check_columns(columns):
+    present = {normalize_header(name) for name in columns}
+    missing = [name for name in REQUIRED_FIELDS if name not in present]
+    if missing:
+        raise CSVIngestError(f"CSV is missing required columns: {', '.join(missing)}")
+
+
+def read_header(source):
+    columns = pd.read_csv(source, nrows=0).columns
+    check_columns(columns)
+    return list(columns)
+
+
+def write_error_report(errors, path, header):
+    """Append validation errors to the CSV at `path`, with file line numbers."""
+    report = errors.assign(row=errors["row"] + 2).rename(columns={"row": "line"})
+    report.to_csv(path, mode="w" if header else "a", header=header, index=False)
+
+
+def read_chunks(source, chunk_size=None, workers=None):
+    """
+    Yield (valid frame, errors, rows read) for each chunk of a sales CSV,
+    in file order. With more than one worker, a file path is parsed and
+    validated in a process pool (see parallel.py).
+    """
+    chunk_size = chunk_size or settings.CSV_INGEST_CHUNK_SIZE
+    workers = workers or settings.CSV_INGEST_WORKERS
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.warning("Daemonic processes cannot start a process pool; parsing the CSV in one process")
+        workers = 1
+
+    if workers > 1 and isinstance(source, (str, os.PathLike)):
+        yield from parallel.parse_file(source, read_header(source), chunk_size, workers)
+        return
+
+    reader = pd.read_csv(source, chunksize=chunk_size, dtype=str)
+    with reader:
+        for i, chunk in enumerate(reader):
+            if not i:
+                check_columns(chunk.columns)
+            frame, errors = prepare_frame(chunk)
+            yield frame, errors, len(chunk)
+
+
+def ingest_csv(source, chunk_size=None, batch_size=None, progress=None, error_report=None, workers=None):
+    """
+    Stream a sales CSV into the Sales table `chunk_size` rows at a time so
+    memory stays bounded by the chunk, not the file. Each chunk is
+    committed on its own and reported to `progress`, if given. Rows that
+    fail validation are skipped; when `error_report` is a path, their
+    problems are written there as CSV (line, column, value, error).
+    `workers` (default CSV_INGEST_WORKERS) processes parse and validate
+    the file while this one writes to the database.
+    """
+    result = IngestResult()
+    for frame, errors, rows_read in read_chunks(source, chunk_size, workers):
+        result.rows_read += rows_read
+        if len(errors) and error_report:
+            write_error_report(errors, error_report, header=not result.skipped)
+        result.skipped += rows_read - len(frame)
+        result.add(load_frame(frame, batch_size=batch_size))
+        if progress:
+            progress(result)
+
+    if result.skipped:
+        logger.warning(
+            f"Skipped {result.skipped} of {result.rows_read} CSV rows that failed validation"
+        )
+    return result
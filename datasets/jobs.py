@@ -0,0 +1,129 @@
+import logging
+import os
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .ingest import IngestResult, ingest_csv
+from .models import CSVUploadLog
+from .uploads import error_report_path, stale_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_upload(user, file_name, file_path, content_hash=""):
+    return CSVUploadLog.objects.create(
+        user=user,
+        file_name=file_name,
+        file_path=file_path,
+        content_hash=content_hash,
+        status=CSVUploadLog.PENDING,
+    )
+
+
+def recover_stale_jobs():
+    """
+    Queue again the running jobs whose worker died mid-job, or mark them
+    failed once they have been claimed CSV_INGEST_MAX_ATTEMPTS times, so
+    that a file which keeps killing its worker is not retried forever.
+    Ingestion is idempotent, so rows the dead worker loaded are not
+    duplicated. Returns (requeued, failed).
+    """
+    now = timezone.now()
+    failed = stale_jobs().filter(attempts__gte=settings.CSV_INGEST_MAX_ATTEMPTS).update(
+        status=CSVUploadLog.FAILED,
+        error="The ingestion worker stopped while loading this file",
+        finished_at=now,
+    )
+    requeued = stale_jobs().update(status=CSVUploadLog.PENDING, started_at=None, heartbeat_at=None)
+    if requeued or failed:
+        logger.warning(f"Recovered stalled ingestion jobs: {requeued} requeued, {failed} failed")
+    return requeued, failed
+
+
+def claim_next_job():
+    """
+    Move the oldest pending job to running and return it. The conditional
+    UPDATE makes the claim atomic, so several workers can poll the same
+    table without picking up the same job. Stalled jobs are recovered
+    first.
+    """
+    recover_stale_jobs()
+    pending = (
+        CSVUploadLog.objects
+        .filter(status=CSVUploadLog.PENDING)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for job_id in pending[:10]:
+        now = timezone.now()
+        claimed = CSVUploadLog.objects.filter(pk=job_id, status=CSVUploadLog.PENDING).update(
+            status=CSVUploadLog.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return CSVUploadLog.objects.get(pk=job_id)
+    return None
+
+
+def release_job(job):
+    """Put a job its worker is shutting down on back in the queue."""
+    CSVUploadLog.objects.filter(pk=job.pk, status=CSVUploadLog.RUNNING).update(
+        status=CSVUploadLog.PENDING,
+        started_at=None,
+        heartbeat_at=None,
+        attempts=F("attempts") - 1,
+    )
+
+
+def _counts(result):
+    """CSVUploadLog counters for an IngestResult."""
+    return {
+        "rows_processed": result.rows_read,
+        "row_count": result.loaded,
+        "rows_skipped": result.skipped,
+        "rows_inserted": result.inserted,
+        "rows_updated": result.updated,
+        "rows_unchanged": result.unchanged,
+    }
+
+
+def run_job(job):
+    def report(result):
+        CSVUploadLog.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now(), **_counts(result))
+
+    if not job.started_at:
+        job.started_at = timezone.now()
+    # A report left by an earlier run of the same job would be stale.
+    report_path = error_report_path(job)
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    try:
+        result = ingest_csv(job.file_path, progress=report, error_report=report_path)
+    except Exception as e:
+        logger.error(f"Ingestion job {job.pk} ({job.file_name}) failed: {str(e)}", exc_info=True)
+        job.refresh_from_db(fields=list(_counts(IngestResult())))
+        job.status = CSVUploadLog.FAILED
+        job.error = str(e)
+    else:
+        job.status = CSVUploadLog.COMPLETED
+        for name, value in _counts(result).items():
+            setattr(job, name, value)
+    job.error_report = report_path if os.path.exists(report_path) else ""
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def process_pending_jobs(limit=None):
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.openapi import generate_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema to a file for the docs endpoints to serve (see OPENAPI_SCHEMA_FILE)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="File to write; defaults to OPENAPI_SCHEMA_FILE.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["output"] or settings.OPENAPI_SCHEMA_FILE
+        if not path:
+            raise CommandError("Pass --output or set OPENAPI_SCHEMA_FILE.")
+        content = generate_schema()
+        with open(path, "wb") as f:
+            f.write(content)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the OpenAPI schema ({len(content):,} bytes) to {path}."))
@@ -0,0 +1,94 @@
+import multiprocessing
+import signal
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from datasets.jobs import claim_next_job, process_pending_jobs, release_job, run_job
+
+
+def stop(signum, frame):
+    sys.exit(0)
+
+
+def work(poll_interval):
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while True:
+        job = claim_next_job()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        try:
+            run_job(job)
+        except (SystemExit, KeyboardInterrupt):
+            # Stopped, not failed: hand the job to the next worker now.
+            release_job(job)
+            raise
+
+
+class Command(BaseCommand):
+    help = "Process queued CSV ingestion jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Number of worker processes polling the job queue.",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Process the jobs currently queued, then exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            processed = process_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} ingestion job(s)."))
+            return
+
+        workers = max(1, options["workers"])
+        self.stdout.write(f"Starting {workers} ingestion worker(s).")
+        if workers == 1:
+            work(options["poll_interval"])
+            return
+
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        # Not daemonic: each worker may start its own pool to parse files
+        # (CSV_INGEST_WORKERS), which daemonic processes cannot. They are
+        # stopped explicitly instead when the command is.
+        processes = [
+            multiprocessing.Process(target=work, args=(options["poll_interval"],))
+            for _ in range(workers)
+        ]
+
+        stopped = []
+
+        def shutdown(signum, frame):
+            stopped.append(signum)
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        for process in processes:
+            process.start()
+        handlers = {signum: signal.signal(signum, shutdown) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        failed = sum(1 for process in processes if process.exitcode)
+        if failed and not stopped:
+            raise CommandError(f"{failed} of {workers} ingestion worker(s) exited with an error.")
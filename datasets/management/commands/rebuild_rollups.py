@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from datasets import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup from the sales table and check it against the raw data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only compare the rollup with the sales table; do not rebuild it.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            count = rollups.rebuild()
+            self.stdout.write(f"Rebuilt sales rollup with {count} row(s).")
+
+        mismatches = rollups.verify()
+        if mismatches:
+            for key, expected, actual in mismatches:
+                self.stderr.write(f"{key}: expected {expected}, found {actual}")
+            raise CommandError("Sales rollup does not match the sales table.")
+        self.stdout.write(self.style.SUCCESS("Sales rollup matches the sales table."))
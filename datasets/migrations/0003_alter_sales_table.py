@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0002_csvuploadlog"),
+    ]
+
+    operations = [
+        migrations.AlterModelTable(
+            name="sales",
+            table="sales",
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0003_alter_sales_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="file_path",
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="rows_processed",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="rows_skipped",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="status",
+            # Uploads logged before the job queue existed were ingested inline.
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="completed",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="csvuploadlog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="csvuploadlog",
+            name="row_count",
+            field=models.IntegerField(default=0),
+        ),
+    ]
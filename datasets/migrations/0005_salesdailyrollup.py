@@ -0,0 +1,92 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:42
+
+from django.db import migrations, models
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+TEXT_DIMENSIONS = [
+    "category", "status", "ship_state", "ship_city", "ship_country", "sales_channel",
+]
+
+
+def populate_rollup(apps, schema_editor):
+    Sales = apps.get_model("datasets", "Sales")
+    SalesDailyRollup = apps.get_model("datasets", "SalesDailyRollup")
+    rows = (
+        Sales.objects
+        .annotate(**{f"key_{name}": Coalesce(name, Value("")) for name in TEXT_DIMENSIONS})
+        .values("order_date", *(f"key_{name}" for name in TEXT_DIMENSIONS), "b2b")
+        .annotate(total_amount=Sum("amount"), total_qty=Sum("qty"), order_count=Count("id"))
+        .order_by()
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(SalesDailyRollup(
+            order_date=row["order_date"],
+            b2b=row["b2b"],
+            total_amount=row["total_amount"],
+            total_qty=row["total_qty"],
+            order_count=row["order_count"],
+            **{name: row[f"key_{name}"] for name in TEXT_DIMENSIONS},
+        ))
+        if len(batch) >= 2000:
+            SalesDailyRollup.objects.bulk_create(batch)
+            batch = []
+    SalesDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0004_csvuploadlog_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("order_date", models.DateField()),
+                ("category", models.CharField(blank=True, default="", max_length=100)),
+                ("status", models.CharField(blank=True, default="", max_length=50)),
+                ("ship_state", models.CharField(blank=True, default="", max_length=100)),
+                ("ship_city", models.CharField(blank=True, default="", max_length=100)),
+                ("ship_country", models.CharField(blank=True, default="", max_length=50)),
+                ("sales_channel", models.CharField(blank=True, default="", max_length=50)),
+                ("b2b", models.BooleanField(default=False)),
+                (
+                    "total_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("total_qty", models.BigIntegerField(default=0)),
+                ("order_count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "sales_daily_rollup",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "order_date",
+                            "category",
+                            "status",
+                            "ship_state",
+                            "ship_city",
+                            "ship_country",
+                            "sales_channel",
+                            "b2b",
+                        ),
+                        name="sales_daily_rollup_key",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
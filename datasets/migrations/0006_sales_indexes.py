@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0005_salesdailyrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(
+                fields=["order_date", "ship_city", "ship_state", "amount"],
+                name="sales_date_city_state_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["category", "amount"], name="sales_category_amount_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["status"], name="sales_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["ship_state", "amount"], name="sales_state_amount_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["ship_city", "amount"], name="sales_city_amount_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(
+                fields=["ship_country", "amount"], name="sales_country_amount_idx"
+            ),
+        ),
+    ]
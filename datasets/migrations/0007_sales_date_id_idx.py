@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0006_sales_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["order_date", "id"], name="sales_date_id_idx"),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:17
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_sales(apps, schema_editor):
+    """
+    Keep only the most recently loaded row (highest id) of each natural
+    key, then rebuild the rollup if anything was removed.
+    """
+    Sales = apps.get_model("datasets", "Sales")
+    SalesDailyRollup = apps.get_model("datasets", "SalesDailyRollup")
+    duplicates = list(
+        Sales.objects
+        .values("order_id", "sku", "asin")
+        .annotate(keep=Max("id"), rows=Count("id"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for key in duplicates:
+        Sales.objects.filter(
+            order_id=key["order_id"], sku=key["sku"], asin=key["asin"],
+        ).exclude(pk=key["keep"]).delete()
+
+    if duplicates:
+        SalesDailyRollup.objects.all().delete()
+        import_module("datasets.migrations.0005_salesdailyrollup").populate_rollup(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0007_sales_date_id_idx"),
+    ]
+
+    operations = [
+        # Existing NULLs become "" (the new default) as the columns change.
+        migrations.AlterField(
+            model_name="sales",
+            name="sku",
+            field=models.CharField(blank=True, default="", max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="sales",
+            name="asin",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+        migrations.RunPython(drop_duplicate_sales, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="sales",
+            constraint=models.UniqueConstraint(fields=("order_id", "sku", "asin"), name="sales_natural_key"),
+        ),
+        migrations.AddField(
+            model_name="sales",
+            name="row_hash",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="rows_inserted",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="rows_updated",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="rows_unchanged",
+            field=models.IntegerField(default=0),
+        ),
+    ]
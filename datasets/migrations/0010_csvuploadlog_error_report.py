@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0009_upload_sessions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="error_report",
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0010_csvuploadlog_error_report"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="csvuploadlog",
+            index=models.Index(fields=["user", "upload_time", "id"], name="upload_log_user_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="csvuploadlog",
+            index=models.Index(fields=["upload_time", "id"], name="upload_log_time_idx"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0011_csvuploadlog_history_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="attempts",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="csvuploadlog",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
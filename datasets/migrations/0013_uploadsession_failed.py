@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0012_csvuploadlog_heartbeat"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="uploadsession",
+            name="status",
+            field=models.CharField(choices=[("receiving", "Receiving"), ("completed", "Completed"), ("failed", "Failed")], default="receiving", max_length=20),
+        ),
+    ]
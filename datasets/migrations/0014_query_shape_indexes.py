@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("datasets", "0013_uploadsession_failed"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_date_city_state_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_category_amount_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_status_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_state_amount_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_city_amount_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sales",
+            name="sales_country_amount_idx",
+        ),
+        migrations.AddIndex(
+            model_name="sales",
+            index=models.Index(fields=["ship_city", "id"], name="sales_city_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="salesdailyrollup",
+            index=models.Index(fields=["ship_state", "order_date", "category", "status", "total_amount", "total_qty", "order_count"], name="rollup_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="salesdailyrollup",
+            index=models.Index(fields=["ship_city", "ship_state", "order_date", "category", "status", "total_amount", "total_qty", "order_count"], name="rollup_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="salesdailyrollup",
+            index=models.Index(fields=["category", "order_date", "status", "total_amount", "total_qty", "order_count"], name="rollup_category_idx"),
+        ),
+    ]
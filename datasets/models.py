@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Sales(models.Model):
@@ -10,10 +13,12 @@ class Sales(models.Model):
     sales_channel = models.CharField(max_length=50, null=True, blank=True)
     ship_service_level = models.CharField(max_length=50, null=True, blank=True)
     style = models.CharField(max_length=100, null=True, blank=True)
-    sku = models.CharField(max_length=100, null=True, blank=True)
+    # sku and asin complete the natural key with order_id; like the rollup
+    # dimensions they store "" rather than NULL so the key stays unique.
+    sku = models.CharField(max_length=100, blank=True, default="")
     category = models.CharField(max_length=100, null=True, blank=True)
     size = models.CharField(max_length=50, null=True, blank=True)
-    asin = models.CharField(max_length=50, null=True, blank=True)
+    asin = models.CharField(max_length=50, blank=True, default="")
     courier_status = models.CharField(max_length=50, null=True, blank=True)
     qty = models.IntegerField()
     currency = models.CharField(max_length=10)
@@ -25,16 +30,159 @@ class Sales(models.Model):
     promotion_ids = models.TextField(null=True, blank=True)
     b2b = models.BooleanField(default=False)
     fulfilled_by = models.CharField(max_length=50, null=True, blank=True)
+    # Hash of the row's content as last ingested; re-ingesting an identical
+    # row is skipped without a write.
+    row_hash = models.BigIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = "sales"
         managed = True
+        # The dashboard aggregates SalesDailyRollup, so Sales is only read
+        # by the sales list and export, in id order (or (order_date, id)
+        # for keyset pages). A date range or a city can match a small part
+        # of the table, which these find without a scan; a state, category
+        # or status matches enough rows that the id order finds them fast.
+        indexes = [
+            models.Index(fields=["order_date", "id"], name="sales_date_id_idx"),
+            models.Index(fields=["ship_city", "id"], name="sales_city_id_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["order_id", "sku", "asin"], name="sales_natural_key"),
+        ]
+
+class SalesDailyRollup(models.Model):
+    """
+    Sales pre-aggregated per day and dashboard dimension. Missing text
+    dimensions are stored as "" so the natural key stays unique.
+    """
+
+    order_date = models.DateField()
+    category = models.CharField(max_length=100, blank=True, default="")
+    status = models.CharField(max_length=50, blank=True, default="")
+    ship_state = models.CharField(max_length=100, blank=True, default="")
+    ship_city = models.CharField(max_length=100, blank=True, default="")
+    ship_country = models.CharField(max_length=50, blank=True, default="")
+    sales_channel = models.CharField(max_length=50, blank=True, default="")
+    b2b = models.BooleanField(default=False)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    total_qty = models.BigIntegerField(default=0)
+    order_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "sales_daily_rollup"
+        # The unique key serves date ranges. A region or category filter
+        # reads one of these instead, and as they carry the other filtered
+        # columns and the totals, grouping by any dimension (which SQLite
+        # may do by walking an index in order) never reads the table.
+        indexes = [
+            models.Index(
+                fields=[
+                    "ship_state", "order_date", "category", "status",
+                    "total_amount", "total_qty", "order_count",
+                ],
+                name="rollup_state_idx",
+            ),
+            models.Index(
+                fields=[
+                    "ship_city", "ship_state", "order_date", "category", "status",
+                    "total_amount", "total_qty", "order_count",
+                ],
+                name="rollup_city_idx",
+            ),
+            models.Index(
+                fields=["category", "order_date", "status", "total_amount", "total_qty", "order_count"],
+                name="rollup_category_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "order_date", "category", "status", "ship_state",
+                    "ship_city", "ship_country", "sales_channel", "b2b",
+                ],
+                name="sales_daily_rollup_key",
+            ),
+        ]
+
 
 class CSVUploadLog(models.Model):
+    """An uploaded CSV file and the ingestion job that loads it."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     file_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500, blank=True)
+    # SHA-256 of the file; identical re-uploads reuse the job (see uploads.py).
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     upload_time = models.DateTimeField(auto_now_add=True)
-    row_count = models.IntegerField()
-    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    row_count = models.IntegerField(default=0)
+    rows_processed = models.IntegerField(default=0)
+    rows_skipped = models.IntegerField(default=0)
+    rows_inserted = models.IntegerField(default=0)
+    rows_updated = models.IntegerField(default=0)
+    rows_unchanged = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    # CSV of the rows that failed validation (line, column, value, error).
+    error_report = models.CharField(max_length=500, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker after every chunk; a running job whose
+    # heartbeat is older than CSV_INGEST_JOB_TIMEOUT lost its worker.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
+
+    class Meta:
+        # Upload history: newest first, overall or per user (keyset paged).
+        indexes = [
+            models.Index(fields=["user", "upload_time", "id"], name="upload_log_user_time_idx"),
+            models.Index(fields=["upload_time", "id"], name="upload_log_time_idx"),
+        ]
+
+    @property
+    def throughput(self):
+        """Rows processed per second while the job has been running."""
+        if not self.started_at:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0.0
+
     def __str__(self):
         return f"{self.file_name} by {self.user.username}"
+
+
+class UploadSession(models.Model):
+    """A resumable upload of a CSV file sent in parts (see uploads.py)."""
+
+    RECEIVING = "receiving"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (RECEIVING, "Receiving"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file_name = models.CharField(max_length=255)
+    size = models.BigIntegerField(null=True, blank=True)
+    received = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RECEIVING)
+    job = models.ForeignKey(CSVUploadLog, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.received} bytes) by {self.user.username}"
@@ -1,6 +1,171 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+FALSE_VALUES = {"0", "false", "no", "n", "f"}
+
 
 class SalesPagination(PageNumberPagination):
-    page_size = 20  
-    page_size_query_param = "page_size"  
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.include_count = request.query_params.get(self.count_query_param, "").lower() not in FALSE_VALUES
+        if self.include_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        # Without the COUNT(*) we only learn whether a next page exists by
+        # fetching one row more than the page holds.
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound("Invalid page.")
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.include_count:
+            return super().get_paginated_response(data)
+        url = self.request.build_absolute_uri()
+        next_url = replace_query_param(url, self.page_query_param, self.page_number + 1) if self.has_next else None
+        previous_url = None
+        if self.page_number == 2:
+            previous_url = remove_query_param(url, self.page_query_param)
+        elif self.page_number > 2:
+            previous_url = replace_query_param(url, self.page_query_param, self.page_number - 1)
+        return Response({"next": next_url, "previous": previous_url, "results": data})
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination: each page continues from the key of the
+    last row seen instead of an OFFSET, and no total is counted, so deep
+    pages cost the same as the first one. Subclasses name the keys in
+    `orderings`; `descending` lists newest keys first.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
     max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    orderings = {
+        "id": ("id",),
+    }
+    default_ordering = "id"
+    descending = False
+
+    def parse_value(self, field, value):
+        return int(value)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = [
+                self.parse_value(field, value)
+                for field, value in zip(self.key, cursor["p"], strict=True)
+            ]
+            return bool(cursor.get("r")), position
+        except (ValueError, TypeError, KeyError):
+            raise NotFound("Invalid cursor.")
+
+    def encode_cursor(self, row, reverse):
+        position = [self.row_value(row, field) for field in self.key]
+        cursor = {"p": [str(value) for value in position], "r": int(reverse)}
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def row_value(row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def after(self, position, reverse):
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        op = "lt" if reverse != self.descending else "gt"
+        condition = Q()
+        for i, field in enumerate(self.key):
+            equal = {name: value for name, value in zip(self.key[:i], position[:i])}
+            condition |= Q(**equal, **{f"{field}__{op}": position[i]})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        self.key = self.orderings.get(ordering, self.orderings[self.default_ordering])
+        page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*(f"-{field}" if reverse != self.descending else field for field in self.key))
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = (has_more and not reverse) or (reverse and position is not None)
+        has_previous = (has_more and reverse) or (not reverse and position is not None)
+        self.next_url = self.encode_cursor(rows[-1], False) if rows and has_next else None
+        self.previous_url = self.encode_cursor(rows[0], True) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next_url, "previous": self.previous_url, "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class SalesKeysetPagination(KeysetPagination):
+    orderings = {
+        "id": ("id",),
+        "order_date": ("order_date", "id"),
+    }
+
+    def parse_value(self, field, value):
+        return date.fromisoformat(value) if field == "order_date" else int(value)
+
+
+class UploadLogPagination(KeysetPagination):
+    orderings = {
+        "upload_time": ("upload_time", "id"),
+    }
+    default_ordering = "upload_time"
+    descending = True
+
+    def parse_value(self, field, value):
+        return datetime.fromisoformat(value) if field == "upload_time" else int(value)
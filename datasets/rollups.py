@@ -0,0 +1,206 @@
+"""
+Maintenance of SalesDailyRollup.
+
+Ingestion applies the delta of every chunk it inserts and single-row ORM
+writes are tracked through signals (see signals.py). Bulk queryset
+updates and deletes bypass both, so run `manage.py rebuild_rollups`
+after changing Sales that way. Every rollup change also invalidates the
+analytics response cache.
+"""
+from decimal import Decimal
+
+import pandas as pd
+from django.db import connection, transaction
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .cache import invalidate_analytics
+from .models import Sales, SalesDailyRollup
+
+ROLLUP_DIMENSIONS = [
+    "order_date", "category", "status", "ship_state",
+    "ship_city", "ship_country", "sales_channel", "b2b",
+]
+TEXT_DIMENSIONS = ROLLUP_DIMENSIONS[1:-1]
+
+_amount_field = Sales._meta.get_field("amount")
+_date_field = Sales._meta.get_field("order_date")
+
+
+def match_value(value):
+    # MySQL's default collations compare text case-insensitively and
+    # ignore trailing spaces, so values collapse the same way there.
+    if connection.vendor != "mysql" or not isinstance(value, str):
+        return value
+    return value.rstrip().casefold()
+
+
+def match_key(key):
+    if connection.vendor != "mysql":
+        return key
+    return tuple(match_value(value) for value in key)
+
+
+def _merge(delta, key, cents, qty, count):
+    totals = delta.setdefault(key, [0, 0, 0])
+    totals[0] += cents
+    totals[1] += qty
+    totals[2] += count
+
+
+def frame_delta(frame, sign=1, delta=None):
+    """
+    Aggregate a prepared ingestion chunk into {key: [cents, qty, count]},
+    or with sign=-1 its removal; adds to `delta` when given.
+    """
+    delta = {} if delta is None else delta
+    if frame.empty:
+        return delta
+    keys = pd.DataFrame(index=frame.index)
+    keys["order_date"] = frame["order_date"]
+    for name in TEXT_DIMENSIONS:
+        keys[name] = frame[name].fillna("") if name in frame else ""
+    keys["b2b"] = frame["b2b"].astype(bool) if "b2b" in frame else False
+    keys["cents"] = (frame["amount"].astype(float) * 100).round().astype("int64")
+    keys["qty"] = frame["qty"].astype("int64")
+
+    grouped = keys.groupby(ROLLUP_DIMENSIONS, sort=False).agg(
+        cents=("cents", "sum"),
+        qty=("qty", "sum"),
+        count=("cents", "size"),
+    )
+    for key, cents, qty, count in grouped.itertuples(name=None):
+        _merge(delta, key, sign * int(cents), sign * int(qty), sign * int(count))
+    return delta
+
+
+def add_instance(delta, sale, sign=1):
+    """Add (or with sign=-1 remove) one Sales row to a delta."""
+    key = (
+        _date_field.to_python(sale.order_date),
+        *(getattr(sale, name) or "" for name in TEXT_DIMENSIONS),
+        bool(sale.b2b),
+    )
+    cents = int(_amount_field.to_python(sale.amount) * 100)
+    _merge(delta, key, sign * cents, sign * int(sale.qty), sign)
+    return delta
+
+
+def _upsert_sql():
+    table = connection.ops.quote_name(SalesDailyRollup._meta.db_table)
+    keys = [connection.ops.quote_name(name) for name in ROLLUP_DIMENSIONS]
+    totals = [connection.ops.quote_name(name) for name in ("total_amount", "total_qty", "order_count")]
+    insert = (
+        f"INSERT INTO {table} ({', '.join(keys + totals)}) "
+        f"VALUES ({', '.join(['%s'] * (len(keys) + len(totals)))})"
+    )
+    if connection.vendor == "mysql":
+        updates = ", ".join(f"{name} = {name} + VALUES({name})" for name in totals)
+        return f"{insert} ON DUPLICATE KEY UPDATE {updates}"
+    updates = ", ".join(f"{name} = {table}.{name} + excluded.{name}" for name in totals)
+    return f"{insert} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+
+
+def apply_delta(delta):
+    """
+    Fold a delta into the rollup table with one batched upsert that adds
+    to the stored totals. Must run inside the transaction that writes
+    the underlying Sales rows.
+    """
+    # Rows in key order: concurrent loads then lock shared rollup rows in
+    # the same order and wait for each other instead of deadlocking.
+    params = [
+        (
+            connection.ops.adapt_datefield_value(key[0]),
+            *key[1:],
+            connection.ops.adapt_decimalfield_value(Decimal(cents).scaleb(-2), 16, 2),
+            qty,
+            count,
+        )
+        for key, (cents, qty, count) in sorted(delta.items())
+        if cents or qty or count
+    ]
+    if not params:
+        return
+
+    invalidate_analytics()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(_upsert_sql(), params)
+        if any(count < 0 for _, _, count in delta.values()):
+            SalesDailyRollup.objects.filter(
+                order_date__in={key[0] for key in delta},
+                order_count__lte=0,
+            ).delete()
+
+
+def raw_rollup_queryset():
+    """Sales grouped by the rollup key, computed from the raw table."""
+    return (
+        Sales.objects
+        .annotate(**{
+            f"key_{name}": Coalesce(name, Value(""))
+            for name in TEXT_DIMENSIONS
+        })
+        .values("order_date", *(f"key_{name}" for name in TEXT_DIMENSIONS), "b2b")
+        .annotate(
+            total_amount=Sum("amount"),
+            total_qty=Sum("qty"),
+            order_count=Count("id"),
+        )
+        .order_by()
+    )
+
+
+def _raw_rows():
+    for row in raw_rollup_queryset().iterator(chunk_size=2000):
+        key = (
+            row["order_date"],
+            *(row[f"key_{name}"] for name in TEXT_DIMENSIONS),
+            row["b2b"],
+        )
+        yield key, row["total_amount"], row["total_qty"], row["order_count"]
+
+
+def rebuild(batch_size=2000):
+    """Recompute the whole rollup table from Sales. Returns the row count."""
+    total = 0
+    invalidate_analytics()
+    with transaction.atomic():
+        SalesDailyRollup.objects.all().delete()
+        batch = []
+        for key, amount, qty, count in _raw_rows():
+            batch.append(SalesDailyRollup(
+                **dict(zip(ROLLUP_DIMENSIONS, key)),
+                total_amount=amount,
+                total_qty=qty,
+                order_count=count,
+            ))
+            if len(batch) >= batch_size:
+                SalesDailyRollup.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SalesDailyRollup.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def verify(limit=20):
+    """
+    Compare the rollup table with a fresh aggregation of Sales and return
+    up to `limit` mismatches as (key, expected, actual) tuples, where
+    expected and actual are (amount, qty, count) or None.
+    """
+    expected = {
+        match_key(key): (key, (amount, qty, count))
+        for key, amount, qty, count in _raw_rows()
+    }
+    mismatches = []
+    for row in SalesDailyRollup.objects.iterator(chunk_size=2000):
+        key = tuple(getattr(row, name) for name in ROLLUP_DIMENSIONS)
+        actual = (row.total_amount, row.total_qty, row.order_count)
+        _, wanted = expected.pop(match_key(key), (key, None))
+        if wanted != actual:
+            mismatches.append((key, wanted, actual))
+    for key, wanted in expected.values():
+        mismatches.append((key, wanted, None))
+    return mismatches[:limit]
@@ -1,10 +1,53 @@
+from operator import itemgetter
+
+from django.db import models
 from rest_framework import serializers
 from .models import Sales
 
+SALES_FIELD_NAMES = [field.name for field in Sales._meta.concrete_fields if field.editable]
+
+
 class SalesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sales
-        fields = "__all__"
+        exclude = ["row_hash"]
+
+
+def _field_converter(field):
+    # Mirrors what SalesSerializer outputs for each field type.
+    if isinstance(field, models.DecimalField):
+        template = f"{{:.{field.decimal_places}f}}"
+        return template.format
+    if isinstance(field, models.DateField):
+        return lambda value: value.isoformat()
+    return None
+
+
+def sales_row_encoder(fields, columns=None):
+    """
+    Build a function turning a `values_list(*columns)` row into the dict
+    SalesSerializer would produce for `fields`, without instantiating
+    models. Conversions are resolved once here rather than per row.
+    """
+    columns = list(columns or fields)
+    positions = [columns.index(name) for name in fields]
+    pick = itemgetter(*positions) if len(positions) > 1 else (lambda row: (row[positions[0]],))
+    converters = [
+        (i, converter)
+        for i, name in enumerate(fields)
+        if (converter := _field_converter(Sales._meta.get_field(name)))
+    ]
+    names = tuple(fields)
+
+    def encode(row):
+        values = list(pick(row))
+        for i, converter in converters:
+            if values[i] is not None:
+                values[i] = converter(values[i])
+        return dict(zip(names, values))
+
+    return encode
+
 
 class RegionSalesSerializer(serializers.Serializer):
     region = serializers.CharField()
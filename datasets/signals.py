@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import rollups
+from .models import Sales
+
+
+@receiver(pre_save, sender=Sales)
+def remember_previous_sale(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk and not raw:
+        instance._rollup_previous = Sales.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Sales)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    delta = rollups.add_instance({}, instance)
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous is not None:
+        rollups.add_instance(delta, previous, sign=-1)
+    rollups.apply_delta(delta)
+
+
+@receiver(post_delete, sender=Sales)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollups.apply_delta(rollups.add_instance({}, instance, sign=-1))
@@ -0,0 +1,124 @@
+"""
+Synthetic sales data shaped like the Amazon sales report, for benchmarks
+and load tests.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .ingest import load_frame
+from .models import Sales
+
+CITIES = [
+    ("MUMBAI", "MAHARASHTRA"), ("BENGALURU", "KARNATAKA"), ("HYDERABAD", "TELANGANA"),
+    ("NEW DELHI", "DELHI"), ("CHENNAI", "TAMIL NADU"), ("PUNE", "MAHARASHTRA"),
+    ("KOLKATA", "WEST BENGAL"), ("GURUGRAM", "HARYANA"), ("THANE", "MAHARASHTRA"),
+    ("LUCKNOW", "UTTAR PRADESH"), ("NOIDA", "UTTAR PRADESH"), ("JAIPUR", "RAJASTHAN"),
+    ("AHMEDABAD", "GUJARAT"), ("KOCHI", "KERALA"), ("BHOPAL", "MADHYA PRADESH"),
+    ("PATNA", "BIHAR"), ("GUWAHATI", "ASSAM"), ("CHANDIGARH", "CHANDIGARH"),
+    ("INDORE", "MADHYA PRADESH"), ("VISAKHAPATNAM", "ANDHRA PRADESH"),
+]
+CATEGORIES = ["Set", "kurta", "Western Dress", "Top", "Ethnic Dress", "Bottom", "Saree", "Blouse", "Dupatta"]
+STATUSES = [
+    "Shipped", "Shipped - Delivered to Buyer", "Cancelled", "Shipped - Returned to Seller",
+    "Shipped - Picked Up", "Pending", "Pending - Waiting for Pick Up", "Shipped - Out for Delivery",
+]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "3XL", "Free"]
+
+ORDER_ID_PREFIX = "SYN-"
+# Column headers of the Amazon sales report, for write_csv.
+CSV_HEADERS = {
+    "order_id": "Order ID", "order_date": "Date", "status": "Status", "fulfilment": "Fulfilment",
+    "sales_channel": "Sales Channel ", "ship_service_level": "ship-service-level", "style": "Style",
+    "sku": "SKU", "category": "Category", "size": "Size", "asin": "ASIN", "courier_status": "Courier Status",
+    "qty": "Qty", "currency": "currency", "amount": "Amount", "ship_city": "ship-city",
+    "ship_state": "ship-state", "ship_postal_code": "ship-postal-code", "ship_country": "ship-country",
+    "promotion_ids": "promotion-ids", "b2b": "B2B", "fulfilled_by": "fulfilled-by",
+}
+
+
+def zipf_weights(count, exponent=1.0):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def sales_frames(rows, chunk_size=50000, seed=0, start=date(2022, 1, 1), days=365, first_id=0, skew=1.0):
+    """
+    Yield DataFrames of prepared Sales rows (the shape ingest.load_frame
+    takes), `chunk_size` rows at a time. Cities, categories and statuses
+    follow Zipf-like distributions; `skew` scales their exponents (0 makes
+    them uniform).
+    """
+    rng = np.random.default_rng(seed)
+    city_weights = zipf_weights(len(CITIES), skew)
+    category_weights = zipf_weights(len(CATEGORIES), skew)
+    status_weights = zipf_weights(len(STATUSES), 1.5 * skew)
+    cities = np.array([city for city, _ in CITIES], dtype=object)
+    states = np.array([state for _, state in CITIES], dtype=object)
+
+    produced = 0
+    while produced < rows:
+        n = min(chunk_size, rows - produced)
+        ids = pd.Series(np.arange(first_id + produced, first_id + produced + n))
+        city = rng.choice(len(CITIES), size=n, p=city_weights)
+        product = rng.integers(1000, 9999, size=n).astype(str)
+        size = rng.choice(np.array(SIZES, dtype=object), size=n)
+        status = rng.choice(np.array(STATUSES, dtype=object), size=n, p=status_weights)
+        merchant = rng.random(n) < 0.3
+
+        frame = pd.DataFrame({
+            "order_id": ORDER_ID_PREFIX + ids.astype(str).str.zfill(10),
+            "order_date": [start + timedelta(days=int(d)) for d in rng.integers(0, days, size=n)],
+            "status": status,
+            "fulfilment": np.where(merchant, "Merchant", "Amazon"),
+            "sales_channel": np.where(rng.random(n) < 0.01, "Non-Amazon", "Amazon.in"),
+            "ship_service_level": np.where(merchant, "Standard", "Expedited"),
+            "style": "JNE" + pd.Series(product),
+            "sku": "JNE" + pd.Series(product) + "-KR-" + pd.Series(size),
+            "category": rng.choice(np.array(CATEGORIES, dtype=object), size=n, p=category_weights),
+            "size": size,
+            "asin": "B0" + pd.Series(rng.integers(10**7, 10**8, size=n)).astype(str),
+            "courier_status": np.where(status == "Cancelled", "Cancelled", "Shipped"),
+            "qty": rng.choice([0, 1, 1, 1, 1, 1, 2, 3], size=n),
+            "currency": "INR",
+            "amount": np.round(rng.lognormal(6.4, 0.45, size=n), 2),
+            "ship_city": cities[city],
+            "ship_state": states[city],
+            "ship_postal_code": rng.integers(110001, 855117, size=n).astype(str),
+            "ship_country": "IN",
+            "promotion_ids": None,
+            "b2b": rng.random(n) < 0.007,
+            "fulfilled_by": np.where(merchant, "Easy Ship", None),
+        })
+        yield frame
+        produced += n
+
+
+def generate_sales(rows, chunk_size=50000, seed=0, progress=None, **kwargs):
+    """Insert `rows` synthetic sales (and their rollup) and return the count."""
+    inserted = 0
+    for frame in sales_frames(rows, chunk_size=chunk_size, seed=seed, **kwargs):
+        inserted += load_frame(frame).inserted
+        if progress:
+            progress(inserted)
+    return inserted
+
+
+def next_synthetic_id():
+    """First unused synthetic order number, so repeated runs append new orders."""
+    last = (
+        Sales.objects.filter(order_id__startswith=ORDER_ID_PREFIX)
+        .order_by("-order_id").values_list("order_id", flat=True).first()
+    )
+    return int(last[len(ORDER_ID_PREFIX):]) + 1 if last else 0
+
+
+def write_csv(path, rows, chunk_size=50000, seed=0, **kwargs):
+    """Write `rows` synthetic sales as an Amazon sales report CSV."""
+    header = True
+    for frame in sales_frames(rows, chunk_size=chunk_size, seed=seed, **kwargs):
+        frame["order_date"] = pd.to_datetime(frame["order_date"]).dt.strftime("%m-%d-%y")
+        frame.rename(columns=CSV_HEADERS).to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return rows
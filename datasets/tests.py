@@ -1,11 +1,62 @@
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from django.contrib.auth.models import User
-from .models import Sales
-from datetime import date
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Max, Min
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import Sales, SalesDailyRollup, CSVUploadLog
+from .ingest import ingest_csv, prepare_frame
+from .serializers import SalesSerializer
+from .jobs import claim_next_job, process_pending_jobs
+from .uploads import content_path
+from . import analytics, batch, cache, columnar, parallel, rollups
+from .downsample import lttb
+from .synthetic import CITIES
+from backend.compression import brotli, negotiate
+from backend.metrics import registry
+from backend.renderers import ORJSONRenderer
+from backend import openapi, routers
+from backend.routers import REPLICA, ReplicaRouter, replica_reads
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+import csv
+import gzip
+import hashlib
+import json
+import os
+import pandas as pd
+import subprocess
+import sys
+import numpy as np
+import tempfile
+import unittest
+import uuid
+from unittest import mock
 
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "analytics": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
 class BaseTestCase(APITestCase):
     def setUp(self):
         # Create test user
@@ -61,3 +112,1119 @@ class TopCitiesTest(BaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data[0]["city"], "Mumbai")
 
+    def test_invalid_limit(self):
+        response = self.client.get(reverse("top-cities"), {"limit": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "limit must be an integer")
+
+
+SAMPLE_CSV = (
+    "index,Order ID,Date,Status,Fulfilment,Sales Channel ,ship-service-level,Style,SKU,"
+    "Category,Size,ASIN,Courier Status,Qty,currency,Amount,ship-city,ship-state,"
+    "ship-postal-code,ship-country,promotion-ids,B2B,fulfilled-by\n"
+    "0,405-1,04-30-22,Shipped,Amazon,Amazon.in,Expedited,SET389,SET389-KR-NP-S,Set,S,"
+    "B09KXVBD7Z,Shipped,1,INR,647.62,MUMBAI,MAHARASHTRA,400081,IN,,False,\n"
+    "1,405-2,04-30-22,Shipped,Merchant,Amazon.in,Standard,JNE3781,JNE3781-KR-XXXL,kurta,3XL,"
+    "B09K3WFS32,Shipped,1,INR,406,BENGALURU,KARNATAKA,560085,IN,,True,Easy Ship\n"
+    "2,405-3,04-29-22,Cancelled,Amazon,Amazon.in,Expedited,JNE3371,JNE3371-KR-XL,kurta,XL,"
+    "B07WV4JV4D,Cancelled,0,,,PUNE,MAHARASHTRA,411044,IN,,False,\n"
+)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), CSV_INGEST_CHUNK_SIZE=1)
+class CSVUploadTest(BaseTestCase):
+    def upload(self, content, name="sales.csv"):
+        file_obj = SimpleUploadedFile(name, content.encode(), content_type="text/csv")
+        return self.client.post(reverse("upload-csv-file"), {"file": file_obj}, format="multipart")
+
+    def test_upload_is_queued(self):
+        response = self.upload(SAMPLE_CSV)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], CSVUploadLog.PENDING)
+        self.assertEqual(Sales.objects.count(), 2)
+
+        self.assertEqual(process_pending_jobs(), 1)
+
+        job_url = reverse("csv-upload-job", args=[response.data["job_id"]])
+        job = self.client.get(job_url).data
+        self.assertEqual(job["status"], CSVUploadLog.COMPLETED)
+        self.assertEqual(job["rows_processed"], 3)
+        self.assertEqual(job["row_count"], 2)
+        self.assertEqual(job["skipped_rows"], 1)
+        self.assertIsNone(job["error"])
+        self.assertEqual(Sales.objects.count(), 4)
+
+    @override_settings(CSV_INGEST_MODE="inline")
+    def test_inline_upload_inserts_rows(self):
+        response = self.upload(SAMPLE_CSV)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["row_count"], 2)
+        self.assertEqual(response.data["skipped_rows"], 1)
+        self.assertEqual(CSVUploadLog.objects.get().row_count, 2)
+
+        sale = Sales.objects.get(order_id="405-2")
+        self.assertEqual(sale.order_date, date(2022, 4, 30))
+        self.assertEqual(sale.amount, Decimal("406.00"))
+        self.assertEqual(sale.sales_channel, "Amazon.in")
+        self.assertEqual(sale.ship_city, "BENGALURU")
+        self.assertTrue(sale.b2b)
+        self.assertIsNone(sale.promotion_ids)
+
+    def test_reupload_is_idempotent(self):
+        self.upload(SAMPLE_CSV)
+        self.upload(SAMPLE_CSV.replace("406,BENGALURU", "410,BENGALURU"))
+        self.assertEqual(process_pending_jobs(), 2)
+
+        first, second = CSVUploadLog.objects.order_by("id")
+        self.assertEqual((first.rows_inserted, first.rows_updated, first.rows_unchanged), (2, 0, 0))
+        self.assertEqual((second.rows_inserted, second.rows_updated, second.rows_unchanged), (0, 1, 1))
+        self.assertEqual(second.row_count, 2)
+        self.assertEqual(Sales.objects.count(), 4)
+        self.assertEqual(Sales.objects.get(order_id="405-2").amount, Decimal("410.00"))
+        self.assertEqual(rollups.verify(), [])
+
+        # Rows that are already stored are not written again, even when
+        # the file itself differs (here by a trailing blank line).
+        self.upload(SAMPLE_CSV.replace("406,BENGALURU", "410,BENGALURU") + "\n")
+        with CaptureQueriesContext(connection) as queries:
+            process_pending_jobs()
+        writes = [q["sql"] for q in queries if '"sales"' in q["sql"] and not q["sql"].startswith("SELECT")]
+        self.assertEqual(writes, [])
+        third = CSVUploadLog.objects.order_by("id").last()
+        self.assertEqual((third.rows_inserted, third.rows_updated, third.rows_unchanged), (0, 0, 2))
+
+    def test_duplicates_within_a_file(self):
+        repeated = SAMPLE_CSV + SAMPLE_CSV.splitlines(keepends=True)[1].replace("647.62", "650")
+        with override_settings(CSV_INGEST_CHUNK_SIZE=10):
+            self.upload(repeated)
+            process_pending_jobs()
+        job = CSVUploadLog.objects.get()
+        self.assertEqual((job.rows_inserted, job.rows_updated, job.rows_unchanged), (2, 1, 0))
+        self.assertEqual(Sales.objects.get(order_id="405-1").amount, Decimal("650.00"))
+        self.assertEqual(rollups.verify(), [])
+
+    def test_identical_upload_is_not_reprocessed(self):
+        first = self.upload(SAMPLE_CSV)
+        digest = hashlib.sha256(SAMPLE_CSV.encode()).hexdigest()
+        job = CSVUploadLog.objects.get()
+        self.assertEqual(job.content_hash, digest)
+        self.assertEqual(job.file_path, os.path.join(settings.MEDIA_ROOT, "uploads", digest[:2], f"{digest}.csv"))
+
+        second = self.upload(SAMPLE_CSV, name="copy.csv")
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["duplicate"])
+        self.assertEqual(second.data["job_id"], first.data["job_id"])
+        self.assertEqual(CSVUploadLog.objects.count(), 1)
+
+        # A failed job does not block uploading the file again.
+        job.status = CSVUploadLog.FAILED
+        job.save()
+        self.assertEqual(self.upload(SAMPLE_CSV).status_code, status.HTTP_202_ACCEPTED)
+
+    def test_same_file_from_another_user_is_not_a_duplicate(self):
+        first = self.upload(SAMPLE_CSV, name="secret_name.csv")
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="other", password="password123"))
+        file_obj = SimpleUploadedFile("mine.csv", SAMPLE_CSV.encode(), content_type="text/csv")
+        second = other.post(reverse("upload-csv-file"), {"file": file_obj}, format="multipart")
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertNotEqual(second.data["job_id"], first.data["job_id"])
+        self.assertEqual(second.data["file_name"], "mine.csv")
+        self.assertEqual(other.get(reverse("csv-upload-job", args=[second.data["job_id"]])).status_code, 200)
+
+        # Both jobs load the shared stored file.
+        self.assertEqual(process_pending_jobs(), 2)
+        self.assertEqual(Sales.objects.count(), 4)
+
+    def stall(self, job):
+        # The worker died after claiming the job: its heartbeat stops.
+        CSVUploadLog.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+    def test_job_of_a_dead_worker_is_recovered(self):
+        first = self.upload(SAMPLE_CSV)
+        job = claim_next_job()
+        self.assertEqual(job.status, CSVUploadLog.RUNNING)
+        self.assertTrue(self.upload(SAMPLE_CSV).data["duplicate"])
+
+        self.stall(job)
+        self.assertEqual(self.upload(SAMPLE_CSV, name="again.csv").status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(process_pending_jobs(), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.pk, job.status, job.attempts), (first.data["job_id"], CSVUploadLog.COMPLETED, 2))
+        self.assertEqual(Sales.objects.count(), 4)
+        self.assertEqual(rollups.verify(), [])
+
+    @override_settings(CSV_INGEST_MAX_ATTEMPTS=2)
+    def test_job_that_keeps_killing_its_worker_fails(self):
+        self.upload(SAMPLE_CSV)
+        for _ in range(2):
+            job = claim_next_job()
+            self.stall(job)
+        self.assertIsNone(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, CSVUploadLog.FAILED)
+        self.assertIn("worker stopped", job.error)
+
+    @override_settings(CSV_INGEST_MODE="inline")
+    def test_error_report(self):
+        broken = SAMPLE_CSV.replace("04-29-22", "04-31-22").replace(",S,B09KXVBD7Z", "," + "S" * 51 + ",B09KXVBD7Z")
+        response = self.upload(broken)
+        self.assertEqual(response.data["skipped_rows"], 2)
+        self.assertEqual(response.data["row_count"], 1)
+
+        url = reverse("csv-upload-errors", args=[response.data["job_id"]])
+        self.assertEqual(response.data["error_report"], url)
+        report = self.client.get(url)
+        self.assertEqual(report["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(b"".join(report.streaming_content).decode())))
+        self.assertEqual(
+            [(row["line"], row["column"], row["error"]) for row in rows],
+            [
+                ("2", "size", "longer than 50 characters"),
+                ("4", "order_date", "invalid date"),
+                ("4", "currency", "required"),
+                ("4", "amount", "required"),
+            ],
+        )
+
+        # Only the uploader can see the job and download its report.
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="other", password="password123"))
+        self.assertEqual(other.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        job_url = reverse("csv-upload-job", args=[response.data["job_id"]])
+        self.assertEqual(other.get(job_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        clean = self.upload(SAMPLE_CSV.replace(",,,PUNE", ",INR,0,PUNE"))
+        self.assertIsNone(clean.data["error_report"])
+        errors = self.client.get(reverse("csv-upload-errors", args=[clean.data["job_id"]]))
+        self.assertEqual(errors.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_missing_required_columns(self):
+        response = self.upload("Order ID,Date\n1,04-30-22\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CSVUploadLog.objects.exists())
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse("csv-upload-job", args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_PART_MAX_SIZE=1024)
+class UploadSessionTest(BaseTestCase):
+    def start(self, **body):
+        response = self.client.post(reverse("upload-session-create"), {"file_name": "big.csv", **body}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["upload_id"]
+
+    def put_part(self, upload_id, offset, data):
+        url = reverse("upload-session-part", args=[upload_id]) + f"?offset={offset}"
+        return self.client.put(url, data, content_type="application/octet-stream")
+
+    def complete(self, upload_id, **body):
+        return self.client.post(reverse("upload-session-complete", args=[upload_id]), body, format="json")
+
+    def test_resumable_upload(self):
+        content = SAMPLE_CSV.encode()
+        upload_id = self.start(size=len(content))
+        self.assertEqual(self.put_part(upload_id, 0, content[:200]).data["received"], 200)
+
+        # A retried or out-of-order part is refused with the offset to resume from.
+        response = self.put_part(upload_id, 100, content[100:])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["received"], 200)
+        self.assertEqual(self.client.get(reverse("upload-session", args=[upload_id])).data["received"], 200)
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.put_part(upload_id, 200, content[200:])
+        response = self.complete(upload_id, sha256="0" * 64)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("mismatch", response.data["error"])
+
+        response = self.complete(upload_id, sha256=hashlib.sha256(content).hexdigest())
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(process_pending_jobs(), 1)
+        self.assertEqual(Sales.objects.count(), 4)
+
+        session = self.client.get(reverse("upload-session", args=[upload_id])).data
+        self.assertEqual(session["status"], "completed")
+        self.assertEqual(session["job_id"], response.data["job_id"])
+        self.assertEqual(self.put_part(upload_id, len(content), b"x").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejected_file_fails_the_session(self):
+        upload_id = self.start()
+        self.put_part(upload_id, 0, b"not,a,sales\nfile,at,all\n")
+        self.assertEqual(self.complete(upload_id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse("upload-session", args=[upload_id])).data["status"], "failed")
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("already complete", response.data["error"])
+
+    def test_stored_file_is_discarded_when_accepting_it_fails(self):
+        content = SAMPLE_CSV.encode()
+        upload_id = self.start()
+        self.put_part(upload_id, 0, content)
+        with mock.patch("datasets.views.read_header", side_effect=OSError("disk error")):
+            response = self.complete(upload_id)
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(self.client.get(reverse("upload-session", args=[upload_id])).data["status"], "failed")
+        self.assertFalse(os.path.exists(content_path(hashlib.sha256(content).hexdigest())))
+
+    def test_parts_are_limited(self):
+        upload_id = self.start()
+        response = self.put_part(upload_id, 0, b"x" * 2048)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_cannot_see_uploads(self):
+        upload_id = self.start()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username="other", password="password123"))
+        self.assertEqual(other.get(reverse("upload-session", args=[upload_id])).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse("upload-session-part", args=[upload_id]) + "?offset=0"
+        response = other.put(url, b"data", content_type="application/octet-stream")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ParallelIngestTest(BaseTestCase):
+    def write(self, name, content):
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_byte_ranges_end_on_newlines(self):
+        content = SAMPLE_CSV * 7
+        path = self.write("ranges.csv", content)
+        ranges = parallel.byte_ranges(path, chunk_size=2)
+        data_start = content.index("\n") + 1
+        self.assertEqual(ranges[0][0], data_start)
+        self.assertEqual(ranges[-1][1], len(content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(content[end - 1], "\n")
+
+    def test_matches_single_process_ingestion(self):
+        rows = SAMPLE_CSV.splitlines(keepends=True)
+        body = "".join(
+            row.replace("405-", f"{i}-").replace("647.62", "bad" if i == 7 else "647.62")
+            for i in range(20) for row in rows[1:]
+        )
+        path = self.write("parallel.csv", rows[0] + body)
+
+        results, reports = [], []
+        for workers in (1, 3):
+            Sales.objects.filter(order_id__contains="-").delete()
+            report = os.path.join(settings.MEDIA_ROOT, f"errors_{workers}.csv")
+            results.append(ingest_csv(path, chunk_size=7, workers=workers, error_report=report))
+            with open(report) as f:
+                reports.append(f.read())
+            self.assertEqual(rollups.verify(), [])
+
+        single, pooled = results
+        self.assertEqual(single, pooled)
+        self.assertEqual((pooled.rows_read, pooled.inserted, pooled.skipped), (60, 39, 21))
+        self.assertEqual(reports[0], reports[1])
+        self.assertIn("\n23,amount,bad,", reports[1])
+
+
+def _start_parse_pool(poll_interval):
+    # Stands in for the worker loop: a daemonic process could not do this.
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(pool.map(abs, [-1, -2])) == [1, 2]
+
+
+def _crash(poll_interval):
+    raise RuntimeError("worker crashed")
+
+
+@mock.patch("datasets.management.commands.ingest_worker.connections")
+class IngestWorkerProcessesTest(unittest.TestCase):
+    def run_workers(self, target):
+        with mock.patch("datasets.management.commands.ingest_worker.work", target):
+            call_command("ingest_worker", "--workers", "2", stdout=StringIO())
+
+    def test_workers_can_parse_in_parallel(self, connections):
+        # Each worker may start a CSV_INGEST_WORKERS pool of its own.
+        self.run_workers(_start_parse_pool)
+
+    def test_failed_workers_are_reported(self, connections):
+        with self.assertRaisesRegex(CommandError, r"2 of 2 ingestion worker\(s\) exited with an error"):
+            self.run_workers(_crash)
+
+
+class ValidationTest(unittest.TestCase):
+    def prepare(self, rows):
+        header = ["Order ID", "Date", "Qty", "currency", "Amount", "B2B", "ship-city"]
+        return prepare_frame(pd.DataFrame(rows, columns=header, dtype=object))
+
+    def test_values_are_coerced(self):
+        valid, errors = self.prepare([
+            ["1", "04-30-22", "2", " INR ", "10.004", "Yes", "  "],
+            ["2", "2022-05-01", "1", "INR", "3", None, "Pune"],
+        ])
+        self.assertTrue(errors.empty)
+        self.assertEqual(list(valid["order_date"]), [date(2022, 4, 30), date(2022, 5, 1)])
+        self.assertEqual(list(valid["currency"]), ["INR", "INR"])
+        self.assertEqual(list(valid["qty"]), [2, 1])
+        self.assertEqual(list(valid["amount"]), [10.0, 3.0])
+        self.assertEqual(list(valid["b2b"]), [True, False])
+        self.assertEqual(list(valid["ship_city"]), [None, "Pune"])
+
+    def test_invalid_rows_are_split_off(self):
+        valid, errors = self.prepare([
+            ["1", "04-30-22", "1", "INR", "5", "no", "Pune"],
+            ["2", "someday", "1.5", "INR", "1e10", "maybe", "Pune"],
+            ["3", "04-30-22", "1", "", "5", "no", "P" * 101],
+        ])
+        self.assertEqual(list(valid["order_id"]), ["1"])
+        self.assertEqual(
+            [(row, column) for row, column in errors[["row", "column"]].itertuples(index=False)],
+            [(1, "order_date"), (1, "qty"), (1, "amount"), (1, "b2b"), (2, "currency"), (2, "ship_city")],
+        )
+        self.assertEqual(errors["value"].iloc[0], "someday")
+
+
+class UploadLogHistoryTest(BaseTestCase):
+    def make_logs(self, count, user=None, day=date(2025, 9, 1)):
+        user = user or self.user
+        for i in range(count):
+            log = CSVUploadLog.objects.create(user=user, file_name=f"{user.username}_{i}.csv")
+            # upload_time is auto_now_add; spread the logs over hours of `day`.
+            upload_time = timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=i % 24)
+            CSVUploadLog.objects.filter(pk=log.pk).update(upload_time=upload_time)
+
+    def history(self, url=None, **params):
+        response = self.client.get(url or reverse("csv-upload-logs"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_query_count_does_not_grow(self):
+        other = User.objects.create_user(username="other", password="password123")
+        self.make_logs(2)
+        with self.assertNumQueries(1):
+            self.history()
+        self.make_logs(40, user=other)
+        with self.assertNumQueries(1):
+            page = self.history(page_size=100)
+        self.assertEqual(len(page["results"]), 42)
+        self.assertEqual({log["user"] for log in page["results"]}, {"testuser", "other"})
+
+    def test_keyset_pages(self):
+        self.make_logs(25)
+        expected = list(
+            CSVUploadLog.objects.order_by("-upload_time", "-id").values_list("id", flat=True)
+        )
+        seen, url, pages = [], None, []
+        while True:
+            page = self.history(url, page_size=10) if url is None else self.history(url)
+            pages.append(page)
+            seen += [log["job_id"] for log in page["results"]]
+            url = page["next"]
+            if url is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page["results"]) for page in pages], [10, 10, 5])
+        back = self.history(pages[1]["previous"])
+        self.assertEqual([log["job_id"] for log in back["results"]], expected[:10])
+
+    def test_filters(self):
+        other = User.objects.create_user(username="other", password="password123")
+        self.make_logs(3)
+        self.make_logs(2, user=other, day=date(2025, 9, 3))
+        self.assertEqual(len(self.history(user="other")["results"]), 2)
+        self.assertEqual(len(self.history(start_date="2025-09-02")["results"]), 2)
+        self.assertEqual(len(self.history(end_date="2025-09-01")["results"]), 3)
+        response = self.client.get(reverse("csv-upload-logs"), {"start_date": "2025-09-31"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SalesRollupTest(BaseTestCase):
+    def test_rollup_tracks_orm_writes(self):
+        self.assertEqual(rollups.verify(), [])
+        sale = Sales.objects.get(order_id="O1")
+        sale.amount = 1200
+        sale.status = "returned"
+        sale.save()
+        Sales.objects.get(order_id="O2").delete()
+        self.assertEqual(rollups.verify(), [])
+        self.assertEqual(SalesDailyRollup.objects.get().total_amount, Decimal("1200.00"))
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp(), CSV_INGEST_CHUNK_SIZE=1)
+    def test_rollup_tracks_ingestion(self):
+        path = os.path.join(settings.MEDIA_ROOT, "rollup.csv")
+        with open(path, "w") as f:
+            f.write(SAMPLE_CSV)
+        ingest_csv(path)
+        self.assertEqual(rollups.verify(), [])
+        mumbai = SalesDailyRollup.objects.get(ship_city="MUMBAI")
+        self.assertEqual((mumbai.order_count, mumbai.total_amount), (1, Decimal("647.62")))
+
+        # Re-ingesting an edited export moves the sale between rollup rows.
+        with open(path, "w") as f:
+            f.write(SAMPLE_CSV.replace("647.62,MUMBAI", "700.00,PUNE"))
+        ingest_csv(path)
+        self.assertEqual(rollups.verify(), [])
+        self.assertFalse(SalesDailyRollup.objects.filter(ship_city="MUMBAI").exists())
+        self.assertEqual(SalesDailyRollup.objects.get(ship_city="PUNE").total_amount, Decimal("700.00"))
+
+    def test_rebuild_command(self):
+        SalesDailyRollup.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--check", stdout=StringIO(), stderr=StringIO())
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(SalesDailyRollup.objects.count(), 2)
+
+    def test_views_read_rollup(self):
+        response = self.client.get(reverse("orders-by-status"))
+        self.assertEqual(
+            response.data,
+            [{"status": "delivered", "order_count": 1}, {"status": "pending", "order_count": 1}],
+        )
+        response = self.client.get(reverse("sales-trend"))
+        self.assertEqual(response.data, [{"date": date.today().strftime("%Y-%m-%d"), "total_sales": 1500.0}])
+
+
+class AnalyticsCacheTest(BaseTestCase):
+    def test_repeat_requests_skip_the_database(self):
+        url = reverse("sales-by-category")
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(cached["ETag"], etag)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_query_params_are_part_of_the_key(self):
+        url = reverse("sales-by-region")
+        state = self.client.get(url + "?level=state")
+        country = self.client.get(url + "?level=country")
+        self.assertNotEqual(state["ETag"], country["ETag"])
+        self.assertEqual(len(country.data), 1)
+
+    def test_sales_write_invalidates(self):
+        url = reverse("sales-kpi")
+        etag = self.client.get(url)["ETag"]
+        Sales.objects.create(
+            order_id="O3", order_date=date.today(), status="delivered",
+            qty=1, currency="INR", amount=250,
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_orders"], 3)
+
+
+class ReplicaRoutingTest(BaseTestCase):
+    def test_router(self):
+        router = ReplicaRouter()
+        with mock.patch.dict(settings.DATABASES, {REPLICA: settings.DATABASES["default"]}):
+            self.assertIsNone(router.db_for_read(Sales))
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Sales), REPLICA)
+                self.assertEqual(router.db_for_write(Sales), "default")
+            self.assertFalse(router.allow_migrate(REPLICA, "datasets"))
+        with replica_reads():
+            self.assertIsNone(router.db_for_read(Sales))
+
+    def test_only_analytics_read_from_replica(self):
+        def routed_reads(url):
+            # For each read of the request, whether it asked for the replica.
+            reads = []
+
+            def db_for_read(router, model, **hints):
+                reads.append(routers._replica_reads.get())
+
+            with mock.patch.object(ReplicaRouter, "db_for_read", autospec=True, side_effect=db_for_read):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            return reads
+
+        kpi = routed_reads(reverse("sales-kpi"))
+        self.assertTrue(kpi and all(kpi))
+        sales = routed_reads(reverse("sales-list"))
+        self.assertTrue(sales and not any(sales))
+
+
+    def test_replica_responses_are_cached_briefly(self):
+        url = reverse("sales-kpi")
+        analytics_cache = cache.get_cache()
+        with mock.patch.object(analytics_cache, "set", wraps=analytics_cache.set) as cache_set:
+            self.client.get(url)
+            with mock.patch("datasets.cache.has_replica", return_value=True):
+                self.client.get(url, {"state": "Maharashtra"})
+        self.assertEqual(
+            [call.kwargs["timeout"] for call in cache_set.call_args_list],
+            [settings.ANALYTICS_CACHE_TIMEOUT, settings.ANALYTICS_REPLICA_CACHE_TIMEOUT],
+        )
+
+
+class SalesKPITest(BaseTestCase):
+    def test_kpis_take_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("sales-kpi"))
+        self.assertEqual(response.data, {
+            "total_sales_amount": 1500.0,
+            "total_orders": 2,
+            "total_qty": 3,
+            "avg_order_value": 750.0,
+        })
+
+    def test_summary_takes_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("sales-summary"))
+        today = date.today().strftime("%Y-%m-%d")
+        self.assertEqual(response.data, {
+            "total_orders": 2,
+            "total_sales": 1500.0,
+            "min_date": today,
+            "max_date": today,
+        })
+
+    def test_filters(self):
+        response = self.client.get(reverse("sales-kpi") + "?state=Karnataka&status=pending,delivered")
+        self.assertEqual(response.data["total_sales_amount"], 500.0)
+        response = self.client.get(reverse("sales-kpi") + f"?end_date={date.today().replace(year=2000)}")
+        self.assertEqual(response.data["total_orders"], 0)
+
+    def test_invalid_filter(self):
+        response = self.client.get(reverse("sales-summary") + "?start_date=yesterday")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SalesListPaginationTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        Sales.objects.create(
+            order_id="O0", order_date=date(2022, 1, 1), status="delivered",
+            qty=1, currency="INR", amount=100, ship_state="Karnataka",
+        )
+        self.url = reverse("sales-list")
+
+    def walk(self, url):
+        order_ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            pages.append(response.data)
+            order_ids += [row["order_id"] for row in response.data["results"]]
+            url = response.data["next"]
+        return order_ids, pages
+
+    def test_keyset_by_id(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url + "?pagination=keyset&page_size=1")
+        order_ids, pages = self.walk(self.url + "?pagination=keyset&page_size=1")
+        self.assertEqual(order_ids, ["O1", "O2", "O0"])
+
+        previous = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual([row["order_id"] for row in previous["results"]], ["O2"])
+        self.assertEqual(previous["next"], pages[1]["next"])
+
+    def test_keyset_by_date_with_filters(self):
+        order_ids, _ = self.walk(self.url + "?pagination=keyset&ordering=order_date&page_size=2")
+        self.assertEqual(order_ids, ["O0", "O1", "O2"])
+        order_ids, _ = self.walk(self.url + "?pagination=keyset&ordering=order_date&state=Karnataka")
+        self.assertEqual(order_ids, ["O0", "O2"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url + "?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_numbers_without_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url + "?count=false&page_size=2")
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["previous"])
+        order_ids, _ = self.walk(response.data["next"])
+        self.assertEqual(order_ids, ["O0"])
+
+    def test_page_numbers_with_count(self):
+        response = self.client.get(self.url + "?status=delivered")
+        self.assertEqual(response.data["count"], 2)
+
+
+class SalesListFieldsTest(BaseTestCase):
+    def test_matches_model_serializer(self):
+        response = self.client.get(reverse("sales-list"))
+        expected = SalesSerializer(Sales.objects.order_by("id"), many=True).data
+        self.assertEqual(response.data["results"], [dict(row) for row in expected])
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse("sales-list") + "?fields=order_id,amount,order_date")
+        self.assertEqual(response.data["results"][0], {
+            "order_id": "O1",
+            "amount": "1000.00",
+            "order_date": date.today().isoformat(),
+        })
+        response = self.client.get(reverse("sales-list") + "?fields=amount&pagination=keyset&page_size=1")
+        self.assertEqual(response.data["results"], [{"amount": "1000.00"}])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse("sales-list") + "?fields=order_id,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SalesExportTest(BaseTestCase):
+    def export(self, query):
+        response = self.client.get(reverse("sales-export") + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content)
+
+    @override_settings(SALES_EXPORT_BATCH_SIZE=1)
+    def test_csv(self):
+        rows = list(csv.reader(StringIO(self.export("?fields=order_id,amount").decode())))
+        self.assertEqual(rows, [["order_id", "amount"], ["O1", "1000.00"], ["O2", "500.00"]])
+
+    def test_ndjson_with_filters(self):
+        body = self.export("?file_format=ndjson&status=pending")
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["order_id"], "O2")
+        self.assertEqual(lines[0]["order_date"], date.today().isoformat())
+
+    def test_invalid_format(self):
+        response = self.client.get(reverse("sales-export") + "?file_format=xlsx")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    @override_settings(SALES_EXPORT_BATCH_SIZE=1)
+    def test_parquet_and_arrow(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(BytesIO(self.export("?file_format=parquet&fields=order_id,amount")))
+        self.assertEqual(table.column("order_id").to_pylist(), ["O1", "O2"])
+        self.assertEqual(table.column("amount").to_pylist(), [Decimal("1000.00"), Decimal("500.00")])
+
+        table = pyarrow.ipc.open_stream(self.export("?file_format=arrow")).read_all()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column("order_date").to_pylist(), [date.today()] * 2)
+
+
+class AnalyticsFixtureTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        rows = [
+            ("O3", date(2024, 1, 5), "Set", "Shipped", "Pune", "Maharashtra", 2, "799.50"),
+            ("O4", date(2024, 1, 5), "kurta", "Cancelled", "Pune", "Maharashtra", 1, "500.00"),
+            ("O5", date(2024, 1, 7), "Set", "Shipped", "Chennai", "Tamil Nadu", 3, "1500.25"),
+            ("O6", date(2024, 2, 1), None, None, None, None, 1, "0.10"),
+            ("O7", date(2024, 2, 1), "Top", "Shipped", "Mumbai", "Maharashtra", 4, "1000.00"),
+        ]
+        for order_id, order_date, category, order_status, city, state, qty, amount in rows:
+            Sales.objects.create(
+                order_id=order_id, order_date=order_date, category=category, status=order_status,
+                ship_city=city, ship_state=state, ship_country="India" if city else None,
+                qty=qty, currency="INR", amount=Decimal(amount),
+            )
+
+
+class ColumnarEngineTest(AnalyticsFixtureTestCase):
+    def assertEnginesAgree(self, name, *args, **kwargs):
+        results = {}
+        for engine in ("sql", "columnar"):
+            with self.settings(ANALYTICS_ENGINE=engine):
+                # Engine functions (kpi_summary) directly, the rest through analytics.
+                function = getattr(analytics.engine(), name, None) or getattr(analytics, name)
+                results[engine] = function(*args, **kwargs)
+        self.assertEqual(results["columnar"], results["sql"], name)
+        return results["columnar"]
+
+    def test_engines_agree(self):
+        self.assertEnginesAgree("sales_trend_data")
+        for granularity in ("week", "month", "quarter"):
+            self.assertEnginesAgree("sales_trend_data", granularity=granularity)
+        self.assertEnginesAgree("sales_by_category_data")
+        self.assertEnginesAgree("orders_by_status_data")
+        for level in ("country", "state", "city"):
+            self.assertEnginesAgree("sales_by_region_data", level)
+        self.assertEnginesAgree("top_cities_data", limit=3)
+        self.assertEnginesAgree("top_cities_data", limit=10, filters={
+            "order_date__gte": date(2024, 1, 6),
+            "order_date__lte": date(2024, 2, 1),
+        })
+        for group_by in (["month", "category"], ["week", "state", "b2b"], ["channel"], []):
+            self.assertEnginesAgree("aggregate", group_by, ["sum_amount", "sum_qty", "count", "avg_amount"])
+        self.assertEnginesAgree("aggregate", ["month", "city"], ["count"], top=1, order_by=["month"])
+        self.assertEnginesAgree("kpi_summary")
+        kpi = self.assertEnginesAgree("kpi_summary", {
+            "order_date__gte": date(2024, 1, 1),
+            "ship_state__in": ["Maharashtra", "Nowhere"],
+            "status": "Shipped",
+        })
+        self.assertEqual(kpi["total_orders"], 2)
+        self.assertEnginesAgree("kpi_summary", {"category": "Nowhere"})
+        self.assertEnginesAgree("kpi_summary", {"ship_state": "maharashtra", "ship_city__in": ["PUNE", "Chennai"]})
+
+        # On MySQL text compares case-insensitively, ignoring trailing spaces.
+        with self.settings(ANALYTICS_ENGINE="columnar"):
+            columnar.snapshot()
+            with mock.patch.object(connection, "vendor", "mysql"):
+                folded = columnar.kpi_summary({
+                    "order_date__gte": date(2024, 1, 1),
+                    "ship_state__in": ["MAHARASHTRA ", "Nowhere"],
+                    "status": "shipped",
+                })
+        self.assertEqual(folded, kpi)
+
+    @override_settings(ANALYTICS_ENGINE="columnar")
+    def test_snapshot_follows_writes(self):
+        before = analytics.engine().kpi_summary()["total_orders"]
+        self.assertIs(columnar.snapshot(), columnar.snapshot())
+        Sales.objects.filter(order_id="O7").get().delete()
+        self.assertEqual(analytics.engine().kpi_summary()["total_orders"], before - 1)
+
+        response = self.client.get(reverse("sales-by-category"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, analytics.sales_by_category_data())
+
+
+class AggregateTest(AnalyticsFixtureTestCase):
+    url = reverse("analytics-aggregate")
+
+    def test_group_by_month_and_category(self):
+        response = self.client.get(self.url, {
+            "group_by": "month,category",
+            "metrics": "sum_amount,count,avg_amount",
+            "order_by": "month,-sum_amount",
+            "start_date": "2024-01-01",
+            "end_date": "2024-12-31",
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [
+            {"month": "2024-01-01", "category": "Set", "sum_amount": 2299.75, "count": 2, "avg_amount": 1149.88},
+            {"month": "2024-01-01", "category": "kurta", "sum_amount": 500.0, "count": 1, "avg_amount": 500.0},
+            {"month": "2024-02-01", "category": "Top", "sum_amount": 1000.0, "count": 1, "avg_amount": 1000.0},
+            {"month": "2024-02-01", "category": None, "sum_amount": 0.1, "count": 1, "avg_amount": 0.1},
+        ])
+
+    def test_top_with_other(self):
+        response = self.client.get(self.url, {"group_by": "state", "metrics": "count", "top": 1})
+        self.assertEqual(response.data["results"], [
+            {"state": "Maharashtra", "count": 4},
+            {"state": "Other", "count": 3, "other": True},
+        ])
+        response = self.client.get(self.url, {"group_by": "state", "metrics": "count", "top": 1, "other": "false"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            analytics.aggregate(["week", "city", "status"], ["sum_amount", "sum_qty"], top=2)
+
+    def test_invalid_params(self):
+        for params in (
+            {"group_by": "order_id"},
+            {"group_by": "day,month"},
+            {"metrics": "median"},
+            {"group_by": "city", "order_by": "state"},
+            {"top": "-1"},
+            {"start_date": "yesterday"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class SalesTrendTest(AnalyticsFixtureTestCase):
+    url = reverse("sales-trend")
+
+    def trend(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(point["date"], point["total_sales"]) for point in response.data]
+
+    def test_granularity_and_fill(self):
+        window = {"start_date": "2023-12-15", "end_date": "2024-03-31"}
+        self.assertEqual(self.trend(granularity="month", **window), [
+            ("2023-12-01", 0.0), ("2024-01-01", 2799.75), ("2024-02-01", 1000.1), ("2024-03-01", 0.0),
+        ])
+        self.assertEqual(self.trend(granularity="quarter", **window), [("2023-10-01", 0.0), ("2024-01-01", 3799.85)])
+        self.assertEqual(self.trend(granularity="week", fill="false", **window), [
+            ("2024-01-01", 2799.75), ("2024-01-29", 1000.1),
+        ])
+        self.assertEqual(len(self.trend(start_date="2024-01-01", end_date="2024-01-31")), 31)
+
+    def test_max_points(self):
+        points = self.trend(start_date="2024-01-01", end_date="2024-02-29", max_points=10)
+        self.assertEqual(len(points), 10)
+        self.assertEqual((points[0][0], points[-1][0]), ("2024-01-01", "2024-02-29"))
+        self.assertIn(("2024-01-07", 1500.25), points)
+
+    def test_invalid_params(self):
+        for params in ({"granularity": "hour"}, {"max_points": "2"}, {"max_points": "many"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_lttb(self):
+        y = [0, 1, 0, 0, 9, 0, 0, 1, 0, 0, -7, 0]
+        selected = lttb(range(len(y)), y, 5)
+        self.assertEqual(len(selected), 5)
+        self.assertEqual((selected[0], selected[-1]), (0, len(y) - 1))
+        self.assertIn(4, selected)
+        self.assertIn(10, selected)
+        self.assertEqual(lttb(range(4), [1, 2, 3, 4], 10), [0, 1, 2, 3])
+
+
+@override_settings(ANALYTICS_BATCH_WORKERS=1)
+class AnalyticsBatchTest(AnalyticsFixtureTestCase):
+    url = reverse("analytics-batch")
+    dashboard = {
+        "kpi": {"type": "kpi"},
+        "trend": {"type": "sales_trend"},
+        "categories": {"type": "sales_by_category"},
+        "statuses": {"type": "orders_by_status"},
+        "regions": {"type": "sales_by_region", "level": "state"},
+        "cities": {"type": "top_cities", "limit": 2},
+    }
+
+    def test_matches_endpoints(self):
+        filters = {"start_date": "2024-01-01", "state": ["Maharashtra", "Tamil Nadu"]}
+        response = self.client.post(self.url, {"filters": filters, "widgets": self.dashboard}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lookups = {"order_date__gte": date(2024, 1, 1), "ship_state__in": ["Maharashtra", "Tamil Nadu"]}
+        kpi = analytics.kpi_summary(lookups)
+        self.assertEqual(response.data, {
+            "kpi": {**kpi, "min_date": kpi["min_date"].isoformat(), "max_date": kpi["max_date"].isoformat()},
+            "trend": analytics.sales_trend_data(lookups),
+            "categories": analytics.sales_by_category_data(lookups),
+            "statuses": analytics.orders_by_status_data(lookups),
+            "regions": analytics.sales_by_region_data("state", lookups),
+            "cities": analytics.top_cities_data(2, lookups),
+        })
+
+    def test_shares_scans(self):
+        widgets = {
+            "kpi": {"type": "kpi"},
+            "trend": {"type": "sales_trend"},
+            "statuses": {"type": "orders_by_status"},
+            "regions": {"type": "sales_by_region"},
+            "matrix": {"type": "aggregate", "group_by": ["status", "state"], "metrics": ["count"]},
+            "delivered": {"type": "orders_by_status", "status": "delivered"},
+        }
+        with self.assertNumQueries(3):
+            data = batch.evaluate({"widgets": widgets})
+        self.assertEqual(data["kpi"]["total_orders"], analytics.kpi_summary()["total_orders"])
+        self.assertEqual(data["statuses"], analytics.orders_by_status_data())
+        self.assertEqual(data["regions"], analytics.sales_by_region_data())
+        self.assertEqual(data["delivered"], [{"status": "delivered", "order_count": 1}])
+
+    def test_invalid_specs(self):
+        for payload in (
+            {"widgets": {"x": {"type": "pie"}}},
+            {"widgets": {"x": {"type": "aggregate", "group_by": "password"}}},
+            {"widgets": {"x": {"type": "kpi"}}, "filters": {"end_date": "soon"}},
+            {"widgets": []},
+        ):
+            response = self.client.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
+
+@override_settings(ANALYTICS_BATCH_WORKERS=1)
+class AsyncAnalyticsTest(AnalyticsFixtureTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_match_sync_endpoints(self):
+        for name, params in (
+            ("sales-summary", {"start_date": "2024-01-01"}),
+            ("sales-kpi", {"state": "Maharashtra"}),
+            ("sales-trend", {"granularity": "month", "start_date": "2024-01-01", "end_date": "2024-06-30"}),
+            ("sales-by-category", {}),
+            ("orders-by-status", {"start_date": "2024-01-01"}),
+            ("sales-by-region", {"level": "city"}),
+            ("top-cities", {"limit": 2}),
+            ("analytics-aggregate", {"group_by": "month,state", "metrics": "count,avg_amount", "top": 1}),
+        ):
+            expected = await sync_to_async(self.client.get)(reverse(name), params)
+            response = await self.async_client.get(reverse(f"async-{name}"), params, headers=self.headers)
+            self.assertEqual(response.status_code, 200, name)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content), name)
+
+    async def test_batch(self):
+        payload = {"filters": {"state": "Maharashtra"}, "widgets": AnalyticsBatchTest.dashboard}
+        expected = await sync_to_async(self.client.post)(reverse("analytics-batch"), payload, format="json")
+        response = await self.async_client.post(
+            reverse("async-analytics-batch"), payload, content_type="application/json", headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+    async def test_auth_errors_and_caching(self):
+        url = reverse("async-sales-by-category")
+        self.assertEqual((await self.async_client.get(url)).status_code, 401)
+        bad = {"Authorization": "Bearer not-a-token"}
+        self.assertEqual((await self.async_client.get(url, headers=bad)).status_code, 401)
+        response = await self.async_client.get(url, {"start_date": "never"}, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertNotIn('desc="0 queries"', response["Server-Timing"])
+        headers = {**self.headers, "If-None-Match": response["ETag"]}
+        self.assertEqual((await self.async_client.get(url, headers=headers)).status_code, 304)
+
+
+class RequestMetricsTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+
+    def test_server_timing_and_metrics(self):
+        response = self.client.get(reverse("sales-by-category"))
+        self.assertEqual(response.status_code, 200)
+        timing = dict(part.split(";", 1) for part in response["Server-Timing"].split(", "))
+        self.assertEqual(set(timing), {"db", "serialize", "total"})
+        queries = int(timing["db"].split('desc="')[1].split()[0])
+        self.assertGreater(queries, 0)
+
+        metrics = self.client.get("/metrics").content.decode()
+        labels = 'route="/api/sales-by-category/",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 1', metrics)
+        self.assertIn(f"http_request_db_queries_count{{{labels}}} 1", metrics)
+        self.assertIn(f"http_request_db_queries_sum{{{labels}}} {float(queries)}", metrics)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', metrics)
+        self.assertIn(f"http_response_bytes_sum{{{labels}}} {float(len(response.content))}", metrics)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+
+class RenderingTest(unittest.TestCase):
+    def test_orjson_matches_json_renderer(self):
+        data = {
+            "amount": Decimal("1234.50"),
+            "at": datetime.fromisoformat("2024-05-01T12:30:15.123456+00:00"),
+            "naive": datetime(2024, 5, 1, 12, 30),
+            "day": date(2024, 5, 1),
+            "id": uuid.UUID(int=7),
+            "count": np.int64(3),
+            "rows": [{"city": "Pune\u2028", "total": 10.25, 1: None}],
+        }
+        renderer = ORJSONRenderer()
+        self.assertEqual(renderer.render(data), JSONRenderer().render(data))
+        self.assertEqual(renderer.render([2 ** 70]), b"[1180591620717411303424]")
+        self.assertEqual(renderer.render(None), b"")
+        # JSONRenderer raises ValueError here instead.
+        self.assertEqual(renderer.render({"ratio": float("nan")}), b'{"ratio":null}')
+
+    def test_negotiate(self):
+        self.assertEqual(negotiate("gzip, deflate"), "gzip")
+        self.assertIsNone(negotiate("identity"))
+        self.assertIsNone(negotiate("gzip;q=0"))
+        self.assertEqual(negotiate("*"), "br" if brotli else "gzip")
+        self.assertEqual(negotiate("br;q=0.5, gzip"), "gzip")
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionTest(BaseTestCase):
+    def get(self, url, encoding):
+        return self.client.get(url, headers={"Accept-Encoding": encoding})
+
+    def test_gzip(self):
+        plain = self.get(reverse("sales-list"), "identity")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        response = self.get(reverse("sales-list"), "gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    @unittest.skipUnless(brotli, "brotli is not installed")
+    def test_brotli_and_streaming(self):
+        plain = self.get(reverse("sales-list"), "")
+        response = self.get(reverse("sales-list"), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+        response = self.get(reverse("sales-export") + "?fields=order_id", "br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        body = brotli.decompress(b"".join(response.streaming_content))
+        self.assertEqual(body.decode().split(), ["order_id", "O1", "O2"])
+
+    def test_small_responses_are_left_alone(self):
+        response = self.get(reverse("sales-kpi"), "gzip")
+        self.assertLess(len(response.content), 100)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class OpenAPISchemaTest(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        openapi.get_schema.cache_clear()
+        self.addCleanup(openapi.get_schema.cache_clear)
+
+    def test_schema_is_built_once_and_revalidated(self):
+        with mock.patch.object(openapi, "generate_schema", wraps=openapi.generate_schema) as generate:
+            response = self.client.get(reverse("openapi-schema"))
+            self.client.get(reverse("openapi-schema"))
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schema = json.loads(response.content)
+        parameters = schema["paths"]["/sales-trend/"]["get"]["parameters"]
+        self.assertIn("granularity", [parameter["name"] for parameter in parameters])
+
+        for etag in (response["ETag"], "W/" + response["ETag"]):
+            not_modified = self.client.get(reverse("openapi-schema"), headers={"If-None-Match": etag})
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_generated_file_is_served(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "openapi.json")
+            call_command("generate_openapi", "--output", path, stdout=StringIO())
+            with open(path, "rb") as f:
+                content = f.read()
+            with override_settings(OPENAPI_SCHEMA_FILE=path):
+                response = self.client.get(reverse("schema-swagger-ui") + "?format=openapi")
+        self.assertEqual(response.content, content)
+
+    def test_ui_pages_point_at_the_schema(self):
+        for name in ("schema-swagger-ui", "schema-redoc"):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn(reverse("openapi-schema"), response.content.decode())
+
+    def test_docs_are_not_imported_at_startup(self):
+        code = (
+            "import sys, django; django.setup(); import backend.urls; "
+            "print(any(name in sys.modules for name in ('datasets.docs', 'drf_yasg.generators', 'drf_yasg.openapi')))"
+        )
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings"}
+        result = subprocess.run([sys.executable, "-c", code], env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+
+class GenerateSalesTest(BaseTestCase):
+    def test_generate_into_database(self):
+        for _ in range(2):
+            call_command("generate_sales", "--rows", "300", "--chunk-size", "128", stdout=StringIO())
+        synthetic = Sales.objects.filter(order_id__startswith="SYN-")
+        self.assertEqual(synthetic.count(), 600)
+        self.assertEqual(synthetic.values("order_id").distinct().count(), 600)
+        self.assertEqual(rollups.verify(), [])
+
+        # Zipf-like: the first city is the most common one.
+        top_city = synthetic.values("ship_city").annotate(n=Count("id")).order_by("-n").first()
+        self.assertEqual(top_city["ship_city"], CITIES[0][0])
+
+    def test_generate_csv(self):
+        path = os.path.join(tempfile.mkdtemp(), "sales.csv")
+        call_command("generate_sales", "--rows", "250", "--csv", path, "--start", "2023-03-01", "--days", "10", stdout=StringIO())
+        result = ingest_csv(path)
+        self.assertEqual((result.rows_read, result.inserted, result.skipped), (250, 250, 0))
+        dates = Sales.objects.filter(order_id__startswith="SYN-").aggregate(first=Min("order_date"), last=Max("order_date"))
+        self.assertGreaterEqual(dates["first"], date(2023, 3, 1))
+        self.assertLessEqual(dates["last"], date(2023, 3, 10))
+
+        with self.assertRaises(CommandError):
+            call_command("generate_sales", "--rows", "0", stdout=StringIO())
@@ -0,0 +1,181 @@
+"""
+Storage of uploaded CSV files.
+
+Files are stored content-addressed, as MEDIA_ROOT/uploads/<sha256[:2]>/
+<sha256>.csv, with the digest computed while the bytes are written. An
+upload whose digest matches a job that is queued, running or completed
+is not processed again (a job whose worker died does not count as
+running, see stale_jobs()).
+
+Large files can be sent in parts through an UploadSession: initiate,
+append parts at the offset the server has received so far, then
+complete. A dropped connection only loses the part in flight; the
+session's `received` offset says where to resume.
+"""
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CSVUploadLog, UploadSession
+
+READ_SIZE = 1024 * 1024
+
+
+class UploadError(ValueError):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    """A part did not start where the session's received bytes end."""
+
+    def __init__(self, received):
+        super().__init__(f"Part must start at offset {received}")
+        self.received = received
+
+
+def upload_dir(*parts):
+    path = os.path.join(settings.MEDIA_ROOT, "uploads", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def content_path(digest):
+    return os.path.join(upload_dir(digest[:2]), f"{digest}.csv")
+
+
+def session_path(session):
+    return os.path.join(upload_dir("sessions"), f"{session.pk}.part")
+
+
+def error_report_path(job):
+    return os.path.join(upload_dir("reports"), f"{job.pk}.errors.csv")
+
+
+def _move_to_content_path(temp_path, digest):
+    path = content_path(digest)
+    # Identical bytes are already stored under that name.
+    os.replace(temp_path, path)
+    return path
+
+
+def store_stream(chunks):
+    """
+    Write an iterable of byte chunks to content-addressed storage,
+    hashing them on the way. Returns (path, sha256 hex digest).
+    """
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=upload_dir("tmp"), suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return _move_to_content_path(temp_path, digest.hexdigest()), digest.hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(READ_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stale_jobs():
+    """Running jobs whose worker stopped reporting for CSV_INGEST_JOB_TIMEOUT."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CSV_INGEST_JOB_TIMEOUT)
+    return CSVUploadLog.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=CSVUploadLog.RUNNING,
+    )
+
+
+def find_duplicate(digest, user):
+    """
+    The user's latest job for the same content that has not failed or
+    stalled, if any. Another user's upload of the same bytes is not a
+    duplicate: it gets its own job, in that user's history.
+    """
+    return (
+        CSVUploadLog.objects
+        .filter(content_hash=digest, user=user)
+        .exclude(status=CSVUploadLog.FAILED)
+        .exclude(pk__in=stale_jobs().values("pk"))
+        .order_by("-id")
+        .first()
+    )
+
+
+def discard(path):
+    """Remove a stored file no upload job refers to."""
+    if not CSVUploadLog.objects.filter(file_path=path).exists() and os.path.exists(path):
+        os.remove(path)
+
+
+def append_part(session, offset, stream, length):
+    """
+    Append `length` bytes read from `stream` to a receiving session. The
+    part must start at `session.received`; bytes left past that offset
+    by an interrupted earlier attempt are overwritten.
+    """
+    if length > settings.UPLOAD_PART_MAX_SIZE:
+        raise UploadError(f"Parts may be at most {settings.UPLOAD_PART_MAX_SIZE} bytes")
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != UploadSession.RECEIVING:
+            raise UploadError("Upload is already complete")
+        if offset != session.received:
+            raise OffsetMismatch(session.received)
+        if session.size is not None and offset + length > session.size:
+            raise UploadError(f"Part would exceed the declared size of {session.size} bytes")
+
+        path = session_path(session)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_SIZE, remaining))
+                if not block:
+                    raise UploadError(f"Part ended after {length - remaining} of {length} bytes")
+                f.write(block)
+                remaining -= len(block)
+            f.truncate()
+
+        session.received = offset + length
+        session.save(update_fields=["received", "updated_at"])
+    return session
+
+
+def complete_session(session, sha256=None):
+    """
+    Check a session has all its bytes (and, when given, the digest the
+    client computed), then move the file to content-addressed storage
+    and mark the session completed. Returns (path, digest).
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != UploadSession.RECEIVING:
+            raise UploadError("Upload is already complete")
+        if session.size is not None and session.received != session.size:
+            raise UploadError(f"Received {session.received} of {session.size} bytes")
+        path = session_path(session)
+        if not session.received or not os.path.exists(path):
+            raise UploadError("No data has been uploaded")
+
+        digest = hash_file(path)
+        if sha256 and sha256.lower() != digest:
+            raise UploadError(f"SHA-256 mismatch: received content hashes to {digest}")
+        path = _move_to_content_path(path, digest)
+        session.status = UploadSession.COMPLETED
+        session.save(update_fields=["status", "updated_at"])
+    return path, digest
@@ -1,15 +1,35 @@
 from django.urls import path
 from .views import *
+from . import async_views
 
 urlpatterns = [
     path("sales/", SalesListView.as_view(), name="sales-list"),
     path("sales/summary/", SalesSummaryView.as_view(), name="sales-summary"),
+    path("sales/export/", export_sales, name="sales-export"),
     path("analytics/kpi/", SalesKPISummary.as_view(), name="sales-kpi"),
+    path("analytics/aggregate/", aggregate_sales, name="analytics-aggregate"),
+    path("analytics/batch/", analytics_batch, name="analytics-batch"),
     path("sales-trend/", sales_trend, name="sales-trend"),
     path("sales-by-category/", sales_by_category, name="sales-by-category"),
     path("orders-by-status/", orders_by_status, name="orders-by-status"),
     path('sales/region/', sales_by_region, name='sales-by-region'),
     path('sales/top-cities/', top_cities, name='top-cities'),
     path("upload-csv/", upload_csv_file, name="upload-csv-file"),
+    path("upload-csv/<int:job_id>/", csv_upload_job, name="csv-upload-job"),
+    path("upload-csv/<int:job_id>/errors/", csv_upload_errors, name="csv-upload-errors"),
     path("csv-upload-logs/", csv_upload_logs, name="csv-upload-logs"),
+    path("uploads/", create_upload_session, name="upload-session-create"),
+    path("uploads/<uuid:upload_id>/", upload_session, name="upload-session"),
+    path("uploads/<uuid:upload_id>/parts/", upload_session_part, name="upload-session-part"),
+    path("uploads/<uuid:upload_id>/complete/", complete_upload_session, name="upload-session-complete"),
+    # Async (ASGI) variants of the analytics endpoints.
+    path("async/sales/summary/", async_views.sales_summary, name="async-sales-summary"),
+    path("async/analytics/kpi/", async_views.kpi_summary, name="async-sales-kpi"),
+    path("async/analytics/aggregate/", async_views.aggregate_sales, name="async-analytics-aggregate"),
+    path("async/analytics/batch/", async_views.analytics_batch, name="async-analytics-batch"),
+    path("async/sales-trend/", async_views.sales_trend, name="async-sales-trend"),
+    path("async/sales-by-category/", async_views.sales_by_category, name="async-sales-by-category"),
+    path("async/orders-by-status/", async_views.orders_by_status, name="async-orders-by-status"),
+    path("async/sales/region/", async_views.sales_by_region, name="async-sales-by-region"),
+    path("async/sales/top-cities/", async_views.top_cities, name="async-top-cities"),
 ]
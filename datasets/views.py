@@ -1,12 +1,21 @@
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Min, Max
-from .models import Sales ,CSVUploadLog
-from .serializers import SalesSerializer 
-from .pagination import SalesPagination
-from django.db.models import Sum, DecimalField, IntegerField
-from django.db.models.functions import Coalesce
+from .models import Sales ,CSVUploadLog, UploadSession
+from .serializers import SalesSerializer, SALES_FIELD_NAMES, sales_row_encoder
+from .pagination import SalesPagination, SalesKeysetPagination, UploadLogPagination
+from .ingest import read_header, CSVIngestError
+from .jobs import enqueue_upload, run_job
+from .uploads import (
+    OffsetMismatch, UploadError, append_part, complete_session, discard, find_duplicate, store_stream,
+)
+from . import analytics, batch
+from .cache import cached_analytics
+from .filters import (
+    parse_sales_filters, parse_fields, parse_aggregate_params, parse_trend_params, parse_upload_log_filters, parse_limit,
+    FilterError,
+)
+from .export import stream_export, ExportError, CONTENT_TYPES as EXPORT_CONTENT_TYPES
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -14,74 +23,101 @@ from rest_framework.decorators import api_view, permission_classes
 import pandas as pd
 import os
 from django.conf import settings
+from django.utils.decorators import method_decorator
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.parsers import MultiPartParser
 from rest_framework.decorators import parser_classes
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
-from .docs import *
+from backend.openapi import documented
 import logging
 
 logger = logging.getLogger(__name__)
 
+@documented("sales_list_docs", method="get")
 class SalesListView(generics.ListAPIView):
     queryset = Sales.objects.all().order_by("id")
     serializer_class = SalesSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = SalesPagination
 
+    @property
+    def paginator(self):
+        # ?pagination=keyset (or following a cursor link) switches to keyset paging.
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            params = request.query_params if request is not None else {}
+            keyset = params.get("pagination") == "keyset" or "cursor" in params
+            self._paginator = SalesKeysetPagination() if keyset else self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**parse_sales_filters(self.request.query_params))
+
+    def list(self, request, *args, **kwargs):
+        # Rows are read with values_list and encoded directly, producing the
+        # same output as SalesSerializer without building model instances.
+        try:
+            fields = parse_fields(request.query_params.get("fields"), SALES_FIELD_NAMES)
+            columns = fields + [name for name in ("id", "order_date") if name not in fields]
+            rows = self.filter_queryset(self.get_queryset()).values_list(*columns, named=True)
+            encode = sales_row_encoder(fields, columns)
+
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response([encode(row) for row in page])
+            return Response([encode(row) for row in rows])
+
+        except FilterError as e:
+            return Response({"error": str(e)}, status=400)
+
 def parse_bool(val: str | None):
     if val is None:
         return None
     return str(val).lower() in {"1", "true", "yes", "y", "t"}
 
+@documented("sales_summary_docs", method="get")
+@method_decorator(cached_analytics, name="get")
 class SalesSummaryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         try:
-            stats = Sales.objects.aggregate(
-                total_orders=Count("id"),
-                total_sales=Sum("amount"),
-                min_date=Min("order_date"),
-                max_date=Max("order_date"),
-            )
+            stats = analytics.engine().kpi_summary(parse_sales_filters(request.GET))
 
             result = {
-                "total_orders": stats.get("total_orders", 0),
-                "total_sales": float(stats.get("total_sales") or 0),
-                "min_date": stats.get("min_date").strftime("%Y-%m-%d") if stats.get("min_date") else None,
-                "max_date": stats.get("max_date").strftime("%Y-%m-%d") if stats.get("max_date") else None,
+                "total_orders": stats["total_orders"],
+                "total_sales": stats["total_sales"],
+                "min_date": stats["min_date"].strftime("%Y-%m-%d") if stats["min_date"] else None,
+                "max_date": stats["max_date"].strftime("%Y-%m-%d") if stats["max_date"] else None,
             }
 
             return Response(result, status=200)
 
+        except FilterError as e:
+            return Response({"error": str(e)}, status=400)
+
         except Exception as e:
             logger.error(f"Error in SalesSummaryView: {str(e)}", exc_info=True)
             return Response({"error": "Failed to fetch sales summary."}, status=500)
 
+@documented("sales_kpi_summary_docs", method="get")
+@method_decorator(cached_analytics, name="get")
 class SalesKPISummary(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
-            total_sales_amount = Sales.objects.aggregate(
-                total=Sum("amount", output_field=DecimalField())
-            )["total"] or Decimal("0.00")
-
-            total_orders = Sales.objects.count()
-
-            total_qty = Sales.objects.aggregate(
-                qty=Sum("qty", output_field=IntegerField())
-            )["qty"] or 0
-
-            avg_order_value = float(total_sales_amount) / total_orders if total_orders > 0 else 0
+            stats = analytics.engine().kpi_summary(parse_sales_filters(request.GET))
 
             return Response({
-                "total_sales_amount": float(total_sales_amount),
-                "total_orders": total_orders,
-                "total_qty": total_qty,
-                "avg_order_value": round(avg_order_value, 2),
+                "total_sales_amount": stats["total_sales"],
+                "total_orders": stats["total_orders"],
+                "total_qty": stats["total_qty"],
+                "avg_order_value": stats["avg_order_value"],
             }, status=200)
 
+        except FilterError as e:
+            return Response({"error": str(e)}, status=400)
+
         except Exception as e:
             logger.error(f"Error in SalesKPISummary: {str(e)}", exc_info=True)
 
@@ -91,27 +127,17 @@ class SalesKPISummary(APIView):
             )
         
 
-@sales_trend_docs
+@documented("sales_trend_docs")
 @api_view(["GET"])
 @permission_classes([IsAuthenticated]) 
+@cached_analytics
 def sales_trend(request):
     try:
-        data = (
-            Sales.objects
-            .values("order_date")
-            .annotate(total_sales=Sum("amount"))
-            .order_by("order_date")
-        )
-
-        results = [
-            {
-                "date": item["order_date"].strftime("%Y-%m-%d") if item["order_date"] else "Unknown",
-                "total_sales": float(item["total_sales"]) if item["total_sales"] else 0.0
-            }
-            for item in data
-        ]
+        data = analytics.sales_trend_data(parse_sales_filters(request.GET), **parse_trend_params(request.GET))
+        return Response(data, status=200)
 
-        return Response(results, status=200)
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
 
     except Exception as e:
         logger.error(f"Error in sales_trend: {str(e)}", exc_info=True)
@@ -121,27 +147,16 @@ def sales_trend(request):
         )
     
 
-@sales_by_category_docs
+@documented("sales_by_category_docs")
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@cached_analytics
 def sales_by_category(request):
     try:
-        data = (
-            Sales.objects
-            .values("category")
-            .annotate(total_sales=Sum("amount"))
-            .order_by("-total_sales")
-        )
+        return Response(analytics.sales_by_category_data(parse_sales_filters(request.GET)), status=200)
 
-        results = [
-            {
-                "category": item["category"] if item["category"] else "Unknown",
-                "total_sales": float(item["total_sales"]) if item["total_sales"] else 0.0
-            }
-            for item in data
-        ]
-
-        return Response(results, status=200)
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
 
     except Exception as e:
         logger.error(f"Error in sales_by_category: {str(e)}", exc_info=True)
@@ -152,25 +167,16 @@ def sales_by_category(request):
         )
 
 
-@orders_by_status_docs
+@documented("orders_by_status_docs")
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])  
+@cached_analytics
 def orders_by_status(request):
     try:
-        data = (
-            Sales.objects
-            .values("status")
-            .annotate(order_count=Count("id"))
-            .order_by("-order_count")
-        )
-        results = [
-            {
-                "status": item["status"] if item["status"] else "Unknown",
-                "order_count": item["order_count"]
-            }
-            for item in data
-        ]
-        return Response(results, status=200)
+        return Response(analytics.orders_by_status_data(parse_sales_filters(request.GET)), status=200)
+
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
 
     except Exception as e:
         logger.error(f"Error in orders_by_status view: {str(e)}", exc_info=True)
@@ -180,57 +186,17 @@ def orders_by_status(request):
             status=500
         )   
 
-@sales_by_region_docs
+@documented("sales_by_region_docs")
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_analytics
 def sales_by_region(request):
     try:
         level = request.GET.get("level", "state")
-        qs = Sales.objects.all()
-
-        if level == "country":
-            data = qs.values("ship_country").annotate(
-                total_orders=Count("id"),
-                total_sales=Sum("amount")
-            )
-            result = [
-                {
-                    "region": d["ship_country"],
-                    "total_orders": d["total_orders"],
-                    "total_sales": float(d["total_sales"] or 0)
-                }
-                for d in data
-            ]
-
-        elif level == "city":
-            data = qs.values("ship_city").annotate(
-                total_orders=Count("id"),
-                total_sales=Sum("amount")
-            )
-            result = [
-                {
-                    "region": d["ship_city"],
-                    "total_orders": d["total_orders"],
-                    "total_sales": float(d["total_sales"] or 0)
-                }
-                for d in data
-            ]
-
-        else:  
-            data = qs.values("ship_state").annotate(
-                total_orders=Count("id"),
-                total_sales=Sum("amount")
-            )
-            result = [
-                {
-                    "region": d["ship_state"],
-                    "total_orders": d["total_orders"],
-                    "total_sales": float(d["total_sales"] or 0)
-                }
-                for d in data
-            ]
+        return Response(analytics.sales_by_region_data(level, parse_sales_filters(request.GET)), status=200)
 
-        return Response(result, status=200)
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
 
     except Exception as e:
         logger.error(f"Error in sales_by_region view: {str(e)}", exc_info=True)
@@ -239,38 +205,147 @@ def sales_by_region(request):
             status=500
         )
 
-@top_cities_docs
+@documented("top_cities_docs")
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_analytics
 def top_cities(request):
     try:
-        limit = int(request.GET.get("limit", 10))
-        qs = Sales.objects.all()
-
-        start_date = request.GET.get("start_date")
-        end_date = request.GET.get("end_date")
-        if start_date:
-            qs = qs.filter(order_date__gte=start_date)
-        if end_date:
-            qs = qs.filter(order_date__lte=end_date)
-
-        data = qs.values("ship_city", "ship_state").annotate(
-            orders=Count("id")
-        ).order_by("-orders")[:limit]
-
-        result = [
-            {"city": d["ship_city"], "state": d["ship_state"], "orders": d["orders"]}
-            for d in data
-        ]
-
+        limit = parse_limit(request.GET.get("limit"))
+        result = analytics.top_cities_data(limit=limit, filters=parse_sales_filters(request.GET))
         return Response(result, status=200)
 
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
+
     except Exception as e:
         logger.error(f"Error in top_cities view: {str(e)}", exc_info=True)
         return Response({"error": "Something went wrong while fetching top cities"}, status=500)
 
 
-@csv_upload_docs
+@documented("analytics_batch_docs")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@cached_analytics
+def analytics_batch(request):
+    try:
+        return Response(batch.evaluate(request.data), status=200)
+
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
+
+    except Exception as e:
+        logger.error(f"Error in analytics_batch: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while loading the dashboard."}, status=500)
+
+
+@documented("aggregate_docs")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@cached_analytics
+def aggregate_sales(request):
+    try:
+        params = parse_aggregate_params(request.GET)
+        return Response({
+            "group_by": params["group_by"],
+            "metrics": params["metrics"],
+            "results": analytics.aggregate(**params),
+        }, status=200)
+
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
+
+    except Exception as e:
+        logger.error(f"Error in aggregate_sales: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while aggregating sales."}, status=500)
+
+
+@documented("sales_export_docs")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_sales(request):
+    try:
+        file_format = request.GET.get("file_format", "csv").lower()
+        fields = parse_fields(request.GET.get("fields"), SALES_FIELD_NAMES)
+        queryset = Sales.objects.filter(**parse_sales_filters(request.GET))
+        stream = stream_export(queryset, fields, file_format)
+
+        response = StreamingHttpResponse(stream, content_type=EXPORT_CONTENT_TYPES[file_format])
+        response["Content-Disposition"] = f'attachment; filename="sales.{file_format}"'
+        return response
+
+    except (FilterError, ExportError) as e:
+        return Response({"error": str(e)}, status=400)
+
+    except Exception as e:
+        logger.error(f"Error in export_sales: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while exporting sales."}, status=500)
+
+
+def _error_report_url(job):
+    return reverse("csv-upload-errors", args=[job.pk]) if job.error_report else None
+
+
+def _upload_status(session):
+    return {
+        "upload_id": str(session.pk),
+        "file_name": session.file_name,
+        "size": session.size,
+        "received": session.received,
+        "status": session.status,
+        "job_id": session.job_id,
+    }
+
+
+def _accept_upload(user, file_name, file_path, content_hash):
+    """
+    Queue (or inline, load) a stored upload unless the user already
+    queued or ingested the same content. Returns (response, job).
+    """
+    duplicate = find_duplicate(content_hash, user)
+    if duplicate is not None:
+        return Response({
+            "message": "File already uploaded; it will not be processed again",
+            "job_id": duplicate.pk,
+            "file_name": duplicate.file_name,
+            "status": duplicate.status,
+            "duplicate": True,
+        }, status=200), duplicate
+
+    try:
+        read_header(file_path)
+    except (CSVIngestError, pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        logger.error(f"Error reading CSV file {file_name}: {str(e)}", exc_info=True)
+        discard(file_path)
+        return Response({"error": f"Failed to read CSV: {str(e)}"}, status=400), None
+
+    job = enqueue_upload(user, file_name, file_path, content_hash)
+
+    if settings.CSV_INGEST_MODE == "inline":
+        job = run_job(job)
+        if job.status == CSVUploadLog.FAILED:
+            return Response({"error": f"Failed to read CSV: {job.error}"}, status=400), job
+        return Response({
+            "message": "File uploaded successfully",
+            "job_id": job.pk,
+            "file_name": job.file_name,
+            "row_count": job.row_count,
+            "skipped_rows": job.rows_skipped,
+            "rows_inserted": job.rows_inserted,
+            "rows_updated": job.rows_updated,
+            "rows_unchanged": job.rows_unchanged,
+            "error_report": _error_report_url(job),
+        }, status=201), job
+
+    return Response({
+        "message": "File accepted for processing",
+        "job_id": job.pk,
+        "file_name": job.file_name,
+        "status": job.status,
+    }, status=202), job
+
+
+@documented("csv_upload_docs")
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser])
@@ -283,61 +358,209 @@ def upload_csv_file(request):
         if not file_obj.name.lower().endswith(".csv"):
             return Response({"error": "File must be in CSV format"}, status=400)
 
-        # 3. Ensure upload directory exists
-        upload_dir = os.path.join(settings.MEDIA_ROOT, "uploads")
-        os.makedirs(upload_dir, exist_ok=True)
-
-        file_path = os.path.join(upload_dir, file_obj.name)
-        with open(file_path, "wb+") as f:
-            for chunk in file_obj.chunks():
-                f.write(chunk)
+        file_path, content_hash = store_stream(file_obj.chunks())
         try:
-            df = pd.read_csv(file_path)
-            row_count = len(df)
-        except Exception as e:
-            logger.error(f"Error reading CSV file {file_obj.name}: {str(e)}", exc_info=True)
-            return Response({"error": f"Failed to read CSV: {str(e)}"}, status=400)
-
-        # Save log in database
-        CSVUploadLog.objects.create(
-            user=request.user,
-            file_name=file_obj.name,
-            row_count=row_count
+            response, _ = _accept_upload(request.user, file_obj.name, file_path, content_hash)
+        except Exception:
+            discard(file_path)
+            raise
+        return response
+
+    except Exception as e:
+        logger.error(f"Unexpected error in upload_csv_file: {str(e)}", exc_info=True)
+        return Response(
+            {"error": "An unexpected error occurred while uploading the file."},
+            status=500
         )
 
+
+@documented("upload_session_create_docs")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request):
+    try:
+        file_name = str(request.data.get("file_name", "")).strip()
+        if not file_name.lower().endswith(".csv"):
+            return Response({"error": "file_name must name a CSV file"}, status=400)
+        size = request.data.get("size")
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                size = -1
+            if size <= 0:
+                return Response({"error": "size must be a positive number of bytes"}, status=400)
+
+        session = UploadSession.objects.create(user=request.user, file_name=file_name, size=size)
+        return Response(_upload_status(session), status=201)
+
+    except Exception as e:
+        logger.error(f"Error in create_upload_session: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while starting the upload."}, status=500)
+
+
+@documented("upload_session_docs")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def upload_session(request, upload_id):
+    session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+    if session is None:
+        return Response({"error": "Upload not found"}, status=404)
+    return Response(_upload_status(session), status=200)
+
+
+@documented("upload_session_part_docs")
+@api_view(["PUT"])
+@permission_classes([IsAuthenticated])
+def upload_session_part(request, upload_id):
+    try:
+        session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+        if session is None:
+            return Response({"error": "Upload not found"}, status=404)
+        try:
+            offset = int(request.GET["offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            return Response({"error": "offset query parameter and Content-Length header are required"}, status=400)
+        if length <= 0:
+            return Response({"error": "Empty part"}, status=400)
+
+        session = append_part(session, offset, request.stream, length)
+        return Response(_upload_status(session), status=200)
+
+    except OffsetMismatch as e:
+        return Response({"error": str(e), "received": e.received}, status=409)
+
+    except UploadError as e:
+        return Response({"error": str(e)}, status=400)
+
+    except Exception as e:
+        logger.error(f"Error in upload_session_part: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while storing the part."}, status=500)
+
+
+@documented("upload_session_complete_docs")
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request, upload_id):
+    try:
+        session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+        if session is None:
+            return Response({"error": "Upload not found"}, status=404)
+
+        file_path, content_hash = complete_session(session, request.data.get("sha256"))
+        # Failed unless the file is accepted, including when this raises.
+        session.status = UploadSession.FAILED
+        try:
+            response, job = _accept_upload(request.user, session.file_name, file_path, content_hash)
+            if response.status_code < 400:
+                session.status = UploadSession.COMPLETED
+            session.job = job
+        except Exception:
+            discard(file_path)
+            raise
+        finally:
+            session.save(update_fields=["status", "job", "updated_at"])
+        return response
+
+    except UploadError as e:
+        return Response({"error": str(e)}, status=400)
+
+    except Exception as e:
+        logger.error(f"Error in complete_upload_session: {str(e)}", exc_info=True)
+        return Response({"error": "Something went wrong while completing the upload."}, status=500)
+
+
+@documented("csv_upload_job_docs")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def csv_upload_job(request, job_id):
+    try:
+        job = CSVUploadLog.objects.filter(pk=job_id, user=request.user).first()
+        if job is None:
+            return Response({"error": "Upload job not found"}, status=404)
+
         return Response({
-            "message": "File uploaded successfully",
-            "file_name": file_obj.name,
-            "row_count": row_count
-        }, status=201)
+            "job_id": job.pk,
+            "file_name": job.file_name,
+            "status": job.status,
+            "rows_processed": job.rows_processed,
+            "row_count": job.row_count,
+            "skipped_rows": job.rows_skipped,
+            "rows_inserted": job.rows_inserted,
+            "rows_updated": job.rows_updated,
+            "rows_unchanged": job.rows_unchanged,
+            "throughput": job.throughput,
+            "error": job.error or None,
+            "error_report": _error_report_url(job),
+            "upload_time": job.upload_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "started_at": job.started_at.strftime("%Y-%m-%d %H:%M:%S") if job.started_at else None,
+            "finished_at": job.finished_at.strftime("%Y-%m-%d %H:%M:%S") if job.finished_at else None,
+        }, status=200)
 
     except Exception as e:
-        logger.error(f"Unexpected error in upload_csv_file: {str(e)}", exc_info=True)
+        logger.error(f"Error in csv_upload_job: {str(e)}", exc_info=True)
         return Response(
-            {"error": "An unexpected error occurred while uploading the file."},
+            {"error": "Something went wrong while fetching the upload job."},
             status=500
         )
 
 
 
-@csv_upload_logs_docs
+@documented("csv_upload_errors_docs")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def csv_upload_errors(request, job_id):
+    try:
+        job = CSVUploadLog.objects.filter(pk=job_id, user=request.user).first()
+        if job is None or not job.error_report or not os.path.exists(job.error_report):
+            return Response({"error": "No error report for this job"}, status=404)
+
+        name = os.path.splitext(job.file_name)[0]
+        return FileResponse(
+            open(job.error_report, "rb"),
+            as_attachment=True,
+            filename=f"{name}_errors.csv",
+            content_type="text/csv",
+        )
+
+    except Exception as e:
+        logger.error(f"Error in csv_upload_errors: {str(e)}", exc_info=True)
+        return Response(
+            {"error": "Something went wrong while fetching the error report."},
+            status=500
+        )
+
+
+@documented("csv_upload_logs_docs")
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def csv_upload_logs(request):
     try:
-        logs = CSVUploadLog.objects.all().order_by("-upload_time")
+        logs = (
+            CSVUploadLog.objects
+            .filter(**parse_upload_log_filters(request.query_params))
+            .values("id", "file_name", "status", "row_count", "upload_time", "user__username")
+        )
+        paginator = UploadLogPagination()
+        page = paginator.paginate_queryset(logs, request)
 
         data = [
             {
-                "file_name": log.file_name,
-                "row_count": log.row_count,
-                "user": log.user.username,
-                "upload_time": log.upload_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "job_id": log["id"],
+                "file_name": log["file_name"],
+                "status": log["status"],
+                "row_count": log["row_count"],
+                "user": log["user__username"],
+                "upload_time": log["upload_time"].strftime("%Y-%m-%d %H:%M:%S"),
             }
-            for log in logs
+            for log in page
         ]
 
-        return Response(data, status=200)
+        return paginator.get_paginated_response(data)
+
+    except FilterError as e:
+        return Response({"error": str(e)}, status=400)
 
     except Exception as e:
         logger.error(f"Error in csv_upload_logs: {str(e)}", exc_info=True)